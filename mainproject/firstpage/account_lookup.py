@@ -0,0 +1,79 @@
+"""
+Account Lookup Cache
+Read-through cache for matric_number → Accounts id, so a login is a cache
+hit instead of a query. Entries are dropped by the Accounts save/delete
+signals (see signals.py). Unknown matric numbers are not cached: a student
+who mistyped their number and then registered must be able to log in at once.
+
+Off unless settings.ACCOUNT_LOOKUP_CACHE_ALIAS names a cache. The matric
+number is the only login credential, so that cache must be shared by every
+worker (Redis, Memcached, database): the invalidation runs in the worker
+that saved the account, and a per-process locmem cache elsewhere would keep
+a deleted or renumbered account logging in. checks.py warns about locmem.
+
+Bulk queryset updates/deletes do not send signals; ACCOUNT_LOOKUP_TIMEOUT
+bounds how long such a change can go unnoticed.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Accounts
+
+KEY_PREFIX = "account:matric:v1"
+_MISSING = object()
+
+
+def _cache():
+    return caches[settings.ACCOUNT_LOOKUP_CACHE_ALIAS]
+
+
+def enabled():
+    """Whether login lookups are cached (settings.ACCOUNT_LOOKUP_CACHE_ALIAS is set)."""
+    return bool(getattr(settings, "ACCOUNT_LOOKUP_CACHE_ALIAS", None))
+
+
+def account_cache_key(matric_number):
+    # Matric numbers contain "/" and may contain spaces, which some backends reject
+    digest = hashlib.sha256(str(matric_number).encode("utf-8")).hexdigest()[:32]
+    return f"{KEY_PREFIX}:{digest}"
+
+
+def _timeout():
+    return getattr(settings, "ACCOUNT_LOOKUP_TIMEOUT", 300)
+
+
+def get_account_id(matric_number):
+    """Return the id of the account with this matric number, or None."""
+    if not enabled():
+        return Accounts.objects.filter(matric_number=matric_number).values_list("id", flat=True).first()
+    key = account_cache_key(matric_number)
+    account_id = _cache().get(key, _MISSING)
+    if account_id is _MISSING:
+        account_id = Accounts.objects.filter(matric_number=matric_number).values_list("id", flat=True).first()
+        if account_id is not None:
+            _cache().set(key, account_id, _timeout())
+    return account_id
+
+
+async def aget_account_id(matric_number):
+    """Async get_account_id, for the async login view."""
+    if not enabled():
+        return await Accounts.objects.filter(matric_number=matric_number).values_list("id", flat=True).afirst()
+    key = account_cache_key(matric_number)
+    account_id = await _cache().aget(key, _MISSING)
+    if account_id is _MISSING:
+        account_id = await Accounts.objects.filter(matric_number=matric_number).values_list("id", flat=True).afirst()
+        if account_id is not None:
+            await _cache().aset(key, account_id, _timeout())
+    return account_id
+
+
+def invalidate(*matric_numbers):
+    """Forget the cached lookups for these matric numbers."""
+    if not enabled():
+        return
+    keys = [account_cache_key(m) for m in matric_numbers if m]
+    if keys:
+        _cache().delete_many(keys)
@@ -3,6 +3,15 @@ from .models import Accounts
 
 # Register your models here.
 from django.contrib import admin
-from .models import Accounts
+from .models import Accounts, AnalysisResult
 
 admin.site.register(Accounts)
+
+
+@admin.register(AnalysisResult)
+class AnalysisResultAdmin(admin.ModelAdmin):
+    list_display = ("account", "created_at", "level", "cgpa", "risk_level", "ml_risk_level", "model_version")
+    list_filter = ("risk_level", "ml_risk_level", "level")
+    list_select_related = ("account",)
+    raw_id_fields = ("account",)
+    date_hierarchy = "created_at"
@@ -0,0 +1,144 @@
+"""
+Analysis Result Cache
+Students resubmit the dashboard with the same data over and over, so the
+combined analyse_student + ML result is memoized in Django's cache framework
+(the "analysis" alias in settings.CACHES), keyed on a canonical hash of the
+cleaned input, the level and the model version.
+"""
+import hashlib
+import json
+import threading
+
+from django.core.cache import caches
+
+from . import metrics
+from .ml.analyzer import _parse_trend
+
+CACHE_ALIAS = "analysis"
+KEY_PREFIX = "analysis:v1"
+
+
+# ───────────────────────────────────────────────
+# Hit / miss counters (per process)
+# ───────────────────────────────────────────────
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.inc("uniguide_analysis_cache_total", result="hit" if hit else "miss")
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+stats = CacheStats()
+
+
+def cache_stats():
+    """Return {'hits', 'misses', 'hit_ratio'} for this process."""
+    return stats.snapshot()
+
+
+# ───────────────────────────────────────────────
+# Keys
+# ───────────────────────────────────────────────
+def _canonical_courses(courses):
+    # Analysis only depends on which courses are present, not their order
+    return sorted(courses, key=lambda c: json.dumps(c, sort_keys=True, default=str))
+
+
+def analysis_cache_key(cleaned_data, level, model_version):
+    """
+    Build the cache key for one analysis request.
+
+    Args:
+        cleaned_data (dict): the dict passed to analyse_student
+        level: the student's level from StudentBasicForm
+        model_version (str): predictor.model_version()
+
+    Returns:
+        str: key under KEY_PREFIX
+    """
+    canonical = {
+        "cgpa": cleaned_data.get("gpa_cgpa"),
+        "cgpa_trend": _parse_trend(cleaned_data.get("cgpa_trend")),
+        "department": cleaned_data.get("department"),
+        "past_courses": _canonical_courses(cleaned_data.get("past_courses", [])),
+        "current_courses": _canonical_courses(cleaned_data.get("current_courses", [])),
+        "level": str(level),
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{model_version}:{digest}"
+
+
+# ───────────────────────────────────────────────
+# Memoization
+# ───────────────────────────────────────────────
+def _cacheable(result):
+    result_dict, status_code = result
+    return status_code < 500 and result_dict.get("ml_risk_level") != "Unavailable"
+
+
+def cached_analysis(cleaned_data, level, model_version, compute):
+    """
+    Return compute()'s (result_dict, status_code), memoized.
+
+    Server errors are never cached, and neither is a result whose prediction
+    failed (ml_risk_level "Unavailable": a pool timeout, a batcher or predict
+    error) or anything computed while the model is unavailable
+    (model_version is None), so a transient failure does not stick.
+    """
+    if model_version is None:
+        return compute()
+
+    cache = caches[CACHE_ALIAS]
+    key = analysis_cache_key(cleaned_data, level, model_version)
+    cached = cache.get(key)
+    if cached is not None:
+        stats.record(hit=True)
+        return cached
+
+    stats.record(hit=False)
+    result = compute()
+    if _cacheable(result):
+        cache.set(key, result)
+    return result
+
+
+async def acached_analysis(cleaned_data, level, model_version, compute):
+    """Async cached_analysis: `compute` is a coroutine function."""
+    if model_version is None:
+        return await compute()
+
+    cache = caches[CACHE_ALIAS]
+    key = analysis_cache_key(cleaned_data, level, model_version)
+    cached = await cache.aget(key)
+    if cached is not None:
+        stats.record(hit=True)
+        return cached
+
+    stats.record(hit=False)
+    result = await compute()
+    if _cacheable(result):
+        await cache.aset(key, result)
+    return result
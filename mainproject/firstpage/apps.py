@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class FirstpageConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mainproject.firstpage'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the Accounts cache invalidation)
+        from . import checks  # noqa: F401  (registers the deployment checks)
+
+        # Optionally load the ML model at startup instead of on the first request
+        if getattr(settings, "ML_WARMUP", False):
+            from .ml.predictor import get_registry
+            get_registry().warm_up()
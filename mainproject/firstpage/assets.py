@@ -0,0 +1,75 @@
+"""
+Static Assets
+Third-party files we self-host instead of fetching from a CDN on every page
+load, pinned to a version and SRI hash, plus the CSS inlining used by the
+login/register pages. Used through the {% load assets %} template tags.
+
+`manage.py vendor_assets` downloads the pinned files into firstpage/static.
+With DEBUG on, a file that has not been vendored yet is loaded from the CDN
+(same bytes, same integrity hash); with DEBUG off there is no fallback: the
+manifest storage fails to render the page and `manage.py check --deploy`
+reports it (firstpage.E002, see checks.py).
+"""
+import functools
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+VENDOR_ASSETS = {
+    "bootstrap.min.css": {
+        "path": "vendor/bootstrap-5.3.3/bootstrap.min.css",
+        "url": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css",
+        "integrity": "sha384-QWTKZyjpPEjISv5WaRU9OFeRpok6YctnYmDr5pNlyT2bRjXh0JMhjY6hW+ALEwIH",
+    },
+}
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+
+def _is_vendored(path):
+    # Not cached: `vendor_assets` must take effect without a restart.
+    return finders.find(path) is not None
+
+
+def vendor_asset_url(name):
+    """
+    Self-hosted (fingerprinted) URL of a pinned asset. In development it is
+    the CDN URL until `manage.py vendor_assets` has been run.
+    """
+    asset = VENDOR_ASSETS[name]
+    if settings.DEBUG and not _is_vendored(asset["path"]):
+        return asset["url"]
+    return static(asset["path"])
+
+
+_COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_PUNCTUATION_SPACE = re.compile(r"\s*([{};,>])\s*")
+# Only after ":" – a space before it can be a descendant selector ("a :hover")
+_COLON_SPACE = re.compile(r":\s+")
+
+
+def minify_css(css):
+    """Strip comments and whitespace; enough for small hand-written stylesheets."""
+    css = _COMMENTS.sub("", css)
+    css = _SPACE.sub(" ", css)
+    css = _PUNCTUATION_SPACE.sub(r"\1", css)
+    css = _COLON_SPACE.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+@functools.lru_cache(maxsize=32)
+def _read_minified(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return minify_css(f.read())
+
+
+def inline_css(static_path):
+    """Minified contents of a static stylesheet, re-read when the file changes."""
+    path = finders.find(static_path)
+    if path is None:
+        raise ValueError(f"Static file {static_path!r} not found")
+    return _read_minified(path, os.path.getmtime(path))
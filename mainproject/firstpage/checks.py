@@ -0,0 +1,45 @@
+"""
+System checks (`manage.py check`, and on every runserver/migrate) for
+settings and files that work in development but not in a production deploy.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+
+
+@register(Tags.caches)
+def check_account_lookup_cache(app_configs, **kwargs):
+    alias = getattr(settings, "ACCOUNT_LOOKUP_CACHE_ALIAS", None)
+    if not alias:
+        return []
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend != LOCMEM_BACKEND:
+        return []
+    return [
+        Warning(
+            f"ACCOUNT_LOOKUP_CACHE_ALIAS {alias!r} is a per-process LocMemCache.",
+            hint=(
+                "Account changes are only invalidated in the worker that made them, so other "
+                "workers keep logging in deleted or renumbered accounts. Point it at a cache "
+                "shared by all workers, or unset it."
+            ),
+            id="firstpage.W001",
+        )
+    ]
+
+
+@register(Tags.staticfiles, deploy=True)
+def check_vendor_assets(app_configs, **kwargs):
+    from .assets import VENDOR_ASSETS, _is_vendored
+
+    missing = [name for name, asset in VENDOR_ASSETS.items() if not _is_vendored(asset["path"])]
+    if not missing:
+        return []
+    return [
+        Error(
+            f"Vendored assets missing: {', '.join(missing)}. Pages that use them fail to render with DEBUG off.",
+            hint="Run `manage.py vendor_assets` (then collectstatic) before deploying.",
+            id="firstpage.E002",
+        )
+    ]
@@ -1,6 +1,9 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.forms import formset_factory, BaseFormSet
 from .models import Accounts
+from .ml.trend import CgpaTrend
 
 # ───────────────────────────────────────────────
 # Choices
@@ -45,15 +48,42 @@ class AccountForm(forms.ModelForm):
     phone = forms.CharField(widget=forms.TextInput(attrs={"placeholder": "Phone Number"}))
     matric_number = forms.CharField(widget=forms.TextInput(attrs={"placeholder": "Matric Number"}))
 
+    DUPLICATE_MATRIC_ERROR = "Matric number already registered."
+
     class Meta:
         model = Accounts
         fields = "__all__"
 
-    def clean_matric_number(self):
-        matric = self.cleaned_data.get("matric_number")
-        if Accounts.objects.filter(matric_number=matric).exists():
-            raise forms.ValidationError("Matric number already registered.")
-        return matric
+    def validate_unique(self):
+        # matric_number's unique index is checked by the INSERT in register();
+        # a SELECT here would be a second round trip and still leave a race
+        # window. Any other unique constraints are validated as usual.
+        exclude = self._get_validation_exclusions()
+        exclude.add("matric_number")
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as e:
+            self._update_errors(e)
+
+    def register(self):
+        """
+        Insert the account optimistically.
+
+        Returns:
+            Accounts: the new account, or None if the matric number is already
+            registered (the error is then added to the form)
+
+        Raises:
+            IntegrityError: for any other constraint violation
+        """
+        try:
+            with transaction.atomic():
+                return self.save()
+        except IntegrityError:
+            if not Accounts.objects.filter(matric_number=self.cleaned_data["matric_number"]).exists():
+                raise
+            self.add_error("matric_number", self.DUPLICATE_MATRIC_ERROR)
+            return None
 
 
 # ───────────────────────────────────────────────
@@ -92,6 +122,10 @@ class StudentBasicForm(forms.Form):
         })
     )
 
+    def clean_cgpa_trend(self):
+        # Parsed once here; analyse_student and the predictor use it directly
+        return CgpaTrend.parse(self.cleaned_data.get('cgpa_trend', ''))
+
 
 # ───────────────────────────────────────────────
 # Course Forms & FormSets
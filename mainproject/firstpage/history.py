@@ -0,0 +1,137 @@
+"""
+Analysis History Buffer
+Dashboard requests only append their AnalysisResult row to an in-memory
+buffer; a background thread commits the buffer with one bulk_create every
+`flush_interval` seconds (or as soon as `max_rows` are waiting), so the
+request path never waits on a database write / fsync.
+
+History is best-effort: rows still buffered when a worker is killed are lost.
+A flush first drops rows whose account has been deleted since (a stale
+session student_id); if the bulk insert still fails it is retried once and
+then the rows are inserted one by one, so a bad row costs only itself.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.db import close_old_connections, transaction
+
+from .models import Accounts, AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+
+class ResultBuffer:
+    def __init__(self, max_rows=200, flush_interval=2.0):
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._rows = []
+        self._pid = None
+        atexit.register(self.flush)
+
+    def add(self, row):
+        """Queue an unsaved AnalysisResult for the next flush."""
+        with self._lock:
+            self._ensure_worker()
+            self._rows.append(row)
+            full = len(self._rows) >= self.max_rows
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Commit everything buffered so far, normally with a single bulk_create.
+
+        Returns:
+            int: rows written
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            rows = self._existing_accounts(rows)
+        except Exception:
+            logger.exception("Could not check analysis history accounts")
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    AnalysisResult.objects.bulk_create(rows, batch_size=500)
+                return len(rows)
+            except Exception:
+                logger.warning("Bulk insert of %d analysis history rows failed (attempt %d)", len(rows), attempt + 1)
+        return self._insert_one_by_one(rows)
+
+    @staticmethod
+    def _existing_accounts(rows):
+        account_ids = {row.account_id for row in rows}
+        existing = set(Accounts.objects.filter(id__in=account_ids).values_list("id", flat=True))
+        kept = [row for row in rows if row.account_id in existing]
+        if len(kept) < len(rows):
+            logger.warning("Dropped %d analysis history rows of deleted accounts", len(rows) - len(kept))
+        return kept
+
+    @staticmethod
+    def _insert_one_by_one(rows):
+        written = 0
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    row.save(force_insert=True)
+                written += 1
+            except Exception:
+                logger.exception("Dropped analysis history row for account %s", row.account_id)
+        return written
+
+    def _ensure_worker(self):
+        # Called with the lock held. Threads do not survive fork, so a forked
+        # worker process starts its own (and drops rows inherited from the parent).
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._rows = []
+        threading.Thread(target=self._run, name="analysis-history", daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """
+    The process-wide ResultBuffer, sized from settings.ANALYSIS_HISTORY_BUFFER
+    and settings.ANALYSIS_HISTORY_FLUSH_SECONDS.
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                from django.conf import settings
+                _buffer = ResultBuffer(
+                    getattr(settings, "ANALYSIS_HISTORY_BUFFER", 200),
+                    getattr(settings, "ANALYSIS_HISTORY_FLUSH_SECONDS", 2.0),
+                )
+    return _buffer
+
+
+def record_analysis(account_id, level, cgpa, result_dict, model_version=None):
+    """Buffer one successful dashboard analysis, if history is enabled."""
+    from django.conf import settings
+    if not getattr(settings, "ANALYSIS_HISTORY", True):
+        return
+    try:
+        row = AnalysisResult.from_analysis(account_id, level, cgpa, result_dict, model_version)
+    except (KeyError, ValueError, TypeError):
+        logger.exception("Could not build analysis history row")
+        return
+    get_buffer().add(row)
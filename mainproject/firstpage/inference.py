@@ -0,0 +1,231 @@
+"""
+Bounded Inference Executor
+The async views never run the analysis / predict_proba on the event loop.
+They hand it to a small thread pool instead, and the pool only accepts
+`max_workers + max_queue` jobs at a time: anything beyond that is rejected
+immediately with ExecutorBusy (a 503 for the client) rather than queueing
+without limit while slow clients pile up.
+
+With settings.ML_MICROBATCH on, the prediction itself goes through a shared
+MicroBatcher instead, so concurrent requests share one predict_proba call.
+
+With settings.ML_BACKEND = "pool", predictions run in an InferencePool of
+dedicated model processes (ml/pool.py) and the model is never loaded in the
+web worker at all.
+
+With settings.ML_MODEL_STORE set, the model comes from a versioned model
+store (ml/store.py) and a new version is picked up without a restart. With
+settings.ML_SHADOW_SAMPLE_RATE > 0 as well, a sampled fraction of
+predictions is also scored by the store's candidate model in the background
+(ml/shadow.py) and the agreement is counted in
+uniguide_shadow_predictions_total.
+
+The views reach the predictor only through this module, which imports it
+(and with it numpy, joblib and whatever the model unpickles) on the first
+prediction rather than when the URLconf is loaded. `manage.py
+check_startup` keeps it that way.
+"""
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import metrics
+
+
+class ExecutorBusy(Exception):
+    """Raised when the executor already has its maximum of running + queued jobs."""
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers=4, max_queue=32):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) without ever blocking the caller.
+
+        Raises:
+            ExecutorBusy: when every worker is busy and the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            metrics.inc("uniguide_inference_rejected_total")
+            raise ExecutorBusy(f"{self.max_workers} running and {self.max_queue} queued jobs")
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) on the pool (raises ExecutorBusy right away when full)."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The process-wide executor, sized from settings.ML_EXECUTOR_WORKERS and
+    settings.ML_EXECUTOR_QUEUE. Created lazily so each forked worker gets its
+    own threads.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from django.conf import settings
+                _executor = BoundedExecutor(
+                    getattr(settings, "ML_EXECUTOR_WORKERS", 4),
+                    getattr(settings, "ML_EXECUTOR_QUEUE", 32),
+                )
+    return _executor
+
+
+_batcher = None
+
+
+def get_batcher():
+    """
+    The process-wide MicroBatcher, or None when settings.ML_MICROBATCH is off.
+    Sized from settings.ML_BATCH_SIZE and settings.ML_BATCH_WAIT_MS.
+    """
+    global _batcher
+    from django.conf import settings
+    if not getattr(settings, "ML_MICROBATCH", False):
+        return None
+    if _batcher is None:
+        with _executor_lock:
+            if _batcher is None:
+                from .ml.batcher import MicroBatcher
+                _batcher = MicroBatcher(
+                    getattr(settings, "ML_BATCH_SIZE", 32),
+                    getattr(settings, "ML_BATCH_WAIT_MS", 2.0),
+                    predict_batch=predict_academic_risk_batch,
+                )
+    return _batcher
+
+
+_pool = None
+
+
+def get_pool():
+    """
+    The process-wide InferencePool, or None unless settings.ML_BACKEND is
+    "pool". Sized from settings.ML_POOL_PROCESSES and settings.ML_POOL_TIMEOUT;
+    the model processes start with the first prediction.
+    """
+    global _pool
+    from django.conf import settings
+    if getattr(settings, "ML_BACKEND", "inprocess") != "pool":
+        return None
+    if _pool is None:
+        with _executor_lock:
+            if _pool is None:
+                from .ml.pool import InferencePool
+                _pool = InferencePool(
+                    getattr(settings, "ML_POOL_PROCESSES", 2),
+                    timeout=getattr(settings, "ML_POOL_TIMEOUT", 5.0),
+                    model_store=getattr(settings, "ML_MODEL_STORE", None),
+                    artifact=getattr(settings, "ML_MODEL_ARTIFACT", None),
+                )
+    return _pool
+
+
+_shadow = None
+
+
+def get_shadow():
+    """
+    The process-wide ShadowScorer for the model store's candidate, or None
+    unless settings.ML_MODEL_STORE is set and settings.ML_SHADOW_SAMPLE_RATE
+    is above zero. Queue size from settings.ML_SHADOW_QUEUE.
+    """
+    global _shadow
+    from django.conf import settings
+    store_dir = getattr(settings, "ML_MODEL_STORE", None)
+    if not store_dir or getattr(settings, "ML_SHADOW_SAMPLE_RATE", 0.0) <= 0:
+        return None
+    if _shadow is None:
+        with _executor_lock:
+            if _shadow is None:
+                from .ml.shadow import ShadowScorer
+                from .ml.predictor import FEATURE_COLUMNS, StoreRegistry
+                from .ml.store import CANDIDATE, ModelStore
+                _shadow = ShadowScorer(
+                    StoreRegistry(ModelStore(store_dir, FEATURE_COLUMNS), pointer=CANDIDATE),
+                    settings.ML_SHADOW_SAMPLE_RATE,
+                    getattr(settings, "ML_SHADOW_QUEUE", 1000),
+                    on_compare=_count_shadow,
+                )
+    return _shadow
+
+
+@receiver(setting_changed)
+def _reset_model_store(setting, **kwargs):
+    # override_settings(ML_MODEL_STORE=...) must move predictions and shadow
+    # scoring together; both are rebuilt on their next use.
+    global _shadow
+    if setting in ("ML_MODEL_STORE", "ML_SHADOW_SAMPLE_RATE", "ML_SHADOW_QUEUE"):
+        _shadow = None
+    if setting in ("ML_MODEL_STORE", "ML_MODEL_ARTIFACT"):
+        predictor = sys.modules.get(f"{__package__}.ml.predictor")
+        if predictor is not None:  # not imported yet: nothing to reset
+            predictor.registry = None
+
+
+def _count_shadow(agree, disagree):
+    if agree:
+        metrics.inc("uniguide_shadow_predictions_total", agree, result="agree")
+    if disagree:
+        metrics.inc("uniguide_shadow_predictions_total", disagree, result="disagree")
+
+
+# ───────────────────────────────────────────────
+# Predictor entry points (see module docstring)
+# ───────────────────────────────────────────────
+def predict_academic_risk(cgpa, level, total_courses, cgpa_trend):
+    """ml.predictor.predict_academic_risk, imported on first use, on the configured backend."""
+    from .ml.predictor import predict_academic_risk
+    predict_batch = _predict_batch if get_pool() is not None or get_shadow() is not None else None
+    return predict_academic_risk(cgpa, level, total_courses, cgpa_trend, predict_batch=predict_batch)
+
+
+def predict_academic_risk_batch(cgpa, level=None, total_courses=None, cgpa_trend=None):
+    """ml.predictor.predict_academic_risk_batch, imported on first use, on the configured backend."""
+    return _predict_batch(cgpa, level, total_courses, cgpa_trend)
+
+
+def _predict_batch(cgpa, level, total_courses, cgpa_trend):
+    pool = get_pool()
+    if pool is not None:
+        labels, confidences = pool.predict_batch(cgpa, level, total_courses, cgpa_trend)
+    else:
+        from .ml.predictor import predict_academic_risk_batch
+        labels, confidences = predict_academic_risk_batch(cgpa, level, total_courses, cgpa_trend)
+    shadow = get_shadow()
+    if shadow is not None:
+        shadow.offer(cgpa, level, total_courses, cgpa_trend, labels)
+    return labels, confidences
+
+
+def model_version():
+    """ml.predictor.model_version, imported on first use (the pool's artifact in pool mode)."""
+    pool = get_pool()
+    if pool is not None:
+        return pool.model_version()
+    from .ml.predictor import model_version
+    return model_version()
@@ -0,0 +1,46 @@
+"""
+Non-blocking Logging
+Request threads only put log records on an in-memory queue; a background
+QueueListener thread does the actual (possibly slow) write to stderr, so a
+slow journald pipe never stalls a request.
+
+Used from settings.LOGGING through the "()" factory key.
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    QueueHandler that owns its QueueListener and the stream handler behind it.
+
+    The listener thread is restarted in forked children (gunicorn workers
+    with --preload), since threads do not survive fork.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.stop)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _restart_in_child(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def stop(self):
+        """Flush everything still queued, then stop the listener thread."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self.stop()
+        super().close()
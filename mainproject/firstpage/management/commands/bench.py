@@ -0,0 +1,341 @@
+import itertools
+import json
+import logging
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import django
+import numpy as np
+import sklearn
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import reverse
+
+from ...ml import predictor
+from ...ml.analyzer import analyse_student
+from ...ml.synthetic import RISK_BAND_CGPA, dashboard_form_data, synthetic_model, synthetic_students
+from ...models import Accounts
+
+GROUPS = ("analyse", "predict", "model", "view")
+
+
+class Skip(Exception):
+    """A case that cannot run in this setup (reported, not fatal)."""
+
+
+def _total_courses(student):
+    # Same feature as views._ml_inputs: past plus current courses
+    return len(student["past_courses"]) + len(student["current_courses"])
+
+
+def _slug(text):
+    return text.lower().replace(" ", "_")
+
+
+def _groups(value):
+    groups = value.split(",")
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        raise ValueError(f"unknown groups: {', '.join(sorted(unknown))}")
+    return groups
+
+
+# ───────────────────────────────────────────────
+# Measurement
+# ───────────────────────────────────────────────
+def measure(op, min_time, min_rounds):
+    """Call `op` once to warm up, then until both limits are reached; return latencies in seconds."""
+    op()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < min_rounds or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        op()
+        latencies.append(time.perf_counter() - t0)
+    return np.asarray(latencies)
+
+
+def summarize(latencies, rows_per_op=1):
+    mean, p50, p95, p99 = (
+        float(v) * 1000 for v in (latencies.mean(), *np.percentile(latencies, [50, 95, 99]))
+    )
+    ops_per_sec = len(latencies) / latencies.sum()
+    return {
+        "rounds": len(latencies),
+        "rows_per_op": rows_per_op,
+        "ops_per_sec": round(ops_per_sec, 1),
+        "rows_per_sec": round(ops_per_sec * rows_per_op, 1),
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(p50, 4),
+        "p95_ms": round(p95, 4),
+        "p99_ms": round(p99, 4),
+    }
+
+
+def _environment(seed, model):
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed": seed,
+        "model": model or "shipped",
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "model_version": predictor.model_version(),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the hot paths on deterministic synthetic students: "
+        "analyse_student per risk band, single and batched ML predictions, "
+        "model load, and dashboard/login/register requests through the test "
+        "client on a throwaway SQLite file. Prints ops/s and latency "
+        "percentiles; --save writes a JSON baseline and --compare diffs "
+        "against one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic students")
+        parser.add_argument("--students", type=int, default=500, help="Synthetic students per case")
+        parser.add_argument("--batch-size", type=int, default=256, help="Rows per batched prediction")
+        parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to run each case for")
+        parser.add_argument("--min-rounds", type=int, default=20, help="Calls per case at least")
+        parser.add_argument("--only", type=_groups, default=list(GROUPS), help="Comma separated: " + ",".join(GROUPS))
+        parser.add_argument(
+            "--model",
+            help="Model file to use instead of the shipped one, or \"synthetic\" for a four-feature "
+            "model trained on synthetic students (what benchmarks/baseline.json is recorded with)",
+        )
+        parser.add_argument("--save", help="Write the results to this JSON file")
+        parser.add_argument("--compare", help="JSON baseline to compare against")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help="Fail if any case's ops/s dropped more than this many percent below --compare",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as f:
+                    baseline = json.load(f)["results"]
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Could not read baseline {options['compare']}: {e}")
+
+        previous = predictor.registry
+        model_dir = None
+        model_name = options["model"]
+        if options["model"] == "synthetic":
+            import joblib
+
+            model_dir = tempfile.mkdtemp(prefix="bench-model-")
+            options["model"] = os.path.join(model_dir, "synthetic.pkl")
+            joblib.dump(synthetic_model(seed=options["seed"]), options["model"])
+        if options["model"]:
+            predictor.registry = predictor.ModelRegistry(options["model"])
+        # Log records go to a background thread whose cost lands on whichever
+        # case happens to be running; keep them out of the numbers.
+        logging.disable(logging.CRITICAL)
+        try:
+            results = self._run_all(options, baseline)
+            environment = _environment(options["seed"], model_name)
+        finally:
+            logging.disable(logging.NOTSET)
+            predictor.registry = previous
+            if model_dir is not None:
+                shutil.rmtree(model_dir, ignore_errors=True)
+
+        if options["save"]:
+            with open(options["save"], "w", encoding="utf-8") as f:
+                json.dump({"environment": environment, "results": results}, f, indent=2, sort_keys=True)
+                f.write("\n")
+            self.stdout.write(f"Saved {options['save']}")
+
+        if baseline is not None and options["max_regression"] is not None:
+            changes = {name: self._change(result, baseline.get(name)) for name, result in results.items()}
+            regressed = [
+                name for name, change in changes.items()
+                if change is not None and change < -options["max_regression"]
+            ]
+            if regressed:
+                raise CommandError(f"Slower than the baseline: {', '.join(regressed)}")
+
+    # ───────────────────────────────────────────────
+    # Running and reporting
+    # ───────────────────────────────────────────────
+    def _run_all(self, options, baseline):
+        students = synthetic_students(options["students"], options["seed"])
+        self.stdout.write(
+            f"seed {options['seed']}, {options['students']} students, "
+            f">= {options['min_time']}s and >= {options['min_rounds']} calls per case"
+        )
+        self.stdout.write(
+            f"{'case':<32}{'rounds':>8}{'ops/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'vs base':>9}"
+        )
+
+        results = {}
+        groups = options["only"]
+        if "analyse" in groups:
+            self._analyse_cases(results, options, baseline)
+        if "predict" in groups:
+            self._predict_cases(results, students, options, baseline)
+        if "model" in groups:
+            self._run(results, "model/load", self._model_load, options, baseline)
+        if "view" in groups:
+            self._view_cases(results, students, options, baseline)
+        return results
+
+    def _run(self, results, name, setup, options, baseline):
+        """`setup()` returns (op, rows_per_op) or raises Skip."""
+        try:
+            op, rows_per_op = setup()
+        except Skip as e:
+            results[name] = {"skipped": str(e)}
+            self.stdout.write(f"{name:<32}  skipped: {e}")
+            return
+        result = summarize(measure(op, options["min_time"], options["min_rounds"]), rows_per_op)
+        results[name] = result
+
+        change = self._change(result, baseline.get(name) if baseline else None)
+        self.stdout.write(
+            f"{name:<32}{result['rounds']:>8}{result['ops_per_sec']:>11.1f}"
+            f"{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+            + (f"{change:>+8.1f}%" if change is not None else f"{'':>9}")
+        )
+
+    @staticmethod
+    def _change(result, base):
+        """Percent change in ops/s against the baseline entry, or None."""
+        if not base or "ops_per_sec" not in base or "ops_per_sec" not in result:
+            return None
+        return (result["ops_per_sec"] / base["ops_per_sec"] - 1) * 100
+
+    # ───────────────────────────────────────────────
+    # Cases
+    # ───────────────────────────────────────────────
+    def _analyse_cases(self, results, options, baseline):
+        for band in RISK_BAND_CGPA:
+            def setup(band=band):
+                students = itertools.cycle(synthetic_students(options["students"], options["seed"], band))
+                result, status = analyse_student(next(students))
+                if status != 200 or result["risk_level"] != band:
+                    raise CommandError(f"Synthetic {band} student was analysed as {result['risk_level']}")
+                return (lambda: analyse_student(next(students))), 1
+
+            self._run(results, f"analyse_student/{_slug(band)}", setup, options, baseline)
+
+    def _predict_cases(self, results, students, options, baseline):
+        def check_model():
+            try:
+                predictor.predict_academic_risk_batch([3.0], [200], [12], np.zeros(1))
+            except Exception as e:
+                raise Skip(f"the model cannot score the predictor's features ({e}); pass --model")
+
+        def single():
+            check_model()
+            rows = itertools.cycle(students)
+
+            def op():
+                s = next(rows)
+                predictor.predict_academic_risk(s["gpa_cgpa"], s["level"], _total_courses(s), s["cgpa_trend"])
+            return op, 1
+
+        def batch():
+            check_model()
+            n = options["batch_size"]
+            rows = [students[i % len(students)] for i in range(n)]
+            cgpa = [s["gpa_cgpa"] for s in rows]
+            level = [s["level"] for s in rows]
+            total = [_total_courses(s) for s in rows]
+            trend = [s["cgpa_trend"] for s in rows]
+            return (lambda: predictor.predict_academic_risk_batch(cgpa, level, total, trend)), n
+
+        self._run(results, "predict/single", single, options, baseline)
+        self._run(results, f"predict/batch_{options['batch_size']}", batch, options, baseline)
+
+    def _model_load(self):
+        current = predictor.get_registry()
+
+        def op():
+            if predictor.ModelRegistry(current.path, mmap_mode=current.mmap_mode).get() is None:
+                raise CommandError(f"Could not load {current.path}")
+        return op, 1
+
+    def _view_cases(self, results, students, options, baseline):
+        if connection.vendor != "sqlite":
+            raise CommandError("The view benchmarks use a throwaway SQLite file; the default database is not SQLite")
+
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(directory, "bench.sqlite3")
+            old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+            try:
+                with override_settings(ANALYSIS_HISTORY=False):
+                    self._run_views(results, students, options, baseline)
+            finally:
+                connection.close()
+                teardown_databases(old_config, verbosity=0)
+
+    def _run_views(self, results, students, options, baseline):
+        Accounts.objects.bulk_create(
+            Accounts(fullname="Bench Student", email=f"{i}@example.com", phone="0800", matric_number=s["matric_number"])
+            for i, s in enumerate(students)
+        )
+        dashboard, login, register = (reverse(f"uniguide:{n}") for n in ("dashboard", "login", "register"))
+
+        def logged_in():
+            client = Client()
+            if client.post(login, {"matric_number": students[0]["matric_number"]}).status_code != 302:
+                raise CommandError("Could not log in the benchmark student")
+            return client
+
+        def post(client, url, data, expected):
+            status = client.post(url, data).status_code
+            if status != expected:
+                raise CommandError(f"POST {url} returned {status}, expected {expected}")
+
+        def dashboard_uncached():
+            client, payloads = logged_in(), itertools.cycle([dashboard_form_data(s) for s in students])
+            return (lambda: post(client, dashboard, next(payloads), 200)), 1
+
+        def dashboard_cached():
+            client, payload = logged_in(), dashboard_form_data(students[0])
+            return (lambda: post(client, dashboard, payload, 200)), 1
+
+        def login_case():
+            client, matrics = Client(), itertools.cycle([s["matric_number"] for s in students])
+
+            def op():
+                client.cookies.clear()
+                post(client, login, {"matric_number": next(matrics)}, 302)
+            return op, 1
+
+        def register_case():
+            client, counter = Client(), itertools.count()
+
+            def op():
+                client.cookies.clear()
+                i = next(counter)
+                post(client, register, {
+                    "fullname": "Bench Student", "email": f"new{i}@example.com",
+                    "phone": "0800", "matric_number": f"BENCH/NEW/{i:07d}",
+                }, 302)
+            return op, 1
+
+        # Every POST a different student, with the analysis cache switched off
+        dummy_analysis_cache = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+        with override_settings(CACHES={**settings.CACHES, "analysis": dummy_analysis_cache}):
+            self._run(results, "view/dashboard_post", dashboard_uncached, options, baseline)
+        self._run(results, "view/dashboard_post_cached", dashboard_cached, options, baseline)
+        self._run(results, "view/login", login_case, options, baseline)
+        self._run(results, "view/register", register_case, options, baseline)
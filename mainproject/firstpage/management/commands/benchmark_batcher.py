@@ -0,0 +1,103 @@
+import threading
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ...ml import predictor
+from ...ml.batcher import MicroBatcher
+
+
+def _ints(value):
+    return [int(v) for v in value.split(",")]
+
+
+def _floats(value):
+    return [float(v) for v in value.split(",")]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput and p50/p99 latency of ML predictions from many "
+        "concurrent callers: one predict_proba per call versus the MicroBatcher "
+        "at several batch sizes and max waits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=32, help="Concurrent callers (threads)")
+        parser.add_argument("--requests", type=int, default=4000, help="Predictions per configuration")
+        parser.add_argument("--batch-sizes", type=_ints, default=[8, 32, 128], help="Comma separated")
+        parser.add_argument("--waits", type=_floats, default=[0.5, 2.0, 5.0], help="Max wait in ms, comma separated")
+        parser.add_argument("--model", help="Model file to use instead of the shipped one")
+
+    def handle(self, *args, **options):
+        previous = predictor.registry
+        if options["model"]:
+            predictor.registry = predictor.ModelRegistry(options["model"])
+        try:
+            self._benchmark(options)
+        finally:
+            predictor.registry = previous
+
+    def _benchmark(self, options):
+        predict_batch = predictor.predict_academic_risk_batch
+        try:
+            predict_batch([3.0], [200], [12], np.zeros(1))
+        except Exception as e:
+            raise CommandError(f"The model cannot score the predictor's features ({e}); pass --model")
+
+        rng = np.random.default_rng(0)
+        rows = list(zip(
+            rng.uniform(0, 5, 1024).round(2).tolist(),
+            rng.choice([100, 200, 300, 400, 500], 1024).tolist(),
+            rng.integers(6, 18, 1024).tolist(),
+            rng.uniform(-1, 1, 1024).round(2).tolist(),
+        ))
+
+        def unbatched(row):
+            labels, confidences = predict_batch(*([value] for value in row[:3]), np.array([row[3]]))
+            return {"mlRiskLevel": str(labels[0]), "mlConfidence": float(confidences[0])}
+
+        self.stdout.write(f"{options['clients']} clients, {options['requests']} predictions each run")
+        self.stdout.write(f"{'mode':<12}{'batch':>6}{'wait ms':>9}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'rows/call':>11}")
+        self._report("unbatched", 1, 0.0, self._run(unbatched, rows, options), 1.0)
+
+        for max_batch in options["batch_sizes"]:
+            for wait in options["waits"]:
+                batcher = MicroBatcher(max_batch, wait, predict_batch=predict_batch)
+                result = self._run(lambda row: batcher.predict(*row), rows, options)
+                self._report("microbatch", max_batch, wait, result, batcher.rows / max(batcher.batches, 1))
+
+    def _run(self, call, rows, options):
+        clients = options["clients"]
+        per_client = max(options["requests"] // clients, 1)
+        latencies = [[] for _ in range(clients)]
+        start_gate = threading.Barrier(clients + 1)
+
+        def client(i):
+            own = latencies[i]
+            start_gate.wait()
+            for n in range(per_client):
+                row = rows[(i * per_client + n) % len(rows)]
+                t0 = time.perf_counter()
+                call(row)
+                own.append(time.perf_counter() - t0)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        start_gate.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        all_latencies = np.concatenate([np.asarray(own) for own in latencies])
+        return len(all_latencies) / elapsed, all_latencies
+
+    def _report(self, mode, max_batch, wait, result, rows_per_call):
+        throughput, latencies = result
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        self.stdout.write(
+            f"{mode:<12}{max_batch:>6}{wait:>9.1f}{throughput:>10.0f}{p50:>9.2f}{p99:>9.2f}{rows_per_call:>11.1f}"
+        )
+
@@ -0,0 +1,115 @@
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import reverse
+
+from ...models import Accounts
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+
+def _names(value):
+    names = value.split(",")
+    unknown = set(names) - set(SESSION_ENGINES)
+    if unknown:
+        raise ValueError(f"unknown session backends: {', '.join(sorted(unknown))}")
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login QPS on a throwaway file-backed SQLite database for each "
+        "session backend, with and without the matric_number lookup cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent login clients")
+        parser.add_argument("--logins", type=int, default=2000, help="Logins per configuration")
+        parser.add_argument("--accounts", type=int, default=500, help="Registered accounts to log in as")
+        parser.add_argument("--sessions", type=_names, default=list(SESSION_ENGINES), help="Comma separated")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("benchmark_login measures the SQLite setup; the default database is not SQLite")
+
+        with tempfile.TemporaryDirectory() as directory:
+            # A real file (not the in-memory test DB), so commits pay for fsync
+            # and the write lock like they do in production.
+            connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(directory, "bench.sqlite3")
+            old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+            try:
+                self._benchmark(options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+
+    def _benchmark(self, options):
+        matric_numbers = [f"BENCH/{i:05d}" for i in range(options["accounts"])]
+        Accounts.objects.bulk_create(
+            Accounts(fullname=f"Student {m}", email=f"{i}@example.com", phone="0800", matric_number=m)
+            for i, m in enumerate(matric_numbers)
+        )
+
+        self.stdout.write(f"{options['threads']} clients, {options['logins']} logins per run, SQLite")
+        self.stdout.write(f"{'sessions':<16}{'lookup cache':>13}{'logins/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for name in options["sessions"]:
+            for lookup_cache in (False, True):
+                with override_settings(
+                    SESSION_ENGINE=SESSION_ENGINES[name],
+                    ACCOUNT_LOOKUP_CACHE_ALIAS="default" if lookup_cache else None,
+                ):
+                    caches["default"].clear()
+                    qps, latencies, errors = self._run(matric_numbers, options)
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                self.stdout.write(
+                    f"{name:<16}{'on' if lookup_cache else 'off':>13}{qps:>10.0f}{p50:>9.2f}{p99:>9.2f}{errors:>8}"
+                )
+
+    def _run(self, matric_numbers, options):
+        threads = options["threads"]
+        per_thread = max(options["logins"] // threads, 1)
+        url = reverse("uniguide:login")
+        latencies = [[] for _ in range(threads)]
+        errors = [0] * threads
+        start_gate = threading.Barrier(threads + 1)
+
+        def client(i):
+            rng = random.Random(i)
+            browser = Client()
+            start_gate.wait()
+            try:
+                for _ in range(per_thread):
+                    browser.cookies.clear()  # each login is a new visitor
+                    t0 = time.perf_counter()
+                    try:
+                        response = browser.post(url, {"matric_number": rng.choice(matric_numbers)})
+                        if response.status_code != 302:
+                            errors[i] += 1
+                    except Exception:
+                        errors[i] += 1
+                    latencies[i].append(time.perf_counter() - t0)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        start_gate.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        all_latencies = np.concatenate([np.asarray(own) for own in latencies])
+        return len(all_latencies) / elapsed, all_latencies, sum(errors)
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import reverse
+
+
+def _profiles():
+    return {
+        "default": ({"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": {}}, {}),
+        "production": (settings.SQLITE_PRODUCTION_DATABASE, settings.SQLITE_PRODUCTION_PRAGMAS),
+    }
+
+
+def _worker(worker_id, operations, database, pragmas, results):
+    """One forked "gunicorn worker": register a new student, then log in as them."""
+    connection.settings_dict.update(database)
+    client = Client(raise_request_exception=False)
+    register, login = reverse("uniguide:register"), reverse("uniguide:login")
+
+    def request(url, data):
+        response = client.post(url, data)
+        # What the WSGI handler does when a request finishes: close the
+        # connection unless CONN_MAX_AGE allows reusing it.
+        close_old_connections()
+        return response.status_code
+
+    latencies, errors = [], 0
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        for i in range(operations):
+            matric = f"LOAD/{worker_id}/{i}"
+            client.cookies.clear()
+            t0 = time.perf_counter()
+            ok = request(register, {
+                "fullname": "Load Test", "email": f"{worker_id}.{i}@example.com",
+                "phone": "0800", "matric_number": matric,
+            }) == 302
+            ok = request(login, {"matric_number": matric}) == 302 and ok
+            latencies.append(time.perf_counter() - t0)
+            errors += not ok
+    connection.close()
+    results.put((latencies, errors))
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test concurrent register + login on a throwaway SQLite file from "
+        "several processes, with the default settings and with the "
+        "DB_PROFILE=production tuning (WAL, synchronous=NORMAL, busy timeout, "
+        "persistent connections)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4, help="Concurrent worker processes")
+        parser.add_argument("--operations", type=int, default=200, help="Register + login pairs per process")
+        parser.add_argument("--profiles", default="default,production", help="Comma separated")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("benchmark_sqlite needs the default database to be SQLite")
+        profiles = _profiles()
+        names = options["profiles"].split(",")
+        unknown = set(names) - set(profiles)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(
+            f"{options['processes']} processes x {options['operations']} register+login pairs, "
+            f"{settings.SESSION_ENGINE.rsplit('.', 1)[-1]} sessions"
+        )
+        self.stdout.write(f"{'profile':<12}{'pairs/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for name in names:
+            with tempfile.TemporaryDirectory() as directory:
+                connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(directory, "load.sqlite3")
+                old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+                try:
+                    rate, latencies, errors = self._run(*profiles[name], options)
+                finally:
+                    teardown_databases(old_config, verbosity=0)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            self.stdout.write(f"{name:<12}{rate:>9.0f}{p50:>9.2f}{p99:>9.2f}{errors:>8}")
+
+    def _run(self, database, pragmas, options):
+        # Children must not share the parent's SQLite handle
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(i, options["operations"], database, pragmas, results))
+            for i in range(options["processes"])
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        collected = [results.get() for _ in workers]
+        elapsed = time.perf_counter() - started
+        for worker in workers:
+            worker.join()
+
+        latencies = np.concatenate([np.asarray(own) for own, _ in collected])
+        errors = sum(e for _, e in collected)
+        return len(latencies) / elapsed, latencies, errors
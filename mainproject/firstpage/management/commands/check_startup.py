@@ -0,0 +1,114 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Only code paths that run inference may import these
+HEAVY_MODULES = ("numpy", "pandas", "joblib", "scipy", "sklearn")
+
+# Budget for the fastest `-X importtime` total over --runs fresh interpreters.
+# Noise (other processes, cold page cache) only ever adds time, so the minimum
+# is the stable number, where medians of identical runs ranged 430-810 ms.
+# Baseline: fastest run about 250 ms (1 vCPU, Python 3.11, Django 5.2),
+# nearly all of it Django, so the budget leaves ~80% headroom. numpy, pandas
+# and sklearn alone take well over a second, and the heavy-module check
+# reports them by name anyway.
+BUDGET_MS = 450.0
+
+# What a worker does before serving its first request: build the WSGI
+# application (django.setup(), middleware) and load the URLconf.
+PROBE = (
+    "import mainproject.myproject.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output into (depth, module, self_us, cumulative_us)
+    tuples, in the order Python prints them (a module after everything it imported).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_chain(rows, index):
+    """Module names from the top-level import down to rows[index]."""
+    depth, name = rows[index][:2]
+    chain = [name]
+    for parent_depth, parent, *_ in rows[index + 1:]:
+        if parent_depth < depth:
+            chain.append(parent)
+            depth = parent_depth
+    return list(reversed(chain))
+
+
+class Command(BaseCommand):
+    help = (
+        "Check cold startup of the WSGI application with `python -X importtime`: "
+        "fails if loading the app and its URLconf imports the scientific stack "
+        "(numpy, pandas, joblib, scipy, sklearn) or if the fastest total import "
+        "time over --runs fresh interpreters exceeds the budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=BUDGET_MS,
+            help="Maximum import time of the fastest run, in ms",
+        )
+        parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+        parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+
+    def handle(self, *args, **options):
+        root = str(settings.BASE_DIR.parent)
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "mainproject.myproject.settings"),
+            "PYTHONPATH": os.pathsep.join([root, str(settings.BASE_DIR), os.environ.get("PYTHONPATH", "")]),
+        }
+
+        totals = []
+        fastest_rows = None
+        for _ in range(max(options["runs"], 1)):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", PROBE],
+                cwd=root, env=env, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"Starting the application failed:\n{result.stderr[-2000:]}")
+            rows = parse_importtime(result.stderr)
+            totals.append(sum(row[2] for row in rows) / 1000)
+            if totals[-1] == min(totals):
+                fastest_rows = rows
+        rows = fastest_rows
+
+        fastest = min(totals)
+        self.stdout.write(
+            f"import time: fastest {fastest:.0f} ms, median {statistics.median(totals):.0f} ms "
+            f"over {len(totals)} runs (budget {options['budget_ms']:.0f} ms for the fastest)"
+        )
+        self.stdout.write("slowest modules by own import time (fastest run):")
+        for _, name, self_us, _ in sorted(rows, key=lambda row: -row[2])[:options["top"]]:
+            self.stdout.write(f"  {self_us / 1000:>8.1f} ms  {name}")
+
+        problems = []
+        for i, (_, name, *_) in enumerate(rows):
+            if name in HEAVY_MODULES:
+                problems.append(f"{name} imported at startup via {' -> '.join(import_chain(rows, i))}")
+        if fastest > options["budget_ms"]:
+            problems.append(f"fastest import time {fastest:.0f} ms is over the {options['budget_ms']:.0f} ms budget")
+        if problems:
+            raise CommandError("\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("Startup is within budget"))
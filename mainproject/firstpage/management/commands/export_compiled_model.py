@@ -0,0 +1,80 @@
+import joblib
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ...ml import predictor
+from ...ml.compiled import CompiledModel, export_model
+
+
+def golden_inputs(model, n_rows, seed):
+    """
+    Deterministic feature rows for checking the compiled model: random rows
+    across the usual feature ranges plus rows sitting exactly on each split
+    threshold, where float32/float64 handling would show up first.
+    """
+    rng = np.random.default_rng(seed)
+    n_features = model.n_features_in_
+    X = np.column_stack([
+        rng.uniform(0.0, 5.0, n_rows),
+        rng.choice([100, 200, 300, 400, 500], n_rows),
+        rng.integers(0, 19, n_rows),
+        rng.uniform(-2.0, 2.0, n_rows),
+    ])[:, :n_features].astype(float)
+    if n_features > X.shape[1]:
+        X = np.hstack([X, rng.uniform(-5.0, 5.0, (n_rows, n_features - X.shape[1]))])
+
+    trees = [model.tree_] if hasattr(model, "tree_") else [
+        e.tree_ for e in getattr(model, "estimators_", []) if hasattr(e, "tree_")
+    ]
+    edges = []
+    for tree in trees:
+        for feature, threshold in zip(tree.feature, tree.threshold):
+            if feature < 0:
+                continue
+            for value in (threshold, np.nextafter(threshold, np.inf)):
+                row = X[rng.integers(0, n_rows)].copy()
+                row[feature] = value
+                edges.append(row)
+    return np.vstack([X] + edges) if edges else X
+
+
+class Command(BaseCommand):
+    help = (
+        "Export academic_risk_model.pkl into flat NumPy arrays (.npz) that the "
+        "predictor evaluates without sklearn. The export is checked against "
+        "sklearn on a golden input set and is not written unless it matches exactly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default=predictor.model_path, help="Model pickle to export")
+        parser.add_argument("--output", default=predictor.compiled_model_path, help="Where to write the .npz")
+        parser.add_argument("--rows", type=int, default=10000, help="Random rows in the golden set")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            model = joblib.load(options["source"])
+        except Exception as e:
+            raise CommandError(f"Could not load {options['source']}: {e}")
+
+        try:
+            arrays = export_model(model)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        X = golden_inputs(model, options["rows"], options["seed"])
+        expected = model.predict_proba(X)
+        actual = CompiledModel(arrays).predict_proba(X)
+        if not np.array_equal(expected, actual):
+            worst = float(np.abs(expected - actual).max())
+            if arrays["kind"] != "linear" or not np.allclose(expected, actual, rtol=1e-12, atol=1e-15):
+                raise CommandError(f"Compiled model does not match sklearn (max abs diff {worst})")
+            self.stdout.write(f"Linear model matches sklearn to {worst:.1e} (floating point rounding)")
+        if not np.array_equal(model.predict(X), np.asarray(model.classes_)[actual.argmax(axis=1)]):
+            raise CommandError("Compiled model labels do not match sklearn")
+
+        with open(options["output"], "wb") as f:
+            np.savez(f, **arrays)
+        self.stdout.write(self.style.SUCCESS(
+            f"Verified {len(X)} golden rows; wrote compiled model to {options['output']}"
+        ))
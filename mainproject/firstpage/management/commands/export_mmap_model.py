@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+import joblib
+from django.core.management.base import BaseCommand, CommandError
+
+from ...ml import predictor
+
+# Run in a fresh interpreter so each measurement starts from a clean heap.
+# Anonymous memory is what every gunicorn worker pays for on its own;
+# memory-mapped file pages live in the page cache and are shared.
+MEASURE_SNIPPET = """
+import sys
+import joblib
+import sklearn.tree
+
+def anon_kb():
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Anonymous:'):
+                return int(line.split()[1])
+    return 0
+
+before = anon_kb()
+model = joblib.load(sys.argv[1], mmap_mode=sys.argv[2] or None)
+print(anon_kb() - before)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert academic_risk_model.pkl into an uncompressed joblib dump that "
+        "the predictor loads with mmap_mode='r', so gunicorn workers share the "
+        "model's numpy arrays instead of each holding its own copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default=predictor.model_path, help="Model pickle to convert")
+        parser.add_argument("--output", default=predictor.mmap_model_path, help="Where to write the dump")
+        parser.add_argument(
+            "--measure",
+            action="store_true",
+            help="Report per-worker anonymous memory for both formats",
+        )
+
+    def handle(self, *args, **options):
+        source = options["source"]
+        output = options["output"]
+
+        try:
+            model = joblib.load(source)
+        except Exception as e:
+            raise CommandError(f"Could not load {source}: {e}")
+
+        joblib.dump(model, output, compress=0)
+        # Make sure the dump really is mmap-able before anyone relies on it
+        joblib.load(output, mmap_mode="r")
+        self.stdout.write(self.style.SUCCESS(f"Wrote mmap-friendly model to {output}"))
+
+        if options["measure"]:
+            before = self._measure(source, "")
+            after = self._measure(output, "r")
+            self.stdout.write(f"Per-worker memory, pickle load: {before} KiB")
+            self.stdout.write(f"Per-worker memory, mmap load:   {after} KiB")
+
+    def _measure(self, path, mmap_mode):
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE_SNIPPET, path, mmap_mode],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return int(result.stdout.strip())
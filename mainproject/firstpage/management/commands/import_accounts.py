@@ -0,0 +1,75 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import account_lookup
+from ...forms import AccountForm
+from ...models import Accounts
+
+FIELDS = ["fullname", "email", "phone", "matric_number"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Register a whole intake from a CSV file (fullname, email, phone, "
+        "matric_number). Rows are validated with AccountForm and inserted with "
+        "bulk_create in batches; matric numbers that are already registered "
+        "(looked up once per batch) or repeated in the file are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file", help="CSV file with a header row")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT")
+
+    def handle(self, *args, **options):
+        try:
+            f = open(options["csv_file"], newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise CommandError(f"Could not open {options['csv_file']}: {e}")
+
+        with f:
+            reader = csv.DictReader(f)
+            missing = set(FIELDS) - set(reader.fieldnames or [])
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+
+            before = Accounts.objects.count()
+            existing = repeated = invalid = 0
+            seen = set()
+            batch = []
+            for line, row in enumerate(reader, start=2):
+                form = AccountForm({field: (row[field] or "").strip() for field in FIELDS})
+                if not form.is_valid():
+                    invalid += 1
+                    errors = "; ".join(f"{k}: {v[0]}" for k, v in form.errors.items())
+                    self.stderr.write(f"line {line}: {errors}")
+                    continue
+                matric_number = form.cleaned_data["matric_number"]
+                if matric_number in seen:
+                    repeated += 1
+                    self.stderr.write(f"line {line}: matric_number {matric_number} repeats an earlier row")
+                    continue
+                seen.add(matric_number)
+                batch.append(form.save(commit=False))
+                if len(batch) >= options["batch_size"]:
+                    existing += self._insert(batch)
+                    batch = []
+            if batch:
+                existing += self._insert(batch)
+
+        created = Accounts.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(
+            f"Registered {created} accounts; {existing} already registered, "
+            f"{repeated} repeated rows, {invalid} invalid rows"
+        ))
+
+    def _insert(self, accounts):
+        """Insert the accounts not registered yet; returns how many already were."""
+        numbers = [account.matric_number for account in accounts]
+        registered = set(Accounts.objects.filter(matric_number__in=numbers).values_list("matric_number", flat=True))
+        new = [account for account in accounts if account.matric_number not in registered]
+        # ignore_conflicts still covers a registration racing this import
+        Accounts.objects.bulk_create(new, ignore_conflicts=True)
+        # bulk_create sends no post_save, so drop any cached lookups of these numbers
+        account_lookup.invalidate(*(account.matric_number for account in new))
+        return len(registered)
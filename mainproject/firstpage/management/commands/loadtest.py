@@ -0,0 +1,304 @@
+import http.client
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import Counter
+from http.cookies import SimpleCookie
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from ...ml.synthetic import dashboard_form_data, synthetic_students
+
+# (step, method, expected status) of one student's visit, in order
+FLOW = (
+    ("register_get", "GET", 200),
+    ("register_post", "POST", 302),
+    ("login_get", "GET", 200),
+    ("login_post", "POST", 302),
+    ("dashboard_get", "GET", 200),
+    ("dashboard_post", "POST", 200),
+)
+
+
+def _ints(value):
+    return [int(v) for v in value.split(",")]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ───────────────────────────────────────────────
+# HTTP client: one per simulated student
+# ───────────────────────────────────────────────
+class VirtualUser:
+    """
+    A browser-like client on one keep-alive connection: keeps cookies and
+    sends the CSRF token from the csrftoken cookie with every form POST.
+    """
+
+    def __init__(self, host, port, timeout=30):
+        self.conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.cookies = {}
+
+    def request(self, method, path, form=None):
+        """Return (status or None on a connection error, seconds)."""
+        headers = {}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        body = None
+        if form is not None:
+            body = urllib.parse.urlencode({**form, "csrfmiddlewaretoken": self.cookies.get("csrftoken", "")})
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, path, body, headers)
+            response = self.conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            return None, time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+
+        for header in response.headers.get_all("Set-Cookie") or ():
+            for key, morsel in SimpleCookie(header).items():
+                if morsel["max-age"] == "0":
+                    self.cookies.pop(key, None)
+                else:
+                    self.cookies[key] = morsel.value
+        return response.status, elapsed
+
+    def close(self):
+        self.conn.close()
+
+
+# ───────────────────────────────────────────────
+# Local gunicorn
+# ───────────────────────────────────────────────
+class Server:
+    """gunicorn serving the project's WSGI app on a free local port."""
+
+    def __init__(self, workers, threads, env, port, log_path):
+        self.port = port
+        self.log_path = log_path
+        self.log = open(log_path, "ab")
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn", "mainproject.myproject.wsgi:application",
+                "--workers", str(workers),
+                "--threads", str(threads),
+                "--bind", f"127.0.0.1:{port}",
+                "--log-level", "warning",
+            ],
+            cwd=settings.BASE_DIR.parent,
+            env=env,
+            stdout=self.log,
+            stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self, path, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"gunicorn exited with status {self.process.returncode}:\n{self._log_tail()}")
+            user = VirtualUser("127.0.0.1", self.port, timeout=5)
+            status, _ = user.request("GET", path)
+            user.close()
+            if status == 200:
+                return
+            time.sleep(0.2)
+        raise CommandError(f"gunicorn did not answer within {timeout}s:\n{self._log_tail()}")
+
+    def _log_tail(self, lines=20):
+        self.log.flush()
+        with open(self.log_path, encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the real register -> login -> dashboard GET -> dashboard POST "
+        "flow over HTTP (cookies, CSRF tokens, course formsets) against a "
+        "local gunicorn running the project's WSGI app on a throwaway SQLite "
+        "file. Sweeps gunicorn workers x threads and client concurrency and "
+        "reports RPS against p95 latency, for sizing workers. Use --url to "
+        "load an already running server instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=_ints, default=[1, 2, 4], help="gunicorn --workers values, comma separated")
+        parser.add_argument("--threads", type=_ints, default=[1, 4], help="gunicorn --threads values, comma separated")
+        parser.add_argument("--concurrency", type=_ints, default=[4, 8, 16, 32], help="Simulated students, comma separated")
+        parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per point")
+        parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each point")
+        parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a student's requests")
+        parser.add_argument("--slo-ms", type=float, default=500.0, help="p95 target used for the capacity summary")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic students")
+        parser.add_argument("--url", help="Load this running server (e.g. http://10.0.0.5:8000) instead of starting gunicorn")
+        parser.add_argument("--save", help="Write every point of the curve to this JSON file")
+
+    def handle(self, *args, **options):
+        self.students = synthetic_students(1000, options["seed"])
+        self.paths = {
+            "register": reverse("uniguide:register"),
+            "login": reverse("uniguide:login"),
+            "dashboard": reverse("uniguide:dashboard"),
+        }
+        self.run_id = uuid.uuid4().hex[:6]
+        self.registrations = itertools.count()
+        self.stdout.write(f"{'workers':>8}{'threads':>8}{'users':>7}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+
+        points = []
+        if options["url"]:
+            target = urllib.parse.urlsplit(options["url"])
+            for concurrency in options["concurrency"]:
+                points.append(self._point(None, None, target.hostname, target.port or 80, concurrency, options))
+        else:
+            with tempfile.TemporaryDirectory() as directory:
+                env = self._server_env(os.path.join(directory, "loadtest.sqlite3"))
+                for workers in options["workers"]:
+                    for threads in options["threads"]:
+                        port = _free_port()
+                        server = Server(workers, threads, env, port, os.path.join(directory, "gunicorn.log"))
+                        try:
+                            server.wait_ready(self.paths["login"])
+                            for concurrency in options["concurrency"]:
+                                points.append(self._point(workers, threads, "127.0.0.1", port, concurrency, options))
+                        finally:
+                            server.stop()
+
+        self._summary(points, options["slo_ms"])
+        if options["save"]:
+            with open(options["save"], "w", encoding="utf-8") as f:
+                json.dump({"seed": options["seed"], "slo_ms": options["slo_ms"], "points": points}, f, indent=2)
+                f.write("\n")
+            self.stdout.write(f"Saved {options['save']}")
+
+    def _server_env(self, database):
+        """Environment for gunicorn: same settings, a fresh migrated database."""
+        root = str(settings.BASE_DIR.parent)
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "mainproject.myproject.settings"),
+            "PYTHONPATH": os.pathsep.join([root, str(settings.BASE_DIR), os.environ.get("PYTHONPATH", "")]),
+            "SQLITE_NAME": database,
+        }
+        subprocess.run(
+            [sys.executable, "-m", "django", "migrate", "--noinput", "-v", "0"],
+            cwd=root, env=env, check=True,
+        )
+        return env
+
+    # ───────────────────────────────────────────────
+    # One point of the curve
+    # ───────────────────────────────────────────────
+    def _point(self, workers, threads, host, port, concurrency, options):
+        think = options["think_ms"] / 1000
+        records = [[] for _ in range(concurrency)]  # (step, finished_at, seconds, error)
+        stop = threading.Event()
+
+        def student(i):
+            iteration = 0
+            own = records[i]
+            while not stop.is_set():
+                synthetic = self.students[(i * 7919 + iteration) % len(self.students)]
+                n = next(self.registrations)
+                matric = f"LT{self.run_id}/{n:07d}"  # fits Accounts.matric_number (20)
+                forms = {
+                    "register_post": {
+                        "fullname": "Load Test", "email": f"lt.{self.run_id}.{n}@example.com",
+                        "phone": "0800", "matric_number": matric,
+                    },
+                    "login_post": {"matric_number": matric},
+                    "dashboard_post": dashboard_form_data(synthetic),
+                }
+                user = VirtualUser(host, port)
+                for step, method, expected in FLOW:
+                    path = self.paths[step.split("_")[0]]
+                    status, seconds = user.request(method, path, forms.get(step))
+                    # An unexpected status (or "connection" for a dropped request) is an error
+                    error = None if status == expected else str(status or "connection")
+                    own.append((step, time.perf_counter(), seconds, error))
+                    if status != expected or stop.is_set():
+                        break
+                    if think:
+                        time.sleep(think)
+                user.close()
+                iteration += 1
+
+        threads_ = [threading.Thread(target=student, args=(i,), daemon=True) for i in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads_:
+            thread.start()
+        measure_from = started + options["warmup"]
+        measure_to = measure_from + options["duration"]
+        time.sleep(max(measure_to - time.perf_counter(), 0))
+        stop.set()
+        for thread in threads_:
+            thread.join()
+
+        window = [r for own in records for r in own if measure_from <= r[1] <= measure_to]
+        point = {
+            "workers": workers,
+            "threads": threads,
+            "concurrency": concurrency,
+            "requests": len(window),
+            "errors": sum(error is not None for *_, error in window),
+            "error_statuses": dict(Counter(f"{step}:{error}" for step, _, _, error in window if error)),
+            "rps": round(len(window) / options["duration"], 1),
+            **self._percentiles([seconds for _, _, seconds, _ in window]),
+            "steps": {
+                step: self._percentiles([seconds for s, _, seconds, _ in window if s == step])
+                for step, _, _ in FLOW
+            },
+        }
+        self.stdout.write(
+            f"{workers or '-':>8}{threads or '-':>8}{concurrency:>7}{point['rps']:>9.1f}"
+            f"{point['p50_ms']:>9.1f}{point['p95_ms']:>9.1f}{point['p99_ms']:>9.1f}{point['errors']:>8}"
+        )
+        return point
+
+    @staticmethod
+    def _percentiles(seconds):
+        if not seconds:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        p50, p95, p99 = np.percentile(seconds, [50, 95, 99]) * 1000
+        return {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+
+    def _summary(self, points, slo_ms):
+        """Per server config: the highest RPS reached with p95 within the SLO and no errors."""
+        self.stdout.write(f"\nCapacity at p95 <= {slo_ms:.0f} ms:")
+        configs = {}
+        for point in points:
+            configs.setdefault((point["workers"], point["threads"]), []).append(point)
+        for (workers, threads), curve in configs.items():
+            ok = [p for p in curve if p["p95_ms"] <= slo_ms and not p["errors"] and p["requests"]]
+            label = f"{workers} workers x {threads} threads" if workers else "target"
+            if ok:
+                best = max(ok, key=lambda p: p["rps"])
+                self.stdout.write(f"  {label}: {best['rps']:.1f} rps with {best['concurrency']} concurrent students")
+            else:
+                self.stdout.write(f"  {label}: no point met the target")
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...ml.predictor import FEATURE_COLUMNS
+from ...ml.store import CANDIDATE, CURRENT, ModelStore, StoreError
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage the versioned model store (settings.ML_MODEL_STORE). "
+        "`publish FILE` adds a model (checking its feature count) under its "
+        "content hash; `activate VERSION` points the running workers at it "
+        "without a restart; `candidate VERSION` makes it the model scored in "
+        "shadow mode (`candidate --clear` stops that); `list` shows every version."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["publish", "activate", "candidate", "list"])
+        parser.add_argument("target", nargs="?", help="Model file for publish, version for activate/candidate")
+        parser.add_argument("--store", help="Store directory (default: settings.ML_MODEL_STORE)")
+        parser.add_argument("--activate", action="store_true", help="publish: also make it the current version")
+        parser.add_argument("--candidate", action="store_true", help="publish: also make it the shadow candidate")
+        parser.add_argument("--clear", action="store_true", help="candidate: remove the candidate pointer")
+
+    def handle(self, *args, **options):
+        root = options["store"] or getattr(settings, "ML_MODEL_STORE", None)
+        if not root:
+            raise CommandError("Set ML_MODEL_STORE or pass --store")
+        store = ModelStore(root, FEATURE_COLUMNS)
+        action, target = options["action"], options["target"]
+        if action != "list" and not target and not (action == "candidate" and options["clear"]):
+            raise CommandError(f"{action} needs a {'model file' if action == 'publish' else 'version'}")
+
+        try:
+            if action == "publish":
+                manifest = store.publish(target)
+                self.stdout.write(self.style.SUCCESS(
+                    f"Published {manifest['version']} ({manifest['model_type']}, classes {', '.join(manifest['classes'])})"
+                ))
+                if options["activate"]:
+                    self._point(store, CURRENT, manifest["version"])
+                if options["candidate"]:
+                    self._point(store, CANDIDATE, manifest["version"])
+            elif action == "activate":
+                self._point(store, CURRENT, target)
+            elif action == "candidate":
+                self._point(store, CANDIDATE, None if options["clear"] else target)
+            else:
+                self._list(store)
+        except (StoreError, OSError) as e:
+            raise CommandError(str(e))
+
+    def _point(self, store, pointer, version):
+        previous = store.read_pointer(pointer)
+        store.set_pointer(pointer, version)
+        self.stdout.write(f"{pointer}: {previous or '-'} -> {version or '-'}")
+
+    def _list(self, store):
+        pointers = {name: store.read_pointer(name) for name in (CURRENT, CANDIDATE)}
+        versions = store.versions()
+        if not versions:
+            self.stdout.write(f"No models in {store.root}")
+        for manifest in versions:
+            tags = [name for name, version in pointers.items() if version == manifest["version"]]
+            self.stdout.write(
+                f"{manifest['version']}  {manifest['created']}  {manifest['model_type']:<24}"
+                f"{manifest['source']}  {' '.join(tags)}"
+            )
@@ -0,0 +1,212 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from ...ml.predictor import model_version
+from ...ml.scoring import INPUT_COLUMNS, OUTPUT_COLUMNS, REQUIRED_COLUMNS, flatten_for_file, score_frame
+from ...models import Accounts, AnalysisResult
+
+# Text columns are read as strings so course codes and matric numbers keep
+# their leading zeros and "3.1, 2.9" trends are not split by type inference.
+CSV_DTYPES = {"matric_number": str, "cgpa_trend": str, "past_courses": str, "current_courses": str}
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise CommandError("Parquet input/output needs pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+# ───────────────────────────────────────────────
+# Streaming readers: one DataFrame per chunk
+# ───────────────────────────────────────────────
+def read_columns(path):
+    """Column names of the input file, read from its header/schema only."""
+    if _is_parquet(path):
+        return _import_pyarrow().parquet.ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_chunks(path, chunksize):
+    """Yield DataFrames of at most `chunksize` rows, indexed by row number."""
+    if _is_parquet(path):
+        pyarrow = _import_pyarrow()
+        parquet = pyarrow.parquet.ParquetFile(path)
+        columns = [c for c in INPUT_COLUMNS if c in parquet.schema_arrow.names]
+        offset = 0
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            frame = batch.to_pandas()
+            frame.index = pd.RangeIndex(offset, offset + len(frame))
+            offset += len(frame)
+            yield frame
+        return
+
+    # The row index of each chunk carries on from the previous one
+    yield from pd.read_csv(
+        path,
+        chunksize=chunksize,
+        dtype=CSV_DTYPES,
+        keep_default_na=False,
+        usecols=lambda column: column in INPUT_COLUMNS,
+    )
+
+
+# ───────────────────────────────────────────────
+# Incremental writers
+# ───────────────────────────────────────────────
+class CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.header = True
+
+    def write(self, scored):
+        flatten_for_file(scored).to_csv(self.file, header=self.header, index=False, columns=OUTPUT_COLUMNS)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path):
+        self.pyarrow = _import_pyarrow()
+        self.path = path
+        self.writer = None
+
+    def write(self, scored):
+        flat = flatten_for_file(scored)[OUTPUT_COLUMNS]
+        for column in ("level", "ml_confidence"):
+            flat[column] = pd.to_numeric(flat[column])
+        table = self.pyarrow.Table.from_pandas(flat, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class DatabaseWriter:
+    """bulk_create an AnalysisResult per scored student, matched to Accounts by matric number."""
+
+    def __init__(self, version):
+        self.version = version
+        self.skipped = 0
+
+    def write(self, scored):
+        scored = scored[scored["status_code"] == 200]
+        accounts = dict(
+            Accounts.objects.filter(matric_number__in=set(scored["matric_number"].dropna()))
+            .values_list("matric_number", "id")
+        )
+        rows = []
+        for row in scored.itertuples(index=False):
+            account_id = accounts.get(row.matric_number)
+            if account_id is None:
+                self.skipped += 1
+                continue
+            rows.append(AnalysisResult.from_analysis(account_id, row.level, row.cgpa, {
+                "risk_level": row.risk_level,
+                "cgpa_status": row.cgpa_status,
+                "cgpa_trend": row.cgpa_trend,
+                "trend_description": row.trend_description,
+                "cautions": row.cautions,
+                "suggestions": row.suggestions,
+                "explanation": row.explanation,
+                "ml_risk_level": row.ml_risk_level,
+                "ml_confidence": row.ml_confidence,
+            }, self.version))
+        AnalysisResult.objects.bulk_create(rows, batch_size=1000)
+
+    def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Score a registry CSV/Parquet file of students in chunks: the vectorized "
+        "rules plus the ML model, written incrementally to CSV/Parquet or to "
+        "AnalysisResult rows. Memory stays constant regardless of file size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="CSV or Parquet file (columns: %s)" % ", ".join(INPUT_COLUMNS))
+        parser.add_argument("--output", help="CSV or Parquet file to write the results to")
+        parser.add_argument(
+            "--database",
+            action="store_true",
+            help="Store results as AnalysisResult rows (matched to Accounts by matric_number)",
+        )
+        parser.add_argument("--chunksize", type=int, default=10000, help="Rows per chunk")
+        parser.add_argument("--workers", type=int, default=1, help="Processes scoring chunks in parallel")
+
+    def handle(self, *args, **options):
+        if bool(options["output"]) == options["database"]:
+            raise CommandError("Pass exactly one of --output or --database")
+        if not os.path.exists(options["input"]):
+            raise CommandError(f"{options['input']} does not exist")
+        try:
+            columns = read_columns(options["input"])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read the columns of {options['input']}: {e}")
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise CommandError(f"{options['input']} is missing required columns: {', '.join(missing)}")
+
+        if options["database"]:
+            writer = DatabaseWriter(model_version())
+        elif _is_parquet(options["output"]):
+            writer = ParquetWriter(options["output"])
+        else:
+            writer = CsvWriter(options["output"])
+
+        chunks = read_chunks(options["input"], options["chunksize"])
+        self.started = time.perf_counter()
+        self.rows = 0
+        try:
+            if options["workers"] > 1:
+                self._score_parallel(chunks, writer, options["workers"])
+            else:
+                for chunk in chunks:
+                    self._write(writer, score_frame(chunk))
+        finally:
+            writer.close()
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {self.rows} students in {elapsed:.1f}s ({self.rows / max(elapsed, 1e-9):.0f} rows/s)"
+        ))
+        if options["database"] and writer.skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped {writer.skipped} students with no matching account"))
+
+    def _score_parallel(self, chunks, writer, workers):
+        # At most two chunks per worker are in flight, and results are written
+        # in input order, so memory does not grow with the file.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(score_frame, chunk))
+                if len(pending) >= workers * 2:
+                    self._write(writer, pending.popleft().result())
+            while pending:
+                self._write(writer, pending.popleft().result())
+
+    def _write(self, writer, scored):
+        writer.write(scored)
+        self.rows += len(scored)
+        elapsed = time.perf_counter() - self.started
+        self.stderr.write(f"{self.rows} rows, {self.rows / max(elapsed, 1e-9):.0f} rows/s")
@@ -0,0 +1,46 @@
+import base64
+import hashlib
+import os
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...assets import STATIC_DIR, VENDOR_ASSETS
+
+
+def _sri(content, algorithm):
+    return f"{algorithm}-" + base64.b64encode(hashlib.new(algorithm, content).digest()).decode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Download the pinned third-party assets (assets.VENDOR_ASSETS) into "
+        "firstpage/static so they are served by WhiteNoise with fingerprinted, "
+        "far-future cached URLs. Each file is checked against its SRI hash. "
+        "Run collectstatic afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Download files that are already vendored")
+
+    def handle(self, *args, **options):
+        for name, asset in VENDOR_ASSETS.items():
+            target = os.path.join(STATIC_DIR, asset["path"])
+            if os.path.exists(target) and not options["force"]:
+                self.stdout.write(f"{name}: already vendored")
+                continue
+
+            try:
+                with urllib.request.urlopen(asset["url"], timeout=30) as response:
+                    content = response.read()
+            except OSError as e:
+                raise CommandError(f"Could not download {asset['url']}: {e}")
+
+            algorithm = asset["integrity"].split("-", 1)[0]
+            if _sri(content, algorithm) != asset["integrity"]:
+                raise CommandError(f"{name}: downloaded file does not match its integrity hash")
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(content)
+            self.stdout.write(self.style.SUCCESS(f"{name}: {len(content)} bytes -> {target}"))
@@ -0,0 +1,300 @@
+"""
+In-process Metrics
+Counters and latency histograms for the dashboard pipeline, rendered in the
+Prometheus text format at /metrics.
+
+Each process keeps its own numbers. When settings.METRICS_DIR is set (one
+directory shared by every gunicorn worker), each process also dumps its state
+there at most once per `flush_interval` and when it exits, and /metrics merges
+all the dumps so any worker can answer for the whole server.
+
+Dumps are named by pid and process start time, so a worker that reuses a dead
+worker's pid does not overwrite its numbers. The dumps of processes that have
+exited are folded into a single metrics_exited.json, which keeps the merged
+counters monotonic without the directory growing with every worker restart.
+"""
+import atexit
+import bisect
+import glob
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+
+# Upper bounds in seconds: 0.1 ms doubling by √2 up to ~100 s, fine enough
+# for p50/p95/p99 estimates.
+BUCKETS = tuple(0.0001 * math.sqrt(2) ** i for i in range(41))
+QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_HELP = {
+    "uniguide_requests_total": ("counter", "Requests handled, by view and status code."),
+    "uniguide_request_errors_total": ("counter", "Requests that raised or returned a 5xx, by view."),
+    "uniguide_request_duration_seconds": ("histogram", "Total request latency, by view."),
+    "uniguide_stage_duration_seconds": ("histogram", "Dashboard pipeline stage latency, by stage."),
+    "uniguide_analysis_cache_total": ("counter", "Analysis result cache lookups, by result (hit/miss)."),
+    "uniguide_inference_rejected_total": ("counter", "Analysis jobs rejected because the inference executor was full."),
+    "uniguide_shadow_predictions_total": ("counter", "Rows scored by the shadow candidate model, by result (agree/disagree)."),
+}
+
+
+EXITED = "metrics_exited.json"
+_DUMP_NAME = re.compile(r"metrics_(\d+)_(\d+)\.json$")
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+def _merge(into, other):
+    for key, value in other.get("counters", {}).items():
+        into["counters"][key] = into["counters"].get(key, 0) + value
+    for key, hist in other.get("histograms", {}).items():
+        mine = into["histograms"].setdefault(key, {"counts": [0] * (len(BUCKETS) + 1), "sum": 0.0})
+        mine["counts"] = [a + b for a, b in zip(mine["counts"], hist["counts"])]
+        mine["sum"] += hist["sum"]
+
+
+def _read_dump(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_dump(directory, path, data):
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics_", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+class MetricsRegistry:
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._started = time.time_ns()
+        self._last_flush = 0.0
+        self._counters = {}
+        self._histograms = {}
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        # Numbers inherited from the master belong to the master
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._started = time.time_ns()
+        self._last_flush = 0.0
+        self._counters = {}
+        self._histograms = {}
+
+    # ───────────────────────────────────────────────
+    # Recording
+    # ───────────────────────────────────────────────
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._maybe_flush()
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"counts": [0] * (len(BUCKETS) + 1), "sum": 0.0}
+            hist["counts"][index] += 1
+            hist["sum"] += seconds
+        self._maybe_flush()
+
+    # ───────────────────────────────────────────────
+    # Multiprocess sharing
+    # ───────────────────────────────────────────────
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {k: {"counts": list(v["counts"]), "sum": v["sum"]} for k, v in self._histograms.items()},
+            }
+
+    def _path(self):
+        return os.path.join(self.directory, f"metrics_{self._pid}_{self._started}.json")
+
+    def _maybe_flush(self):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.flush()
+
+    def flush(self):
+        """Write this process's numbers to the shared directory (atomically)."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        _write_dump(self.directory, self._path(), self.snapshot())
+
+    def collect(self):
+        """Merge this process's live numbers with every other process's dump."""
+        merged = self.snapshot()
+        if not self.directory:
+            return merged
+        self._fold_exited()
+        own = self._path()
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.json")):
+            if path == own:
+                continue
+            other = _read_dump(path)
+            if other is not None:
+                _merge(merged, other)
+        return merged
+
+    def _fold_exited(self):
+        """Move the dumps of processes that have exited into EXITED."""
+        exited = []
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.json")):
+            match = _DUMP_NAME.search(os.path.basename(path))
+            if match is None:
+                continue
+            pid, started = int(match.group(1)), int(match.group(2))
+            if pid == self._pid:
+                if started != self._started:
+                    exited.append(path)  # an earlier process with our pid
+            elif not _pid_alive(pid):
+                exited.append(path)
+        if not exited:
+            return
+
+        import fcntl
+
+        # Serialized across workers, so each dump is folded in exactly once
+        with open(os.path.join(self.directory, ".metrics.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            target = os.path.join(self.directory, EXITED)
+            total = _read_dump(target) or {"counters": {}, "histograms": {}}
+            folded = []
+            for path in exited:
+                other = _read_dump(path)
+                if other is not None:  # None: already folded by another worker
+                    _merge(total, other)
+                    folded.append(path)
+            if folded:
+                _write_dump(self.directory, target, total)
+                for path in folded:
+                    os.remove(path)
+
+    # ───────────────────────────────────────────────
+    # Prometheus text format
+    # ───────────────────────────────────────────────
+    def render(self):
+        data = self.collect()
+        families = {}
+        for key, value in data["counters"].items():
+            name, labels = json.loads(key)
+            families.setdefault(name, []).append((labels, value))
+        for key, hist in data["histograms"].items():
+            name, labels = json.loads(key)
+            families.setdefault(name, []).append((labels, hist))
+
+        lines = []
+        for name in sorted(families):
+            kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(families[name], key=lambda item: item[0]):
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (math.inf,), value["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else f"{bound:.6g}"
+                    lines.append(f"{name}_bucket{_format_labels(labels + [['le', le]])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+            if kind == "histogram":
+                lines.append(f"# HELP {name}_quantile Estimated {', '.join(f'p{int(q * 100)}' for q in QUANTILES)} of {name}.")
+                lines.append(f"# TYPE {name}_quantile gauge")
+                for labels, value in sorted(families[name], key=lambda item: item[0]):
+                    for q in QUANTILES:
+                        estimate = quantile(value["counts"], q)
+                        lines.append(f"{name}_quantile{_format_labels(labels + [['quantile', str(q)]])} {estimate:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def quantile(counts, q):
+    """Estimate a quantile from bucket counts by interpolating inside the bucket."""
+    total = sum(counts)
+    if total == 0:
+        return 0.0
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if count and cumulative + count >= rank:
+            lower = BUCKETS[i - 1] if i > 0 else 0.0
+            upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+    return BUCKETS[-1]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The process-wide registry, configured from settings.METRICS_DIR."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from django.conf import settings
+                _registry = MetricsRegistry(getattr(settings, "METRICS_DIR", None))
+                if _registry.directory:
+                    # Numbers since the last periodic flush (forked workers inherit this)
+                    atexit.register(_registry.flush)
+    return _registry
+
+
+def inc(name, value=1, **labels):
+    get_registry().inc(name, value, **labels)
+
+
+def observe(name, seconds, **labels):
+    get_registry().observe(name, seconds, **labels)
+
+
+def observe_stages(timer):
+    """Feed a StageTimer's durations into the stage histogram."""
+    for stage, seconds in timer.durations.items():
+        observe("uniguide_stage_duration_seconds", seconds, stage=stage)
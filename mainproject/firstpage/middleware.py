@@ -0,0 +1,103 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+
+
+class TimingMiddleware:
+    """
+    Records the latency, status and errors of every request, labelled by the
+    resolved view name, into the in-process metrics registry.
+
+    Works in both sync (WSGI) and async (ASGI) stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self._record(request, start, 500)
+            raise
+        self._record(request, start, response.status_code)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        except Exception:
+            self._record(request, start, 500)
+            raise
+        self._record(request, start, response.status_code)
+        return response
+
+    def _record(self, request, start, status_code):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unresolved"
+        metrics.observe("uniguide_request_duration_seconds", time.perf_counter() - start, view=view)
+        metrics.inc("uniguide_requests_total", view=view, status=str(status_code))
+        if status_code >= 500:
+            metrics.inc("uniguide_request_errors_total", view=view)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can also sit in an async stack.
+
+    Stock WhiteNoiseMiddleware is sync-only, so under ASGI Django would run it
+    (and everything below it) through a single sync thread, serializing every
+    request. Here only non-static requests are passed on, awaited. The static
+    file lookup is a dict access, except with autorefresh (DEBUG), where it
+    stats the filesystem and runs in a thread. Opening and reading the file
+    also happen in threads, and the file is streamed as an async iterator,
+    so the ASGI handler neither buffers it nor blocks the event loop.
+    """
+    block_size = 64 * 1024
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        response = await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        # The file stays registered for closing with the response
+        response.streaming_content = self._aread(response.file_to_stream)
+        return response
+
+    async def _aread(self, file):
+        if file is None:  # HEAD, 304
+            return
+        read = sync_to_async(file.read, thread_sensitive=False)
+        try:
+            while chunk := await read(self.block_size):
+                yield chunk
+        finally:
+            file.close()
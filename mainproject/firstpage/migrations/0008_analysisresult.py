@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firstpage', '0007_remove_student_user_delete_studentprofile_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('level', models.PositiveSmallIntegerField()),
+                ('cgpa', models.FloatField()),
+                ('risk_level', models.PositiveSmallIntegerField(choices=[(0, 'Excellent'), (1, 'Good'), (2, 'Moderate'), (3, 'At Risk'), (4, 'High Risk')])),
+                ('trend', models.PositiveSmallIntegerField(choices=[(0, 'Not enough data'), (1, 'Stable'), (2, 'Improving'), (3, 'Declining')])),
+                ('ml_risk_level', models.PositiveSmallIntegerField(choices=[(0, 'Low'), (1, 'Medium'), (2, 'High')], null=True)),
+                ('ml_confidence', models.FloatField(null=True)),
+                ('model_version', models.CharField(blank=True, max_length=12)),
+                ('messages', models.JSONField(default=dict)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_results', to='firstpage.accounts')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['account', 'created_at'], name='analysis_account_created_idx'), models.Index(fields=['risk_level', 'created_at'], name='analysis_risk_created_idx')],
+            },
+        ),
+    ]
@@ -3,230 +3,324 @@ Academic Analysis Logic
 This module contains the rule-based logic for analyzing student academic performance
 and providing recommendations, cautions, and suggestions.
 Combines Claude's enhanced risk assessment with C# trend analysis logic.
+
+The advising rules are written as declarative tables (CGPA band → risk level →
+messages, trend → description) and compiled once at import into a lookup of
+ready-made plans, so each analysis is a couple of dictionary lookups plus a
+single pass over the current courses.
 """
+import numbers
+
+from .trend import CgpaTrend
+
+# ═══════════════════════════════════════════════════════
+# RULE TABLES
+# ═══════════════════════════════════════════════════════
+
+# Allowed number of past / current courses
+MIN_COURSES = 6
+MAX_COURSES = 9
+
+# Trend significance threshold (change between the last two CGPAs)
+SIGNIFICANT_TREND_CHANGE = 0.3
+
+# trend key → (cgpa_trend, trend_description)
+TREND_RULES = {
+    'excellent': ('Stable', '📊 Maintaining excellent performance'),
+    'improving_fast': ('Improving', '📈 CGPA is improving significantly - keep up the good work!'),
+    'improving': ('Improving', '📈 CGPA is improving steadily'),
+    'declining_fast': ('Declining', '⚠️ WARNING: CGPA is declining significantly'),
+    'declining': ('Declining', '⚠️ CGPA is declining - needs attention'),
+    'stable': ('Stable', '📊 CGPA trend is stable'),
+    'no_data': ('Not enough data', 'Not enough trend data available'),
+}
+
+DEFAULT_EXPLANATION = (
+    "This analysis considers GPA/CGPA level, CGPA trend progression, "
+    "course load constraints, and standard university advising principles."
+)
+
+# Checked top to bottom; the first band whose min_cgpa the CGPA reaches wins.
+#   warn_trend          repeat the trend description as a caution when declining
+#   warn_carried_over   add a caution for carried over courses
+#   declining           extra (cautions, suggestions) added when the trend is declining
+#   trend_override      trend key used whenever there is enough trend data
+#   scan_courses        whether current course statuses are counted
+RISK_BANDS = (
+    {
+        'min_cgpa': 4.5,
+        'risk_level': 'Excellent',
+        'cgpa_status': 'Outstanding performance',
+        'trend_override': 'excellent',
+        'scan_courses': False,
+        'warn_trend': False,
+        'warn_carried_over': False,
+        'declining': ((), ()),
+        'cautions': (),
+        'suggestions': (
+            "Outstanding academic performance. You are doing excellently well — maintain consistency, "
+            "discipline, and healthy study habits.",
+        ),
+        'explanation': (
+            "Student demonstrates excellent academic performance based on GPA/CGPA and sustained results."
+        ),
+    },
+    {
+        'min_cgpa': 3.5,
+        'risk_level': 'Good',
+        'cgpa_status': 'Above average performance',
+        'trend_override': None,
+        'scan_courses': True,
+        'warn_trend': False,
+        'warn_carried_over': False,
+        'declining': ((), ()),
+        'cautions': (),
+        'suggestions': (
+            "Maintain your current study habits",
+            "Consider taking on leadership roles in student organizations",
+            "Explore research opportunities or advanced courses",
+        ),
+        'explanation': DEFAULT_EXPLANATION,
+    },
+    {
+        'min_cgpa': 2.5,
+        'risk_level': 'Moderate',
+        'cgpa_status': 'Average performance - room for improvement',
+        'trend_override': None,
+        'scan_courses': True,
+        'warn_trend': False,
+        'warn_carried_over': False,
+        'declining': (
+            ("Your academic performance shows signs of decline.",),
+            ("Increase study time, review weak subjects, and seek academic support early.",),
+        ),
+        'cautions': (),
+        'suggestions': (
+            "Focus on improving grades in core courses",
+            "Participate actively in class discussions",
+            "Form study groups with high-performing peers",
+            "Maintain a balanced study routine and prioritize core departmental courses",
+        ),
+        'explanation': DEFAULT_EXPLANATION,
+    },
+    {
+        'min_cgpa': 2.0,
+        'risk_level': 'At Risk',
+        'cgpa_status': 'Below average - needs attention',
+        'trend_override': None,
+        'scan_courses': True,
+        'warn_trend': True,
+        'warn_carried_over': True,
+        'declining': ((), ()),
+        'cautions': ("Academic performance needs attention.",),
+        'suggestions': (
+            "Schedule a meeting with your academic advisor",
+            "Join study groups for challenging courses",
+            "Utilize office hours with professors",
+            "Review time management and study strategies",
+        ),
+        'explanation': DEFAULT_EXPLANATION,
+    },
+    {
+        'min_cgpa': None,
+        'risk_level': 'High Risk',
+        'cgpa_status': 'Critical - immediate intervention needed',
+        'trend_override': None,
+        'scan_courses': True,
+        'warn_trend': True,
+        'warn_carried_over': True,
+        'declining': ((), ()),
+        'cautions': ("⚠️ CRITICAL: High academic risk detected.",),
+        'suggestions': (
+            "URGENT: Meet with your academic advisor this week",
+            "Consider academic probation support services",
+            "Reduce course load where possible, focus on core courses",
+            "Develop a detailed study schedule with achievable goals",
+            "Explore tutoring resources available in your department",
+        ),
+        'explanation': DEFAULT_EXPLANATION,
+    },
+)
+
+CARRIED_OVER_CAUTION = (
+    "You have {count} carried over course(s). "
+    "Prioritize these to avoid accumulation."
+)
+
+
+# ═══════════════════════════════════════════════════════
+# RULE COMPILATION (runs once at import)
+# ═══════════════════════════════════════════════════════
+def _compile_rules(bands, trend_rules):
+    """
+    Precompute every (risk level, trend key) combination into a plan tuple:
+    (cgpa_status, cgpa_trend, trend_description, cautions_before_carried_over,
+     warn_carried_over, cautions_after_carried_over, suggestions, explanation,
+     scan_courses)
+    """
+    thresholds = []
+    plans = {}
+    for band in bands:
+        level = band['risk_level']
+        thresholds.append((band['min_cgpa'], level, band['trend_override']))
+        for trend_key, (cgpa_trend, description) in trend_rules.items():
+            declining = cgpa_trend == 'Declining'
+            decline_cautions, decline_suggestions = band['declining'] if declining else ((), ())
+            before = (description,) if (declining and band['warn_trend']) else ()
+            plans[level, trend_key] = (
+                band['cgpa_status'],
+                cgpa_trend,
+                description,
+                before,
+                band['warn_carried_over'],
+                decline_cautions + band['cautions'],
+                decline_suggestions + band['suggestions'],
+                band['explanation'],
+                band['scan_courses'],
+            )
+    return tuple(thresholds), plans
+
+
+_THRESHOLDS, _PLANS = _compile_rules(RISK_BANDS, TREND_RULES)
+
+
+def _risk_band(cgpa):
+    """Return (risk_level, trend_override) for a CGPA."""
+    for min_cgpa, level, override in _THRESHOLDS:
+        if min_cgpa is None or cgpa >= min_cgpa:
+            break
+    return level, override
+
+
+def _parse_trend(cgpa_trend):
+    """Return the CGPA history as a sequence, parsing strings once via CgpaTrend."""
+    if isinstance(cgpa_trend, CgpaTrend):
+        return cgpa_trend.values
+    if isinstance(cgpa_trend, str):
+        return CgpaTrend.parse(cgpa_trend).values
+    if isinstance(cgpa_trend, list):
+        return cgpa_trend
+    return []
+
+
+def _trend_key(trend_list, override):
+    if len(trend_list) < 2:
+        return 'no_data'
+    if override is not None:
+        return override
+    last = trend_list[-1]
+    prev = trend_list[-2]
+    if last > prev:
+        return 'improving_fast' if last - prev > SIGNIFICANT_TREND_CHANGE else 'improving'
+    if last < prev:
+        return 'declining_fast' if prev - last > SIGNIFICANT_TREND_CHANGE else 'declining'
+    return 'stable'
+
+
+def _count_statuses(courses):
+    """Count current courses by lower-cased status in a single pass."""
+    counts = {}
+    for c in courses:
+        status = c.get('status', '').lower()
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def _validate(cgpa, past_courses, current_courses):
+    # "not 0 <= cgpa" also rejects NaN
+    if not isinstance(cgpa, numbers.Real) or not 0 <= cgpa <= 5.0:
+        return 'GPA/CGPA must be between 0.00 and 5.00'
+    if len(past_courses) < MIN_COURSES or len(past_courses) > MAX_COURSES:
+        return f'Past courses must be between {MIN_COURSES} and {MAX_COURSES}'
+    if len(current_courses) < MIN_COURSES or len(current_courses) > MAX_COURSES:
+        return f'Current courses must be between {MIN_COURSES} and {MAX_COURSES}'
+    return None
+
 
 def analyse_student(data):
     """
     Analyzes student academic data and returns recommendations.
-    
+
     Args:
         data (dict): Contains gpa_cgpa, cgpa_trend, department, past_courses, current_courses
-        
+
     Returns:
         tuple: (result_dict, status_code)
     """
     try:
         cgpa = data.get('gpa_cgpa', 0)
         cgpa_trend = data.get('cgpa_trend', '')
-        department = data.get('department', '')
         past_courses = data.get('past_courses', [])
         current_courses = data.get('current_courses', [])
-        
+
         # ═══════════════════════════════════════════════════════
         # VALIDATION
         # ═══════════════════════════════════════════════════════
-        if cgpa < 0 or cgpa > 5.0:
-            return {
-                'error': 'GPA/CGPA must be between 0.00 and 5.00',
-                'risk_level': 'Unknown'
-            }, 400
-        
-        if len(past_courses) < 6 or len(past_courses) > 9:
+        error = _validate(cgpa, past_courses, current_courses)
+        if error:
             return {
-                'error': 'Past courses must be between 6 and 9',
+                'error': error,
                 'risk_level': 'Unknown'
             }, 400
-        
-        if len(current_courses) < 6 or len(current_courses) > 9:
-            return {
-                'error': 'Current courses must be between 6 and 9',
-                'risk_level': 'Unknown'
-            }, 400
-        
-        # Initialize result dictionary
-        result = {
-            'risk_level': '',
-            'cgpa_status': '',
-            'cgpa_trend': '',
-            'trend_description': '',
-            'cautions': [],
-            'suggestions': [],
-            'explanation': ''
-        }
-        
-        # ═══════════════════════════════════════════════════════
-        # 1. RISK LEVEL ASSESSMENT (Claude's version)
-        # ═══════════════════════════════════════════════════════
-        if cgpa >= 4.5:
-            result['risk_level'] = 'Excellent'
-            result['cgpa_status'] = 'Outstanding performance'
-        elif cgpa >= 3.5:
-            result['risk_level'] = 'Good'
-            result['cgpa_status'] = 'Above average performance'
-        elif cgpa >= 2.5:
-            result['risk_level'] = 'Moderate'
-            result['cgpa_status'] = 'Average performance - room for improvement'
-        elif cgpa >= 2.0:
-            result['risk_level'] = 'At Risk'
-            result['cgpa_status'] = 'Below average - needs attention'
-        else:
-            result['risk_level'] = 'High Risk'
-            result['cgpa_status'] = 'Critical - immediate intervention needed'
-        
-        # ═══════════════════════════════════════════════════════
-        # 2. CGPA TREND ANALYSIS (C# logic + Claude's descriptions)
-        # ═══════════════════════════════════════════════════════
-        trend_list = []
-        if isinstance(cgpa_trend, str):
-            for x in cgpa_trend.split(','):
-                try:
-                    trend_list.append(float(x.strip()))
-                except ValueError:
-                    pass
-        elif isinstance(cgpa_trend, list):
-            trend_list = cgpa_trend
-        
-        if len(trend_list) >= 2:
-            last = trend_list[-1]
-            prev = trend_list[-2]
-            
-            # Always stable for excellent performance (C# logic)
-            if cgpa >= 4.50:
-                result['cgpa_trend'] = 'Stable'
-                result['trend_description'] = '📊 Maintaining excellent performance'
-            elif last > prev:
-                result['cgpa_trend'] = 'Improving'
-                trend_change = last - prev
-                if trend_change > 0.3:
-                    result['trend_description'] = '📈 CGPA is improving significantly - keep up the good work!'
-                else:
-                    result['trend_description'] = '📈 CGPA is improving steadily'
-            elif last < prev:
-                result['cgpa_trend'] = 'Declining'
-                trend_change = prev - last
-                if trend_change > 0.3:
-                    result['trend_description'] = '⚠️ WARNING: CGPA is declining significantly'
-                else:
-                    result['trend_description'] = '⚠️ CGPA is declining - needs attention'
-            else:
-                result['cgpa_trend'] = 'Stable'
-                result['trend_description'] = '📊 CGPA trend is stable'
-        else:
-            result['cgpa_trend'] = 'Not enough data'
-            result['trend_description'] = 'Not enough trend data available'
-        
-        # ═══════════════════════════════════════════════════════
-        # 3. EXCELLENT PERFORMANCE (4.50 - 5.00) - Return Early
-        # ═══════════════════════════════════════════════════════
-        if cgpa >= 4.50:
-            result['suggestions'].append(
-                "Outstanding academic performance. You are doing excellently well — maintain consistency, "
-                "discipline, and healthy study habits."
-            )
-            result['explanation'] = (
-                "Student demonstrates excellent academic performance based on GPA/CGPA and sustained results."
-            )
-            # ✅ No cautions for excellent students
-            return result, 200
-        
-        # ═══════════════════════════════════════════════════════
-        # 4. CURRENT COURSE STATUS ANALYSIS
-        # ═══════════════════════════════════════════════════════
-        registered_count = sum(1 for c in current_courses if c.get('status', '').lower() == 'registered')
-        in_progress_count = sum(1 for c in current_courses if c.get('status', '').lower() == 'in progress')
-        carried_over_count = sum(1 for c in current_courses if c.get('status', '').lower() == 'carried over')
-        
-        # ═══════════════════════════════════════════════════════
-        # 5. CAUTIONS - ONLY FOR "AT RISK" AND "HIGH RISK"
-        # ═══════════════════════════════════════════════════════
-        if result['risk_level'] in ['At Risk', 'High Risk']:
-            # Add trend description as caution if declining
-            if result['cgpa_trend'] == 'Declining':
-                result['cautions'].append(result['trend_description'])
-            
-            # Carried over courses caution
-            if carried_over_count > 0:
-                result['cautions'].append(
-                    f"You have {carried_over_count} carried over course(s). "
-                    "Prioritize these to avoid accumulation."
-                )
-        
-        # ═══════════════════════════════════════════════════════
-        # 6. MODERATE RISK + DECLINING TREND (Special case)
-        # ═══════════════════════════════════════════════════════
-        if result['risk_level'] == 'Moderate' and result['cgpa_trend'] == 'Declining':
-            result['cautions'].append(
-                "Your academic performance shows signs of decline."
-            )
-            result['suggestions'].append(
-                "Increase study time, review weak subjects, and seek academic support early."
-            )
-        
-        # ═══════════════════════════════════════════════════════
-        # 7. AT RISK HANDLING
-        # ═══════════════════════════════════════════════════════
-        if result['risk_level'] == 'At Risk':
-            result['cautions'].append(
-                "Academic performance needs attention."
-            )
-            result['suggestions'].extend([
-                "Schedule a meeting with your academic advisor",
-                "Join study groups for challenging courses",
-                "Utilize office hours with professors",
-                "Review time management and study strategies"
-            ])
-        
-        # ═══════════════════════════════════════════════════════
-        # 8. HIGH RISK HANDLING
-        # ═══════════════════════════════════════════════════════
-        if result['risk_level'] == 'High Risk':
-            result['cautions'].append(
-                "⚠️ CRITICAL: High academic risk detected."
-            )
-            result['suggestions'].extend([
-                "URGENT: Meet with your academic advisor this week",
-                "Consider academic probation support services",
-                "Reduce course load where possible, focus on core courses",
-                "Develop a detailed study schedule with achievable goals",
-                "Explore tutoring resources available in your department"
-            ])
-        
+
         # ═══════════════════════════════════════════════════════
-        # 9. RISK-SPECIFIC SUGGESTIONS
+        # RISK LEVEL + TREND → COMPILED PLAN
         # ═══════════════════════════════════════════════════════
-        if result['risk_level'] == 'Good':
-            result['suggestions'].extend([
-                "Maintain your current study habits",
-                "Consider taking on leadership roles in student organizations",
-                "Explore research opportunities or advanced courses"
-            ])
-        
-        if result['risk_level'] == 'Moderate':
-            result['suggestions'].extend([
-                "Focus on improving grades in core courses",
-                "Participate actively in class discussions",
-                "Form study groups with high-performing peers",
-                "Maintain a balanced study routine and prioritize core departmental courses"
-            ])
-        
+        risk_level, trend_override = _risk_band(cgpa)
+        trend_key = _trend_key(_parse_trend(cgpa_trend), trend_override)
+        (cgpa_status, trend, description, before, warn_carried_over,
+         after, suggestions, explanation, scan_courses) = _PLANS[risk_level, trend_key]
+
         # ═══════════════════════════════════════════════════════
-        # 10. EXPLANATION
+        # CURRENT COURSE STATUS (single pass)
         # ═══════════════════════════════════════════════════════
-        result['explanation'] = (
-            "This analysis considers GPA/CGPA level, CGPA trend progression, "
-            "course load constraints, and standard university advising principles."
-        )
-        
-        return result, 200
-        
-    except Exception as e:
+        cautions = list(before)
+        if scan_courses:
+            carried_over_count = _count_statuses(current_courses).get('carried over', 0)
+            if warn_carried_over and carried_over_count > 0:
+                cautions.append(CARRIED_OVER_CAUTION.format(count=carried_over_count))
+        cautions.extend(after)
+
         return {
-            'error': f'Analysis failed: {str(e)}',
-            'risk_level': 'Unknown',
-            'cgpa_trend': 'Unknown',
-            'cgpa_status': 'Unknown',
-            'trend_description': '',
-            'cautions': [],
-            'suggestions': [],
-            'explanation': 'Unable to analyze data due to an error'
-        }, 500
+            'risk_level': risk_level,
+            'cgpa_status': cgpa_status,
+            'cgpa_trend': trend,
+            'trend_description': description,
+            'cautions': cautions,
+            'suggestions': list(suggestions),
+            'explanation': explanation
+        }, 200
+
+    except Exception as e:
+        return _analysis_failed(e)
+
+
+def _analysis_failed(error):
+    """analyse_student's result for data that passed validation but could not be analysed."""
+    return {
+        'error': f'Analysis failed: {str(error)}',
+        'risk_level': 'Unknown',
+        'cgpa_trend': 'Unknown',
+        'cgpa_status': 'Unknown',
+        'trend_description': '',
+        'cautions': [],
+        'suggestions': [],
+        'explanation': 'Unable to analyze data due to an error'
+    }, 500
+
+
+def analyse_students(records):
+    """
+    Convenience wrapper: analyse_student for each record. It is not faster
+    per student; the shared work is already compiled into _PLANS, and at
+    API batch sizes (up to ANALYSIS_API_MAX_BATCH) building a DataFrame for
+    cohort.analyse_cohort costs more than it saves. Use analyse_cohort for
+    whole registry files.
+
+    Args:
+        records (iterable): dicts shaped like analyse_student's input
+
+    Returns:
+        list: (result_dict, status_code) per record, in input order
+    """
+    return [analyse_student(data) for data in records]
@@ -0,0 +1,111 @@
+"""
+Micro-batching Predictor
+Concurrent requests each used to send a one-row array to predict_proba. The
+MicroBatcher queues their feature rows instead, and a single background
+thread flushes the queue into one predict_academic_risk_batch call as soon
+as `max_batch` rows are waiting or the oldest row has waited `max_wait_ms`.
+Every caller gets its own row's result back through a future.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from .predictor import _trend_value, predict_academic_risk_batch
+
+
+class MicroBatcher:
+    """
+    Args:
+        max_batch (int): flush as soon as this many rows are queued
+        max_wait_ms (float): flush once the oldest queued row is this old
+        predict_batch: (cgpa, level, total_courses, trend_values) ->
+            (labels, confidences); defaults to predict_academic_risk_batch
+    """
+
+    def __init__(self, max_batch=32, max_wait_ms=2.0, predict_batch=None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._predict_batch = predict_batch or predict_academic_risk_batch
+        self._cond = threading.Condition()
+        self._pending = []
+        self._pid = None
+        self.batches = 0
+        self.rows = 0
+
+    # ───────────────────────────────────────────────
+    # Callers
+    # ───────────────────────────────────────────────
+    def submit(self, cgpa, level, total_courses, cgpa_trend):
+        """
+        Queue one student's features.
+
+        Returns:
+            concurrent.futures.Future: resolves to {'mlRiskLevel', 'mlConfidence'},
+            or to the exception raised by the batch prediction
+        """
+        future = Future()
+        row = (cgpa, level, total_courses, _trend_value(cgpa_trend))
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append((row, future, time.monotonic()))
+            # The worker only needs waking for the first row or a full batch
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def predict(self, cgpa, level, total_courses, cgpa_trend):
+        """Blocking submit(): for sync views and worker threads."""
+        return self.submit(cgpa, level, total_courses, cgpa_trend).result()
+
+    async def apredict(self, cgpa, level, total_courses, cgpa_trend):
+        """Awaitable submit(): for async views, without tying up a thread."""
+        return await asyncio.wrap_future(self.submit(cgpa, level, total_courses, cgpa_trend))
+
+    # ───────────────────────────────────────────────
+    # Worker thread
+    # ───────────────────────────────────────────────
+    def _ensure_worker(self):
+        # Called with the lock held. Threads do not survive fork, so a forked
+        # worker process starts its own.
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._pending = []
+        threading.Thread(target=self._run, name="micro-batcher", daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = self._pending[0][2] + self.max_wait
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # Drop rows whose caller gave up (e.g. a cancelled asyncio task)
+        batch = [(row, future) for row, future, _ in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            cgpa, level, total_courses, trend = zip(*(row for row, _ in batch))
+            labels, confidences = self._predict_batch(cgpa, level, total_courses, np.array(trend, dtype=float))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), label, confidence in zip(batch, labels, confidences):
+            future.set_result({"mlRiskLevel": str(label), "mlConfidence": float(confidence)})
@@ -0,0 +1,243 @@
+"""
+Cohort Analysis
+Vectorized version of analyse_student for whole departments at a time.
+
+Takes a DataFrame with one student per row, using the same column names as
+analyse_student's input (gpa_cgpa or cgpa, cgpa_trend, past_courses,
+current_courses), and evaluates the same rule tables with NumPy operations
+instead of calling analyse_student row by row.
+"""
+import numpy as np
+import pandas as pd
+
+from .analyzer import (
+    CARRIED_OVER_CAUTION,
+    MAX_COURSES,
+    MIN_COURSES,
+    SIGNIFICANT_TREND_CHANGE,
+    TREND_RULES,
+    _PLANS,
+    _THRESHOLDS,
+    _analysis_failed,
+    _parse_trend,
+)
+
+RESULT_COLUMNS = [
+    'status_code', 'error', 'risk_level', 'cgpa_status', 'cgpa_trend',
+    'trend_description', 'cautions', 'suggestions', 'explanation',
+]
+
+
+def _trend_tail(column):
+    """Return (has_trend, last, prev) arrays for a column of trend strings/lists."""
+    tails = [trend_list[-2:] for trend_list in map(_parse_trend, column)]
+    has_trend = np.fromiter((len(t) == 2 for t in tails), dtype=bool, count=len(tails))
+    last = np.fromiter((t[1] if len(t) == 2 else 0.0 for t in tails), dtype=float, count=len(tails))
+    prev = np.fromiter((t[0] if len(t) == 2 else 0.0 for t in tails), dtype=float, count=len(tails))
+    return has_trend, last, prev
+
+
+def _carried_over_counts(current_courses, scan):
+    """
+    Count 'carried over' statuses in the rows where `scan` is set (courses may
+    be dicts or status strings).
+
+    Returns:
+        tuple: (counts, failures) where failures maps the row number of each
+        unreadable status list (e.g. a None status) to its exception
+    """
+    counts = np.zeros(len(current_courses), dtype=np.int64)
+    failures = {}
+    for i in np.flatnonzero(scan):
+        try:
+            for c in current_courses[i]:
+                status = c.get('status', '') if isinstance(c, dict) else c
+                if status.lower() == 'carried over':
+                    counts[i] += 1
+        except Exception as e:
+            failures[i] = e
+    return counts, failures
+
+
+def _lengths(column):
+    return np.fromiter(map(len, column), dtype=np.int64, count=len(column))
+
+
+def _plan_table():
+    """Per risk band: level, trend override index and whether carried over courses are flagged."""
+    trend_index = {key: i for i, key in enumerate(TREND_RULES)}
+    levels = [level for _, level, _ in _THRESHOLDS]
+    overrides = np.array([-1 if o is None else trend_index[o] for _, _, o in _THRESHOLDS])
+    warn_carried = np.array([_PLANS[level, 'stable'][4] for level in levels])
+    scan_courses = np.array([_PLANS[level, 'stable'][8] for level in levels])
+    return trend_index, levels, overrides, warn_carried, scan_courses
+
+
+_TREND_INDEX, _LEVELS, _OVERRIDES, _WARN_CARRIED, _SCAN_COURSES = _plan_table()
+_TREND_KEYS = list(TREND_RULES)
+
+
+def _plan_result(band, trend, carried_over):
+    """Result values for one (band, trend, carried over count) combination."""
+    level = _LEVELS[band]
+    (cgpa_status, cgpa_trend, description, before, _,
+     after, suggestions, explanation, _) = _PLANS[level, _TREND_KEYS[trend]]
+    carried = (CARRIED_OVER_CAUTION.format(count=carried_over),) if carried_over > 0 else ()
+    return (level, cgpa_status, cgpa_trend, description, before + carried + after, suggestions, explanation)
+
+
+def analyse_cohort(frame):
+    """
+    Analyse every student in a DataFrame.
+
+    Message lists come back as tuples shared between students with the same
+    outcome; cohort_records() turns them back into analyse_student's shape.
+    Invalid rows get analyse_student's error results: 400 for a missing or
+    out-of-range CGPA or course count, 500 for unreadable course statuses.
+
+    Args:
+        frame (DataFrame): gpa_cgpa (or cgpa), cgpa_trend, past_courses and
+            current_courses columns; course columns hold lists of dicts (or of
+            status strings for current_courses). CGPA cells are converted with
+            pd.to_numeric, so blank or non-numeric cells are invalid. An
+            optional integer carried_over column skips scanning the course
+            statuses.
+
+    Returns:
+        DataFrame: RESULT_COLUMNS, one row per student in input order
+    """
+    n_rows = len(frame)
+    cgpa_column = 'gpa_cgpa' if 'gpa_cgpa' in frame.columns else 'cgpa'
+    cgpa = pd.to_numeric(frame[cgpa_column], errors='coerce').to_numpy(dtype=float)
+    no_values = [()] * n_rows
+    trends = frame['cgpa_trend'].to_numpy() if 'cgpa_trend' in frame.columns else [''] * n_rows
+    past_courses = frame['past_courses'].to_numpy() if 'past_courses' in frame.columns else no_values
+    current_courses = frame['current_courses'].to_numpy() if 'current_courses' in frame.columns else no_values
+
+    # ═══════════════════════════════════════════════════════
+    # VALIDATION
+    # ═══════════════════════════════════════════════════════
+    n_past = _lengths(past_courses)
+    n_current = _lengths(current_courses)
+    errors = np.select(
+        [
+            ~((cgpa >= 0) & (cgpa <= 5.0)),  # also NaN
+            (n_past < MIN_COURSES) | (n_past > MAX_COURSES),
+            (n_current < MIN_COURSES) | (n_current > MAX_COURSES),
+        ],
+        [
+            'GPA/CGPA must be between 0.00 and 5.00',
+            f'Past courses must be between {MIN_COURSES} and {MAX_COURSES}',
+            f'Current courses must be between {MIN_COURSES} and {MAX_COURSES}',
+        ],
+        default='',
+    )
+    valid = errors == ''
+
+    # ═══════════════════════════════════════════════════════
+    # RISK BAND (np.select over the CGPA thresholds)
+    # ═══════════════════════════════════════════════════════
+    bounded = [(i, t) for i, (t, _, _) in enumerate(_THRESHOLDS) if t is not None]
+    band = np.select([cgpa >= t for _, t in bounded], [i for i, _ in bounded], default=len(_THRESHOLDS) - 1)
+    override = _OVERRIDES[band]
+
+    # ═══════════════════════════════════════════════════════
+    # TREND (vectorized deltas)
+    # ═══════════════════════════════════════════════════════
+    has_trend, last, prev = _trend_tail(trends)
+    with np.errstate(invalid='ignore'):
+        delta = last - prev
+        trend = np.select(
+            [
+                ~has_trend,
+                override >= 0,
+                (last > prev) & (delta > SIGNIFICANT_TREND_CHANGE),
+                last > prev,
+                (last < prev) & (-delta > SIGNIFICANT_TREND_CHANGE),
+                last < prev,
+            ],
+            [
+                _TREND_INDEX['no_data'],
+                override,
+                _TREND_INDEX['improving_fast'],
+                _TREND_INDEX['improving'],
+                _TREND_INDEX['declining_fast'],
+                _TREND_INDEX['declining'],
+            ],
+            default=_TREND_INDEX['stable'],
+        )
+
+    failed = np.zeros(n_rows, dtype=bool)
+    failures = {}
+    if 'carried_over' in frame.columns:
+        carried_over = frame['carried_over'].to_numpy(dtype=np.int64)
+    else:
+        # Like analyse_student, only bands that look at the courses can fail here
+        carried_over, failures = _carried_over_counts(current_courses, valid & _SCAN_COURSES[band])
+        failed[list(failures)] = True
+    carried_over = np.where(_WARN_CARRIED[band], carried_over, 0)
+
+    # ═══════════════════════════════════════════════════════
+    # ASSEMBLE RESULTS FROM THE COMPILED PLANS
+    # ═══════════════════════════════════════════════════════
+    # Only a handful of distinct outcomes exist, so build each once and
+    # fan them out with fancy indexing.
+    analysed = valid & ~failed
+    keys = np.stack([band, trend, carried_over], axis=1)[analysed]
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    table = np.empty((len(unique_keys), 7), dtype=object)
+    for i, (b, t, c) in enumerate(unique_keys):
+        for j, value in enumerate(_plan_result(int(b), int(t), int(c))):
+            table[i, j] = value
+
+    out = {column: np.full(n_rows, None, dtype=object) for column in RESULT_COLUMNS}
+    out['status_code'] = np.select([failed, valid], [500, 200], default=400)
+    out['error'][~valid] = errors[~valid]
+    out['risk_level'][~valid] = 'Unknown'
+    for i, error in failures.items():
+        result, _ = _analysis_failed(error)
+        for column in RESULT_COLUMNS[1:]:
+            value = result[column]
+            out[column][i] = tuple(value) if isinstance(value, list) else value
+    if len(unique_keys):
+        rows = table[inverse.ravel()]
+        for j, column in enumerate(RESULT_COLUMNS[2:]):
+            out[column][analysed] = rows[:, j]
+
+    return pd.DataFrame(out, columns=RESULT_COLUMNS)
+
+
+def cohort_records(results):
+    """
+    Convert analyse_cohort output back into analyse_student's return shape.
+
+    Returns:
+        list: (result_dict, status_code) per row
+    """
+    records = []
+    for row in results.itertuples(index=False):
+        if row.status_code == 500:
+            records.append(({
+                'error': row.error,
+                'risk_level': row.risk_level,
+                'cgpa_trend': row.cgpa_trend,
+                'cgpa_status': row.cgpa_status,
+                'trend_description': row.trend_description,
+                'cautions': list(row.cautions),
+                'suggestions': list(row.suggestions),
+                'explanation': row.explanation,
+            }, 500))
+            continue
+        if row.status_code != 200:
+            records.append(({'error': row.error, 'risk_level': 'Unknown'}, int(row.status_code)))
+            continue
+        records.append(({
+            'risk_level': row.risk_level,
+            'cgpa_status': row.cgpa_status,
+            'cgpa_trend': row.cgpa_trend,
+            'trend_description': row.trend_description,
+            'cautions': list(row.cautions),
+            'suggestions': list(row.suggestions),
+            'explanation': row.explanation,
+        }, 200))
+    return records
@@ -0,0 +1,175 @@
+"""
+Compiled Model
+Turns the trained sklearn estimator into flat NumPy arrays and evaluates them
+without sklearn, so web workers skip sklearn's per-call validation overhead
+and never import sklearn/scipy at all.
+
+Supported estimators:
+    - DecisionTreeClassifier
+    - RandomForestClassifier / ExtraTreesClassifier (averaged trees)
+    - LogisticRegression (coefficient matrix)
+"""
+import numpy as np
+
+TREE_KIND = "tree"
+LINEAR_KIND = "linear"
+
+
+# ───────────────────────────────────────────────
+# Export (needs sklearn, runs offline)
+# ───────────────────────────────────────────────
+def _tree_arrays(tree, n_classes):
+    """Node arrays for one fitted sklearn Tree, with leaf values as probabilities."""
+    if tree.n_outputs != 1:
+        raise ValueError("Only single-output trees can be compiled")
+    # Same normalisation as DecisionTreeClassifier.predict_proba
+    value = tree.value[:, 0, :n_classes].astype(np.float64)
+    normalizer = value.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return {
+        "left": tree.children_left.astype(np.intp),
+        "right": tree.children_right.astype(np.intp),
+        "feature": tree.feature.astype(np.intp),
+        "threshold": tree.threshold.astype(np.float64),
+        "value": value / normalizer,
+    }
+
+
+def export_model(model):
+    """
+    Flatten a fitted estimator into a dict of NumPy arrays.
+
+    Args:
+        model: A fitted sklearn classifier of a supported type
+
+    Returns:
+        dict: arrays accepted by CompiledModel / np.savez
+
+    Raises:
+        ValueError: if the estimator type is not supported
+    """
+    classes = np.asarray(model.classes_).astype(str)
+    n_features = np.int64(model.n_features_in_)
+
+    if hasattr(model, "tree_"):
+        trees = [model.tree_]
+    elif hasattr(model, "estimators_") and all(hasattr(e, "tree_") for e in model.estimators_):
+        trees = [e.tree_ for e in model.estimators_]
+    elif hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        multinomial = len(classes) > 2 and getattr(model, "multi_class", "auto") not in ("ovr",)
+        if getattr(model, "solver", None) == "liblinear":
+            multinomial = False
+        return {
+            "kind": np.array(LINEAR_KIND),
+            "classes": classes,
+            "n_features": n_features,
+            "coef": np.asarray(model.coef_, dtype=np.float64),
+            "intercept": np.asarray(model.intercept_, dtype=np.float64),
+            "multinomial": np.bool_(multinomial),
+        }
+    else:
+        raise ValueError(f"Cannot compile estimator of type {type(model).__name__}")
+
+    # Concatenate every tree's nodes; child indices are shifted by each tree's offset
+    parts = [_tree_arrays(t, len(classes)) for t in trees]
+    roots = np.cumsum([0] + [len(p["left"]) for p in parts[:-1]]).astype(np.intp)
+    left, right = [], []
+    for root, p in zip(roots, parts):
+        is_leaf = p["left"] == -1
+        left.append(np.where(is_leaf, -1, p["left"] + root))
+        right.append(np.where(is_leaf, -1, p["right"] + root))
+
+    return {
+        "kind": np.array(TREE_KIND),
+        "classes": classes,
+        "n_features": n_features,
+        "roots": roots,
+        "max_depth": np.int64(max(t.max_depth for t in trees)),
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "feature": np.concatenate([p["feature"] for p in parts]),
+        "threshold": np.concatenate([p["threshold"] for p in parts]),
+        "value": np.concatenate([p["value"] for p in parts]),
+    }
+
+
+def save_compiled(model, path):
+    """Export `model` and write the arrays to an .npz file."""
+    with open(path, "wb") as f:
+        np.savez(f, **export_model(model))
+
+
+# ───────────────────────────────────────────────
+# Inference (NumPy only)
+# ───────────────────────────────────────────────
+class CompiledModel:
+    """
+    Pure-NumPy stand-in for the sklearn estimator.
+
+    Exposes the same `classes_`, `n_features_in_`, `predict_proba` and
+    `predict` attributes the predictor uses, so it can be swapped in directly.
+    """
+
+    def __init__(self, arrays):
+        self.kind = str(arrays["kind"])
+        self.classes_ = np.asarray(arrays["classes"])
+        self.n_features_in_ = int(arrays["n_features"])
+        self._arrays = {k: np.asarray(v) for k, v in arrays.items()}
+
+    def _check(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[-1]} features, but the model expects {self.n_features_in_} features as input."
+            )
+        return X
+
+    def _tree_proba(self, X):
+        a = self._arrays
+        left, right, feature, threshold = a["left"], a["right"], a["feature"], a["threshold"]
+        # sklearn evaluates trees on float32 inputs
+        X = X.astype(np.float32)
+        rows = np.arange(X.shape[0])
+
+        proba = np.zeros((X.shape[0], len(self.classes_)))
+        for root in a["roots"]:
+            node = np.full(X.shape[0], root, dtype=np.intp)
+            for _ in range(int(a["max_depth"])):
+                is_leaf = left[node] == -1
+                if is_leaf.all():
+                    break
+                go_left = X[rows, np.where(is_leaf, 0, feature[node])] <= threshold[node]
+                node = np.where(is_leaf, node, np.where(go_left, left[node], right[node]))
+            proba += a["value"][node]
+
+        if len(a["roots"]) > 1:
+            proba /= len(a["roots"])
+        return proba
+
+    def _linear_proba(self, X):
+        a = self._arrays
+        decision = X @ a["coef"].T + a["intercept"]
+        if bool(a["multinomial"]):
+            decision = decision - decision.max(axis=1, keepdims=True)
+            np.exp(decision, out=decision)
+            return decision / decision.sum(axis=1, keepdims=True)
+
+        prob = 1.0 / (1.0 + np.exp(-decision))
+        if prob.shape[1] == 1:
+            return np.hstack([1.0 - prob, prob])
+        return prob / prob.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X):
+        X = self._check(X)
+        if self.kind == TREE_KIND:
+            return self._tree_proba(X)
+        return self._linear_proba(X)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def load_compiled(path):
+    """Load a CompiledModel from an .npz written by save_compiled."""
+    with np.load(path, allow_pickle=False) as data:
+        return CompiledModel({k: data[k] for k in data.files})
@@ -0,0 +1,219 @@
+"""
+Process-pool Inference
+Runs the model in a few dedicated processes instead of inside the web
+workers. predict_proba holds the GIL for part of its work, and the native
+BLAS/OpenMP pools of every gunicorn thread would otherwise compete for the
+same cores. Each pool process is started with one native thread, loads the
+model itself, and takes work from a shared request queue.
+
+Feature matrices travel as packed float64 buffers, so every model sees the
+same values as in process. float32 would be lossless only for tree models,
+which cast to it anyway; the linear CompiledModel computes on float64, where
+rounding can flip labels near a decision boundary. At four features a row the
+payload is small either way.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from . import predictor
+
+logger = logging.getLogger(__name__)
+
+# Native thread pools capped in every pool process
+THREAD_LIMIT_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+class PoolError(RuntimeError):
+    """Raised for a prediction that failed in (or never came back from) a pool process."""
+
+
+def pack_features(features):
+    """(n, k) feature matrix → (n_rows, float64 bytes)."""
+    features = np.ascontiguousarray(features, dtype=np.float64)
+    return features.shape[0], features.tobytes()
+
+
+def unpack_features(n_rows, buffer):
+    return np.frombuffer(buffer, dtype=np.float64).reshape(n_rows, len(predictor.FEATURE_COLUMNS))
+
+
+def _limit_native_threads():
+    # The environment covers libraries loaded from here on (e.g. sklearn's
+    # OpenMP when the model is unpickled); threadpoolctl the ones numpy
+    # already loaded.
+    for name in THREAD_LIMIT_VARIABLES:
+        os.environ[name] = "1"
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=1)
+
+
+def _serve(requests, responses, model_path, model_store, artifact):
+    """Main loop of a pool process: (request_id, n_rows, buffer) in, results out."""
+    _limit_native_threads()
+    if model_path is not None:
+        predictor.registry = predictor.ModelRegistry(model_path)
+    else:
+        predictor.registry = predictor._default_registry(model_store, artifact)
+    predictor.registry.get()
+    # Unpickling the model may have loaded more native pools (sklearn's OpenMP)
+    _limit_native_threads()
+
+    while True:
+        item = requests.get()
+        if item is None:
+            return
+        request_id, n_rows, buffer = item
+        try:
+            labels, confidences = predictor.predict_features(unpack_features(n_rows, buffer))
+            responses.put((request_id, None, labels.tolist(), np.asarray(confidences, dtype=np.float64).tobytes()))
+        except Exception as e:
+            responses.put((request_id, f"{type(e).__name__}: {e}", None, None))
+
+
+class InferencePool:
+    """
+    Args:
+        processes (int): model processes to run
+        model_path (str): artifact to load; the predictor's default if None
+        model_store (str): model store directory to serve instead (see
+            store.py); its "current" version is followed without a restart
+        artifact (str): bundled artifact to load (a key of
+            predictor.ARTIFACTS) when neither of the above is given
+        timeout (float): seconds to wait for a prediction before giving up
+        start_method (str): multiprocessing start method; "spawn" keeps the
+            children clear of the web worker's threads and locks
+    """
+
+    def __init__(
+        self, processes=2, model_path=None, timeout=5.0, start_method="spawn", model_store=None, artifact=None
+    ):
+        self.processes = processes
+        self.model_path = model_path
+        self.model_store = model_store
+        self.artifact = artifact
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+        if model_path:
+            self._registry = predictor.ModelRegistry(model_path)
+        else:
+            self._registry = predictor._default_registry(model_store, artifact)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pid = None
+
+    # ───────────────────────────────────────────────
+    # Callers
+    # ───────────────────────────────────────────────
+    def submit_features(self, features):
+        """
+        Queue a feature matrix for the pool.
+
+        Returns:
+            concurrent.futures.Future: resolves to (labels, confidences), or
+            fails with PoolError
+        """
+        return self._submit(features)[1]
+
+    def _submit(self, features):
+        n_rows, buffer = pack_features(features)
+        future = Future()
+        with self._lock:
+            self._ensure_started()
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        self._requests.put((request_id, n_rows, buffer))
+        return request_id, future
+
+    def predict_batch(self, cgpa, level=None, total_courses=None, cgpa_trend=None):
+        """
+        Same contract as predictor.predict_academic_risk_batch, evaluated in
+        a pool process. The features are built here; only the model runs there.
+
+        Raises:
+            PoolError: if the pool process failed or did not answer in time
+        """
+        features = predictor.build_features(cgpa, level, total_courses, cgpa_trend)
+        if features.shape[0] == 0:
+            return np.empty(0, dtype=str), np.empty(0, dtype=float)
+        request_id, future = self._submit(features)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise PoolError(f"No answer from the inference pool within {self.timeout}s")
+
+    def model_version(self):
+        """Version of the artifact the pool processes load (hashed, not loaded, here)."""
+        return self._registry.file_version()
+
+    def close(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            for _ in self._workers:
+                self._requests.put(None)
+            for worker in self._workers:
+                worker.join(timeout=5)
+            self._responses.put(None)
+            self._pid = None
+        self._collector.join(timeout=5)
+
+    # ───────────────────────────────────────────────
+    # Processes
+    # ───────────────────────────────────────────────
+    def _ensure_started(self):
+        # Called with the lock held. A forked web worker must not share its
+        # parent's queues and processes, so each process starts its own pool.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._requests = self._context.Queue()
+            self._responses = self._context.Queue()
+            self._pending = {}
+            self._workers = [None] * self.processes
+            self._collector = threading.Thread(
+                target=self._collect, args=(self._responses, self._pending), name="inference-pool", daemon=True
+            )
+            self._collector.start()
+        for i, worker in enumerate(self._workers):
+            if worker is None or not worker.is_alive():
+                if worker is not None:
+                    logger.warning("Inference pool process %s exited with %s; restarting", worker.pid, worker.exitcode)
+                self._workers[i] = self._context.Process(
+                    target=_serve,
+                    args=(self._requests, self._responses, self.model_path, self.model_store, self.artifact),
+                    name=f"inference-pool-{i}",
+                    daemon=True,
+                )
+                self._workers[i].start()
+
+    def _collect(self, responses, pending):
+        while True:
+            item = responses.get()
+            if item is None:
+                return
+            request_id, error, labels, confidences = item
+            with self._lock:
+                future = pending.pop(request_id, None)
+            if future is None:  # the caller timed out
+                continue
+            if error is not None:
+                future.set_exception(PoolError(error))
+            else:
+                future.set_result((np.asarray(labels, dtype=str), np.frombuffer(confidences, dtype=np.float64)))
@@ -1,75 +1,400 @@
-import joblib
+import logging
 import numpy as np
 import os
+import threading
+import time
+
+from .store import CURRENT, ModelStore, artifact_digest, load_artifact
+from .trend import CgpaTrend
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(__file__)
 model_path = os.path.join(BASE_DIR, "academic_risk_model.pkl")
+# Uncompressed dump written by `manage.py export_mmap_model`; its numpy
+# arrays can be memory-mapped read-only and shared between workers
+mmap_model_path = os.path.join(BASE_DIR, "academic_risk_model.joblib")
+# Flat NumPy arrays written by `manage.py export_compiled_model`; evaluated
+# without importing sklearn at all
+compiled_model_path = os.path.join(BASE_DIR, "academic_risk_model.npz")
+
+# settings.ML_MODEL_ARTIFACT → (path, mmap_mode), in the order tried when it is unset
+ARTIFACTS = {
+    "compiled": (compiled_model_path, None),
+    "mmap": (mmap_model_path, "r"),
+    "pickle": (model_path, None),
+}
+
+# Order of the columns the model was trained on
+FEATURE_COLUMNS = ("cgpa", "level", "total_courses", "cgpa_trend")
+
+
+# ───────────────────────────────────────────────
+# Model Registry
+# ───────────────────────────────────────────────
+class ModelRegistry:
+    """
+    Loads the model on first use instead of at import time.
+
+    Loading happens behind a lock so concurrent requests unpickle it once.
+    The pickle's mtime is checked on every access and the model is reloaded
+    when it changes, so a deploy that replaces the file needs no restart.
+    A failed load is retried after `retry_seconds` rather than sticking forever.
+
+    With `mmap_mode='r'` the arrays of an uncompressed dump are memory-mapped
+    instead of copied, so every worker shares the same page-cache pages.
+    """
+
+    def __init__(self, path, retry_seconds=30.0, mmap_mode=None):
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        self._model = None
+        self._mtime = None
+        self._failed_at = None
+        self.version = None
+        self._hashed = (None, None)  # (mtime, version) for file_version()
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        return load_artifact(self.path, self.mmap_mode)
+
+    def _file_version(self):
+        """Short content hash of the artifact, so a retrain changes it."""
+        return artifact_digest(self.path)[:12]
+
+    def file_version(self):
+        """
+        Content hash of the artifact on disk, without loading it (None if the
+        file is missing). Used where the model lives in another process.
+        """
+        mtime = self._current_mtime()
+        if mtime is None:
+            return None
+        with self._lock:
+            if self._hashed[0] != mtime:
+                self._hashed = (mtime, self._file_version())
+            return self._hashed[1]
+
+    def _is_fresh(self, mtime):
+        return self._model is not None and mtime == self._mtime
+
+    def get(self):
+        """Return the loaded model, or None if it cannot be loaded."""
+        mtime = self._current_mtime()
+        if self._is_fresh(mtime):
+            return self._model
+
+        with self._lock:
+            if self._is_fresh(mtime):
+                return self._model
+            if (
+                self._failed_at is not None
+                and mtime == self._mtime
+                and time.monotonic() - self._failed_at < self.retry_seconds
+            ):
+                return self._model
+            try:
+                loaded = self._load()
+                version = self._file_version()
+            except Exception:
+                logger.exception("Error loading ML model from %s", self.path)
+                self._failed_at = time.monotonic()
+                self._mtime = mtime
+                return self._model
+            self._model = loaded
+            self.version = version
+            self._mtime = mtime
+            self._failed_at = None
+            logger.info("ML model %s loaded from %s", version, self.path)
+            return self._model
+
+    def warm_up(self):
+        """Load the model now and run one dummy prediction through it."""
+        model = self.get()
+        if model is None:
+            return False
+        n_features = getattr(model, "n_features_in_", len(FEATURE_COLUMNS))
+        model.predict_proba(np.zeros((1, n_features)))
+        return True
+
+
+class StoreRegistry(ModelRegistry):
+    """
+    ModelRegistry for a ModelStore pointer ("current", or "candidate" for
+    shadow scoring). When the pointer moves, the first request to notice
+    loads the new version while concurrent requests keep getting the
+    previous model; the swap is one reference assignment, so no request is
+    dropped or sees a half-loaded model. A version that fails to load (or
+    to verify against its manifest) is retried after `retry_seconds`.
+    """
+
+    def __init__(self, store, pointer=CURRENT, retry_seconds=30.0):
+        self.store = store
+        self.pointer = pointer
+        self.retry_seconds = retry_seconds
+        self.mmap_mode = None
+        self._lock = threading.Lock()
+        self._active = (None, None)  # (version, model)
+        self._failed = (None, 0.0)   # (version, monotonic time)
+
+    @property
+    def version(self):
+        return self._active[0]
+
+    @property
+    def path(self):
+        version = self._active[0] or self.store.read_pointer(self.pointer)
+        return self.store.artifact_path(version) if version else None
+
+    def file_version(self):
+        """The version the pointer names (what get() will serve), without loading it."""
+        return self.store.read_pointer(self.pointer)
+
+    def get(self):
+        """Return the model for the pointer's version, or None if none can be loaded."""
+        wanted = self.store.read_pointer(self.pointer)
+        version, model = self._active
+        if wanted is None or wanted == version:
+            return model
+        # Another request is loading the new version: keep serving this one
+        if not self._lock.acquire(blocking=model is None):
+            return model
+        try:
+            version, model = self._active
+            if wanted == version:
+                return model
+            failed_version, failed_at = self._failed
+            if failed_version == wanted and time.monotonic() - failed_at < self.retry_seconds:
+                return model
+            try:
+                loaded = self.store.load(wanted)
+            except Exception:
+                logger.exception("Error loading ML model %s from %s", wanted, self.store.root)
+                self._failed = (wanted, time.monotonic())
+                return model
+            self._active = (wanted, loaded)
+            logger.info("ML model %s (%s) loaded from %s", wanted, self.pointer, self.store.root)
+            return loaded
+        finally:
+            self._lock.release()
+
+
+def _default_registry(model_store=None, artifact=None):
+    """
+    The versioned model store when `model_store` names one (see store.py);
+    otherwise the bundled artifact named by `artifact` (a key of ARTIFACTS).
+    Without either, the first existing one of the compiled arrays, the
+    mmap-friendly dump and the pickle: the memory-mapped dump is only used
+    while no compiled export is present, unless `artifact` is "mmap".
+    """
+    if model_store:
+        return StoreRegistry(ModelStore(model_store, FEATURE_COLUMNS))
+    if artifact:
+        if artifact not in ARTIFACTS:
+            raise ValueError(f"ML_MODEL_ARTIFACT must be one of {', '.join(ARTIFACTS)}, not {artifact!r}")
+        path, mmap_mode = ARTIFACTS[artifact]
+        return ModelRegistry(path, mmap_mode=mmap_mode)
+    for path, mmap_mode in ARTIFACTS.values():
+        if os.path.exists(path):
+            return ModelRegistry(path, mmap_mode=mmap_mode)
+    return ModelRegistry(model_path)
+
+
+def _configured(name):
+    """settings.<name> when running inside the Django project, else None."""
+    try:
+        from django.conf import settings
+    except ImportError:
+        return None
+    if not settings.configured:
+        return None
+    return getattr(settings, name, None)
+
+
+# Built on first use from settings.ML_MODEL_STORE (or ML_MODEL_ARTIFACT), so
+# predictions, shadow scoring and `manage.py model_store` read the store
+# location from the same place. Benchmarks and pool processes may assign their own registry.
+registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The shared ModelRegistry, created on first use."""
+    global registry
+    if registry is None:
+        with _registry_lock:
+            if registry is None:
+                registry = _default_registry(_configured("ML_MODEL_STORE"), _configured("ML_MODEL_ARTIFACT"))
+    return registry
+
+
+def get_model():
+    """Return the current model from the shared registry."""
+    return get_registry().get()
+
+
+def model_version():
+    """Content hash of the current model artifact, or None if it is not loaded."""
+    current = get_registry()
+    if current.get() is None:
+        return None
+    return current.version
+
 
-# Try to load the model
-try:
-    model = joblib.load(model_path)
-    print(f"✅ ML Model loaded successfully from: {model_path}")
-except Exception as e:
-    print(f"❌ ERROR loading ML model: {e}")
-    model = None
+def _trend_value(cgpa_trend):
+    """
+    Convert a CGPA trend (CgpaTrend, comma separated string or list) into the
+    difference between the last two entries, or 0.0 if there are fewer than two.
+    """
+    if isinstance(cgpa_trend, str):
+        cgpa_trend = CgpaTrend.parse(cgpa_trend)
+    if isinstance(cgpa_trend, CgpaTrend):
+        return cgpa_trend.last_delta
+    if isinstance(cgpa_trend, list) and len(cgpa_trend) >= 2:
+        return cgpa_trend[-1] - cgpa_trend[-2]
+    return 0.0
+
+
+def _trend_column(cgpa_trend, n_rows):
+    """
+    Build the trend feature column. Numeric input is taken as the trend value
+    already; anything else (strings/lists per student) is parsed row by row.
+    """
+    if cgpa_trend is None:
+        return np.zeros(n_rows)
+    if isinstance(cgpa_trend, np.ndarray) and cgpa_trend.dtype.kind in "biuf":
+        return cgpa_trend.astype(float).ravel()
+    return np.fromiter(
+        (float(t) if isinstance(t, (int, float, np.number)) else _trend_value(t) for t in cgpa_trend),
+        dtype=float,
+        count=n_rows,
+    )
+
+
+def build_features(cgpa, level=None, total_courses=None, cgpa_trend=None):
+    """
+    Stack columnar inputs into the (n, 4) feature matrix used by the model.
+
+    Args:
+        cgpa: Array of CGPAs, or a DataFrame holding all FEATURE_COLUMNS
+        level: Array of academic levels
+        total_courses: Array of course counts
+        cgpa_trend: Array of trend values, or per-student CgpaTrend/strings/lists
+
+    Returns:
+        np.ndarray: float matrix with one row per student
+    """
+    if hasattr(cgpa, "columns"):
+        frame = cgpa
+        cgpa = frame["cgpa"].to_numpy()
+        level = frame["level"].to_numpy()
+        total_courses = frame["total_courses"].to_numpy()
+        cgpa_trend = frame["cgpa_trend"].to_numpy() if "cgpa_trend" in frame.columns else None
+
+    cgpa = np.asarray(cgpa, dtype=float).ravel()
+    n_rows = cgpa.shape[0]
+
+    features = np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=float)
+    features[:, 0] = cgpa
+    features[:, 1] = np.asarray(level, dtype=float).ravel()
+    features[:, 2] = np.asarray(total_courses, dtype=float).ravel()
+    features[:, 3] = _trend_column(cgpa_trend, n_rows)
+    return features
+
+
+def predict_academic_risk_batch(cgpa, level=None, total_courses=None, cgpa_trend=None):
+    """
+    Predict academic risk for many students with a single predict_proba pass.
+
+    Args:
+        cgpa: Array of CGPAs, or a DataFrame with cgpa/level/total_courses/cgpa_trend
+        level: Array of academic levels
+        total_courses: Array of course counts
+        cgpa_trend: Array of trend values, or per-student CgpaTrend/strings/lists
+
+    Returns:
+        tuple: (labels, confidences) as arrays; confidences are percentages
 
-def predict_academic_risk(cgpa, level, total_courses, cgpa_trend):
+    Raises:
+        RuntimeError: if the model failed to load
+    """
+    return predict_features(build_features(cgpa, level, total_courses, cgpa_trend))
+
+
+def predict_features(features, model=None):
+    """
+    Run the model on a feature matrix from build_features (the process-pool
+    workers receive the matrix rather than the raw columns).
+
+    Args:
+        features: (n, 4) matrix
+        model: Used instead of the registry's current model (shadow scoring)
+
+    Returns:
+        tuple: (labels, confidences) as arrays; confidences are percentages
+
+    Raises:
+        RuntimeError: if the model failed to load
+    """
+    model = model if model is not None else get_model()
+    if model is None:
+        raise RuntimeError("ML model is not loaded")
+
+    if features.shape[0] == 0:
+        return np.empty(0, dtype=str), np.empty(0, dtype=float)
+
+    # Label comes from the argmax of the probabilities, so predict() is not needed
+    proba = model.predict_proba(features)
+    best = proba.argmax(axis=1)
+    labels = np.asarray(model.classes_)[best].astype(str)
+    confidences = np.round(proba[np.arange(len(best)), best] * 100, 2)
+    return labels, confidences
+
+
+def predict_academic_risk(cgpa, level, total_courses, cgpa_trend, predict_batch=None):
     """
     Predict academic risk using the trained ML model.
-    
+
     Args:
         cgpa: Current CGPA (float)
         level: Academic level (int, e.g., 100, 200, 300, 400)
         total_courses: Total number of courses (int)
-        cgpa_trend: CGPA trend as string or list
-        
+        cgpa_trend: CGPA trend as CgpaTrend, string or list
+        predict_batch: Used instead of predict_academic_risk_batch (e.g. an
+            InferencePool's, so the model is never loaded in this process)
+
     Returns:
         dict: {'mlRiskLevel': str, 'mlConfidence': float} or 'Unavailable'
     """
     try:
         # Check if model loaded
-        if model is None:
-            print("❌ Model is None, cannot predict")
+        if predict_batch is None and get_model() is None:
+            logger.warning("ML model is not loaded, cannot predict")
             return "Unavailable"
-        
-        # 1️⃣ Convert CGPA trend string → list of floats
-        if isinstance(cgpa_trend, str):
-            trend_list = []
-            for x in cgpa_trend.split(','):
-                try:
-                    trend_list.append(float(x.strip()))
-                except ValueError:
-                    pass
-        elif isinstance(cgpa_trend, list):
-            trend_list = cgpa_trend
-        else:
-            trend_list = []
-        
-        # 2️⃣ Compute trend value safely
-        if isinstance(trend_list, list) and len(trend_list) >= 2:
-            trend_value = trend_list[-1] - trend_list[-2]
-        else:
-            trend_value = 0.0
-            print(f"⚠️ Not enough trend data, using 0.0")
-        
-        # 3️⃣ Prepare ML features (NUMBERS ONLY)
-        features = np.array([[cgpa, level, total_courses, trend_value]])
-        print(f"🔍 ML Features: CGPA={cgpa}, Level={level}, Courses={total_courses}, Trend={trend_value}")
-        
-        # 4️⃣ Predict
-        prediction = model.predict(features)[0]
-        confidence = max(model.predict_proba(features)[0])
-        
-        print(f"✅ ML Prediction: {prediction}, Confidence: {confidence}")
-        
-        # 5️⃣ Return consistent structure
+
+        trend_value = _trend_value(cgpa_trend)
+        logger.debug(
+            "ML features: cgpa=%s level=%s courses=%s trend=%s", cgpa, level, total_courses, trend_value
+        )
+
+        labels, confidences = (predict_batch or predict_academic_risk_batch)(
+            [cgpa], [level], [total_courses], np.array([trend_value])
+        )
+
+        logger.debug("ML prediction: %s confidence=%s", labels[0], confidences[0])
+
         return {
-            "mlRiskLevel": str(prediction),
-            "mlConfidence": round(float(confidence) * 100, 2)  # Convert to percentage
+            "mlRiskLevel": str(labels[0]),
+            "mlConfidence": float(confidences[0])  # Already a percentage
         }
-        
-    except Exception as e:
-        print(f"❌ ML Prediction Error: {e}")
-        import traceback
-        traceback.print_exc()
+
+    except Exception:
+        logger.exception("ML prediction error")
         return "Unavailable"
@@ -0,0 +1,107 @@
+"""
+Cohort Scoring
+Rules + ML for one chunk of a registry file, as used by `manage.py score_cohort`.
+
+Registry files are flat: one student per row with cgpa, level, cgpa_trend
+("3.1, 2.9, 2.7") and the course lists as ";"-separated "CODE:value" pairs
+(past_courses "CSC101:B;CSC102:A", current_courses "CSC201:Registered;
+CSC202:Carried Over"). An optional matric_number column identifies students.
+
+Kept free of Django so chunks can be scored in plain worker processes.
+"""
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .cohort import RESULT_COLUMNS, analyse_cohort
+from .predictor import predict_academic_risk_batch
+
+logger = logging.getLogger(__name__)
+
+INPUT_COLUMNS = ['matric_number', 'cgpa', 'level', 'cgpa_trend', 'past_courses', 'current_courses']
+REQUIRED_COLUMNS = ['cgpa', 'level', 'past_courses', 'current_courses']
+OUTPUT_COLUMNS = ['row', 'matric_number', 'level', 'cgpa'] + RESULT_COLUMNS + ['ml_risk_level', 'ml_confidence']
+COURSE_SEPARATOR = ';'
+
+
+def _course_values(column):
+    """Split "CODE:value;CODE:value" cells into lists of the values."""
+    values = []
+    for cell in column:
+        items = []
+        if isinstance(cell, str):
+            for entry in cell.split(COURSE_SEPARATOR):
+                if entry.strip():
+                    _, _, value = entry.partition(':')
+                    items.append(value.strip())
+        values.append(items)
+    return values
+
+
+def score_frame(frame):
+    """
+    Score one chunk of a registry file.
+
+    Args:
+        frame (DataFrame): INPUT_COLUMNS (only REQUIRED_COLUMNS must be
+            present); its index is used as the row number
+
+    Returns:
+        DataFrame: OUTPUT_COLUMNS in input order; cautions and suggestions
+        are lists, ml_* are None for rows that were not scored
+    """
+    n_rows = len(frame)
+    cgpa = pd.to_numeric(frame['cgpa'], errors='coerce').to_numpy(dtype=float)
+    level = pd.to_numeric(frame['level'], errors='coerce').to_numpy(dtype=float)
+    trends = frame['cgpa_trend'].fillna('').astype(str).to_numpy() if 'cgpa_trend' in frame.columns else [''] * n_rows
+    past = _course_values(frame['past_courses'])
+    current = _course_values(frame['current_courses'])
+
+    results = analyse_cohort(pd.DataFrame({
+        'gpa_cgpa': cgpa,
+        'cgpa_trend': trends,
+        'past_courses': past,
+        'current_courses': current,
+    }))
+
+    # Blank or non-numeric CGPA/level cells would otherwise slip through
+    missing = np.isnan(cgpa) | np.isnan(level)
+    if missing.any():
+        results.loc[missing, 'status_code'] = 400
+        results.loc[missing, 'error'] = 'GPA/CGPA and level are required'
+        results.loc[missing, RESULT_COLUMNS[2:]] = None
+        results.loc[missing, 'risk_level'] = 'Unknown'
+
+    ml_risk_level = np.full(n_rows, None, dtype=object)
+    ml_confidence = np.full(n_rows, None, dtype=object)
+    valid = (results['status_code'] == 200).to_numpy()
+    if valid.any():
+        total_courses = np.fromiter((len(p) + len(c) for p, c in zip(past, current)), dtype=float, count=n_rows)
+        try:
+            labels, confidences = predict_academic_risk_batch(
+                cgpa[valid], level[valid], total_courses[valid], np.asarray(trends, dtype=object)[valid]
+            )
+            ml_risk_level[valid] = labels
+            ml_confidence[valid] = confidences
+        except Exception as e:
+            logger.warning("ML scoring failed for a chunk of %d rows: %s", n_rows, e)
+            ml_risk_level[valid] = 'Unavailable'
+
+    out = results
+    out.insert(0, 'row', frame.index.to_numpy())
+    out.insert(1, 'matric_number', frame['matric_number'].to_numpy() if 'matric_number' in frame.columns else None)
+    out.insert(2, 'level', np.where(np.isnan(level), None, np.nan_to_num(level).astype(np.int64)))
+    out.insert(3, 'cgpa', cgpa)
+    out['ml_risk_level'] = ml_risk_level
+    out['ml_confidence'] = ml_confidence
+    return out
+
+
+def flatten_for_file(scored):
+    """Encode the message lists as JSON strings so any file format can hold them."""
+    flat = scored.copy()
+    for column in ('cautions', 'suggestions'):
+        flat[column] = [json.dumps(list(v), ensure_ascii=False) if v is not None else None for v in flat[column]]
+    return flat
@@ -0,0 +1,149 @@
+"""
+Shadow Scoring
+Scores a sampled fraction of live predictions with a candidate model (the
+model store's "candidate" pointer) and compares its labels with the ones
+the students were shown. The comparison runs on a background thread fed by
+a bounded queue: the request thread only pays for a random() call and a
+put_nowait(), and when the queue is full the sample is dropped rather than
+slowing anyone down.
+
+Agreement is logged every `log_every` compared rows and kept for snapshot():
+
+    shadow candidate 3f2a9c1b07de: 1872/1900 rows agree (98.5%), 0 errors, 4 dropped
+"""
+import logging
+import os
+import queue
+import random
+import threading
+from collections import Counter
+
+from .predictor import build_features, predict_features
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowScorer:
+    """
+    Args:
+        registry: ModelRegistry of the candidate model (e.g. a StoreRegistry
+            on the "candidate" pointer)
+        sample_rate (float): fraction of prediction calls to score, 0..1
+        max_queue (int): sampled calls waiting to be scored; more are dropped
+        log_every (int): log the agreement stats after this many compared rows
+        on_compare: optional callback(agree_rows, disagree_rows) per scored call
+    """
+
+    def __init__(self, registry, sample_rate=0.1, max_queue=1000, log_every=1000, on_compare=None):
+        self.registry = registry
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+        self.log_every = log_every
+        self.on_compare = on_compare
+        self._lock = threading.Lock()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        self._queue = queue.Queue(self.max_queue)
+        self.rows = 0
+        self.agree = 0
+        self.errors = 0
+        self.dropped = 0
+        self.confusion = Counter()  # (live label, candidate label) → rows
+        self._logged_at = 0
+
+    # ───────────────────────────────────────────────
+    # Request thread
+    # ───────────────────────────────────────────────
+    def offer(self, cgpa, level, total_courses, cgpa_trend, labels):
+        """
+        Maybe queue one prediction call (its inputs and the labels it returned)
+        for the candidate model. Never blocks; calls made while no candidate
+        is published are not queued.
+
+        Returns:
+            bool: whether the call was queued
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        if self.registry.file_version() is None:
+            return False  # no candidate published, or it was cleared
+        with self._lock:
+            self._ensure_worker()
+        try:
+            self._queue.put_nowait((cgpa, level, total_courses, cgpa_trend, labels))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def snapshot(self):
+        """Counters so far, plus the candidate version they were measured on."""
+        with self._lock:
+            return {
+                "version": self.registry.version,
+                "rows": self.rows,
+                "agree": self.agree,
+                "agreement": self.agree / self.rows if self.rows else None,
+                "errors": self.errors,
+                "dropped": self.dropped,
+                "confusion": {f"{live}->{candidate}": n for (live, candidate), n in sorted(self.confusion.items())},
+            }
+
+    def join(self):
+        """Wait until every queued call has been scored (tests and benchmarks)."""
+        self._queue.join()
+
+    # ───────────────────────────────────────────────
+    # Worker thread
+    # ───────────────────────────────────────────────
+    def _ensure_worker(self):
+        # Called with the lock held. Threads do not survive fork, so a forked
+        # worker process starts its own (with its own counters).
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._reset()
+        threading.Thread(target=self._run, args=(self._queue,), name="shadow-scorer", daemon=True).start()
+
+    def _run(self, work):
+        while True:
+            cgpa, level, total_courses, cgpa_trend, labels = work.get()
+            try:
+                self._score(cgpa, level, total_courses, cgpa_trend, labels)
+            except Exception:
+                logger.exception("Shadow scoring error")
+                with self._lock:
+                    self.errors += 1
+            finally:
+                work.task_done()
+
+    def _score(self, cgpa, level, total_courses, cgpa_trend, labels):
+        model = self.registry.get()
+        if model is None:
+            # The registry has already logged why the candidate did not load
+            logger.debug("Shadow candidate %s is not loaded, skipping", self.registry.file_version())
+            with self._lock:
+                self.errors += 1
+            return
+        candidate, _ = predict_features(build_features(cgpa, level, total_courses, cgpa_trend), model=model)
+        pairs = Counter(zip(map(str, labels), map(str, candidate)))
+        agree = sum(n for (live, shadow), n in pairs.items() if live == shadow)
+
+        with self._lock:
+            self.rows += len(candidate)
+            self.agree += agree
+            self.confusion.update(pairs)
+            should_log = self.rows - self._logged_at >= self.log_every
+            if should_log:
+                self._logged_at = self.rows
+                rows, total_agree, errors, dropped = self.rows, self.agree, self.errors, self.dropped
+        if self.on_compare is not None:
+            self.on_compare(agree, len(candidate) - agree)
+        if should_log:
+            logger.info(
+                "shadow candidate %s: %d/%d rows agree (%.1f%%), %d errors, %d dropped",
+                self.registry.version, total_agree, rows, 100 * total_agree / rows, errors, dropped,
+            )
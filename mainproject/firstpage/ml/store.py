@@ -0,0 +1,184 @@
+"""
+Model Store
+A directory of versioned model artifacts, so a retrain is published next to
+the running model instead of overwriting it:
+
+    <root>/<version>/model.pkl        the artifact (or model.npz / model.joblib)
+    <root>/<version>/manifest.json    sha256, feature order, class labels, ...
+    <root>/current                    version served to students
+    <root>/candidate                  optional version scored in shadow mode
+
+The version is the first 12 hex characters of the artifact's sha256, the
+same id ModelRegistry reports, so the analysis cache keys stay compatible.
+Pointers are replaced atomically (write + os.replace) and a version
+directory only appears once it is complete. predictor.StoreRegistry serves
+a pointer and swaps to the new version when it moves.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import joblib
+
+from .compiled import load_compiled
+
+CURRENT = "current"
+CANDIDATE = "candidate"
+MANIFEST = "manifest.json"
+
+
+class StoreError(Exception):
+    """Raised for an unknown version or an artifact that does not match its manifest."""
+
+
+def load_artifact(path, mmap_mode=None):
+    """Load a model file: compiled arrays (.npz) or a joblib/pickle dump."""
+    if path.endswith(".npz"):
+        return load_compiled(path)
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def artifact_digest(path):
+    """sha256 hex digest of a model file; its first 12 characters are the model version."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """
+    Args:
+        root (str): store directory, created on the first publish
+        feature_columns (tuple): feature order the models must take
+            (predictor.FEATURE_COLUMNS)
+    """
+
+    def __init__(self, root, feature_columns):
+        self.root = os.fspath(root)
+        self.feature_columns = tuple(feature_columns)
+        self._pointers = {}  # name → (mtime_ns, version)
+
+    # ───────────────────────────────────────────────
+    # Versions
+    # ───────────────────────────────────────────────
+    def publish(self, artifact_path):
+        """
+        Copy a model file into the store under its content version.
+        Publishing the same file twice returns the existing manifest.
+
+        Returns:
+            dict: the manifest
+
+        Raises:
+            StoreError: if the model does not take `feature_columns`
+        """
+        digest = artifact_digest(artifact_path)
+        version = digest[:12]
+        if os.path.exists(os.path.join(self.root, version, MANIFEST)):
+            return self.manifest(version)
+
+        model = load_artifact(artifact_path)
+        n_features = getattr(model, "n_features_in_", None)
+        if n_features is not None and n_features != len(self.feature_columns):
+            raise StoreError(
+                f"{artifact_path} expects {n_features} features; the predictor sends "
+                f"{len(self.feature_columns)} ({', '.join(self.feature_columns)})"
+            )
+
+        extension = os.path.splitext(artifact_path)[1] or ".pkl"
+        manifest = {
+            "version": version,
+            "sha256": digest,
+            "artifact": f"model{extension}",
+            "feature_columns": list(self.feature_columns),
+            "classes": [str(c) for c in getattr(model, "classes_", [])],
+            "model_type": type(model).__name__,
+            "source": os.path.basename(artifact_path),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+        # Build the version directory aside and rename it into place, so a
+        # reader never sees a half-written version.
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".publish-", dir=self.root)
+        try:
+            shutil.copyfile(artifact_path, os.path.join(staging, manifest["artifact"]))
+            with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            os.rename(staging, os.path.join(self.root, version))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if os.path.exists(os.path.join(self.root, version, MANIFEST)):
+                return self.manifest(version)  # published concurrently
+            raise
+        return manifest
+
+    def manifest(self, version):
+        try:
+            with open(os.path.join(self.root, version, MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise StoreError(f"No model version {version!r} in {self.root}")
+
+    def versions(self):
+        """Manifests of every published version, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        names = [n for n in os.listdir(self.root) if os.path.exists(os.path.join(self.root, n, MANIFEST))]
+        return sorted((self.manifest(n) for n in names), key=lambda m: m["created"])
+
+    def artifact_path(self, version):
+        return os.path.join(self.root, version, self.manifest(version)["artifact"])
+
+    def load(self, version):
+        """
+        Load a version after checking it against its manifest.
+
+        Raises:
+            StoreError: if the file's hash or feature order does not match
+        """
+        manifest = self.manifest(version)
+        path = os.path.join(self.root, version, manifest["artifact"])
+        if artifact_digest(path) != manifest["sha256"]:
+            raise StoreError(f"{path} does not match the sha256 in its manifest")
+        if tuple(manifest["feature_columns"]) != self.feature_columns:
+            raise StoreError(f"Model {version} was trained on {manifest['feature_columns']}")
+        return load_artifact(path)
+
+    # ───────────────────────────────────────────────
+    # Pointers
+    # ───────────────────────────────────────────────
+    def read_pointer(self, name=CURRENT):
+        """The version a pointer names, or None. Re-read only when the file changes."""
+        path = os.path.join(self.root, name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._pointers.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            version = f.read().strip() or None
+        self._pointers[name] = (mtime, version)
+        return version
+
+    def set_pointer(self, name, version):
+        """Point `name` at a published version (None removes the pointer)."""
+        path = os.path.join(self.root, name)
+        if version is None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+        self.manifest(version)  # must exist
+        fd, staging = tempfile.mkstemp(prefix=f".{name}-", dir=self.root)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(version + "\n")
+        os.replace(staging, path)
@@ -0,0 +1,124 @@
+"""
+Synthetic Students
+Deterministic fake students for benchmarks and load tests. The same seed
+always yields the same students, so benchmark runs on different commits
+score identical inputs.
+"""
+import random
+
+# CGPA range per analyzer risk band (see analyzer.RISK_BANDS)
+RISK_BAND_CGPA = {
+    'Excellent': (4.5, 5.0),
+    'Good': (3.5, 4.49),
+    'Moderate': (2.5, 3.49),
+    'At Risk': (2.0, 2.49),
+    'High Risk': (0.0, 1.99),
+}
+
+LEVELS = (100, 200, 300, 400, 500)
+DEPARTMENTS = ('Computer Science', 'Cyber Security', 'Software Engineering')
+GRADES = ('A', 'B', 'C', 'D', 'E', 'F')
+STATUSES = ('Registered', 'In Progress', 'Re-enrolled', 'Carried Over')
+
+
+def synthetic_student(rng, index=0, risk_level=None):
+    """
+    Build one student shaped like analyse_student's input, plus the level and
+    matric number the views and the ML model need.
+
+    Args:
+        rng (random.Random): Source of randomness
+        index (int): Used for the matric number
+        risk_level (str): Analyzer band to draw the CGPA from; any band if None
+
+    Returns:
+        dict: gpa_cgpa, cgpa_trend, department, level, matric_number,
+            past_courses, current_courses
+    """
+    band = risk_level or rng.choice(list(RISK_BAND_CGPA))
+    low, high = RISK_BAND_CGPA[band]
+    cgpa = round(rng.uniform(low, high), 2)
+    level = rng.choice(LEVELS)
+
+    # One CGPA per completed session, ending at the current one
+    history = [round(min(max(cgpa + rng.uniform(-0.6, 0.6), 0.0), 5.0), 2) for _ in range(level // 100 - 1)]
+    trend = ', '.join(str(v) for v in history + [cgpa]) if history else ''
+
+    prefix = {'Computer Science': 'CSC', 'Cyber Security': 'CYB', 'Software Engineering': 'SEN'}
+    department = rng.choice(DEPARTMENTS)
+    code = prefix[department]
+    return {
+        'matric_number': f'SYN/{level}/{index:06d}',
+        'level': level,
+        'department': department,
+        'gpa_cgpa': cgpa,
+        'cgpa_trend': trend,
+        'past_courses': [
+            {'course': f'{code}{level - 100 or 100}{i}', 'grade': rng.choice(GRADES)}
+            for i in range(rng.randint(6, 9))
+        ],
+        'current_courses': [
+            {'course': f'{code}{level}{i}', 'status': rng.choice(STATUSES)}
+            for i in range(rng.randint(6, 9))
+        ],
+    }
+
+
+def synthetic_students(n, seed=0, risk_level=None):
+    """Return `n` students generated from `seed` (see synthetic_student)."""
+    rng = random.Random(seed)
+    return [synthetic_student(rng, i, risk_level) for i in range(n)]
+
+
+def synthetic_model(n=2000, seed=0):
+    """
+    A DecisionTreeClassifier on the predictor's four features, trained on
+    `n` synthetic students labelled High/Medium/Low by CGPA. For benchmarks
+    (`manage.py bench --model synthetic`), so predictor cases can be measured
+    and compared even where the shipped model does not take those features.
+    """
+    import numpy as np
+    from sklearn.tree import DecisionTreeClassifier
+
+    from .predictor import build_features
+
+    students = synthetic_students(n, seed)
+    features = build_features(
+        [s['gpa_cgpa'] for s in students],
+        [s['level'] for s in students],
+        [len(s['past_courses']) + len(s['current_courses']) for s in students],
+        [s['cgpa_trend'] for s in students],
+    )
+    labels = np.where(features[:, 0] < 2.0, 'High', np.where(features[:, 0] < 3.5, 'Medium', 'Low'))
+    return DecisionTreeClassifier(max_depth=6, random_state=seed).fit(features, labels)
+
+
+def dashboard_form_data(student):
+    """
+    The POST body the dashboard form would send for `student` (basic form plus
+    the "past"/"current" course formsets). The form has no "Carried Over"
+    status, so those courses are submitted as "Registered".
+    """
+    data = {
+        'level': str(student['level']),
+        'department': student['department'],
+        'cgpa': str(student['gpa_cgpa']),
+        'cgpa_trend': student['cgpa_trend'],
+    }
+    for prefix, courses, field in (
+        ('past', student['past_courses'], 'grade'),
+        ('current', student['current_courses'], 'status'),
+    ):
+        data.update({
+            f'{prefix}-TOTAL_FORMS': str(len(courses)),
+            f'{prefix}-INITIAL_FORMS': '0',
+            f'{prefix}-MIN_NUM_FORMS': '6',
+            f'{prefix}-MAX_NUM_FORMS': '1000',
+        })
+        for i, course in enumerate(courses):
+            value = course[field]
+            if value == 'Carried Over':
+                value = 'Registered'
+            data[f'{prefix}-{i}-course'] = course['course']
+            data[f'{prefix}-{i}-{field}'] = value
+    return data
@@ -0,0 +1,65 @@
+"""
+CGPA Trend
+Parse-once representation of a student's CGPA history. The form produces it
+in StudentBasicForm.clean_cgpa_trend, and both analyse_student and the
+predictor take it as-is instead of re-splitting the raw string.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class CgpaTrend:
+    """
+    CGPA history plus the features derived from it in the same pass.
+
+    Attributes:
+        values: CGPAs in the order entered
+        last_delta: last value minus the one before it (0.0 with < 2 values)
+        slope: least-squares slope per semester over the whole history
+            (0.0 with < 2 values)
+    """
+    values: tuple = ()
+    last_delta: float = 0.0
+    slope: float = 0.0
+
+    def __len__(self):
+        return len(self.values)
+
+    @classmethod
+    def from_values(cls, values):
+        """Build a trend from numbers, computing the features in one pass."""
+        values = tuple(values)
+        n = len(values)
+        if n < 2:
+            return cls(values)
+
+        sum_y = 0.0
+        sum_xy = 0.0
+        for x, y in enumerate(values):
+            sum_y += y
+            sum_xy += x * y
+        # x = 0..n-1, so sum(x) and sum(x^2) have closed forms
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
+        return cls(values, values[-1] - values[-2], slope)
+
+    @classmethod
+    def parse(cls, raw):
+        """
+        Parse a comma separated string such as "3.1, 3.45, 2.98" (entries that
+        are not numbers are skipped), a list of numbers, or an existing trend.
+        """
+        if isinstance(raw, cls):
+            return raw
+        if isinstance(raw, str):
+            values = []
+            for x in raw.split(','):
+                try:
+                    values.append(float(x.strip()))
+                except ValueError:
+                    pass
+            return cls.from_values(values)
+        if isinstance(raw, (list, tuple)):
+            return cls.from_values(raw)
+        return cls()
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Create your models here.
 class Accounts(models.Model):
@@ -7,8 +8,82 @@ class Accounts(models.Model):
     email = models.CharField()
     phone = models.CharField(max_length=20)
     matric_number = models.CharField(max_length=20, unique=True)
-    
 
 
+# ──────────────────────────────
+# Analysis history
+# ──────────────────────────────
+class AnalysisResult(models.Model):
+    """
+    One dashboard analysis, kept so advisors can see a student's history
+    without re-running it. Everything queried on is a small typed column;
+    only the message lists shown to the student are JSON.
+    """
 
-    
+    class RiskLevel(models.IntegerChoices):
+        EXCELLENT = 0, "Excellent"
+        GOOD = 1, "Good"
+        MODERATE = 2, "Moderate"
+        AT_RISK = 3, "At Risk"
+        HIGH_RISK = 4, "High Risk"
+
+    class Trend(models.IntegerChoices):
+        NOT_ENOUGH_DATA = 0, "Not enough data"
+        STABLE = 1, "Stable"
+        IMPROVING = 2, "Improving"
+        DECLINING = 3, "Declining"
+
+    class MlRiskLevel(models.IntegerChoices):
+        LOW = 0, "Low"
+        MEDIUM = 1, "Medium"
+        HIGH = 2, "High"
+
+    account = models.ForeignKey(Accounts, on_delete=models.CASCADE, related_name="analysis_results")
+    created_at = models.DateTimeField(default=timezone.now)
+    level = models.PositiveSmallIntegerField()
+    cgpa = models.FloatField()
+    risk_level = models.PositiveSmallIntegerField(choices=RiskLevel.choices)
+    trend = models.PositiveSmallIntegerField(choices=Trend.choices)
+    # Null when the ML prediction was unavailable
+    ml_risk_level = models.PositiveSmallIntegerField(choices=MlRiskLevel.choices, null=True)
+    ml_confidence = models.FloatField(null=True)
+    model_version = models.CharField(max_length=12, blank=True)
+    # {"cgpa_status", "trend_description", "cautions", "suggestions", "explanation"}
+    messages = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["account", "created_at"], name="analysis_account_created_idx"),
+            models.Index(fields=["risk_level", "created_at"], name="analysis_risk_created_idx"),
+        ]
+
+    @classmethod
+    def from_analysis(cls, account_id, level, cgpa, result_dict, model_version=None):
+        """
+        Build an unsaved row from a successful run_analysis result.
+
+        Args:
+            account_id (int): Accounts primary key (session["student_id"])
+            level: the student's level from StudentBasicForm
+            cgpa (float): the submitted CGPA
+            result_dict (dict): result of run_analysis with status 200
+            model_version (str): predictor.model_version(), or None
+        """
+        ml_risk_level = cls.MlRiskLevel.__members__.get(str(result_dict.get("ml_risk_level", "")).upper())
+        return cls(
+            account_id=account_id,
+            level=int(level),
+            cgpa=cgpa,
+            risk_level=cls.RiskLevel[result_dict["risk_level"].upper().replace(" ", "_")],
+            trend=cls.Trend[result_dict["cgpa_trend"].upper().replace(" ", "_")],
+            ml_risk_level=ml_risk_level,
+            ml_confidence=result_dict.get("ml_confidence") if ml_risk_level is not None else None,
+            model_version=model_version or "",
+            messages={
+                "cgpa_status": result_dict.get("cgpa_status", ""),
+                "trend_description": result_dict.get("trend_description", ""),
+                "cautions": list(result_dict.get("cautions", [])),
+                "suggestions": list(result_dict.get("suggestions", [])),
+                "explanation": result_dict.get("explanation", ""),
+            },
+        )
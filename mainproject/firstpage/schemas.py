@@ -0,0 +1,106 @@
+"""
+JSON Schemas
+Lightweight validation for the JSON analysis API. Mirrors the checks of
+StudentBasicForm and the course formsets without building any form objects.
+"""
+from .forms import DEPARTMENT_CHOICES, GRADE_CHOICES, LEVEL_CHOICES, STATUS_CHOICES
+from .ml.trend import CgpaTrend
+
+LEVELS = {value for value, _ in LEVEL_CHOICES if value}
+DEPARTMENTS = {value for value, _ in DEPARTMENT_CHOICES if value}
+GRADES = {value for value, _ in GRADE_CHOICES}
+STATUSES = {value for value, _ in STATUS_CHOICES}
+
+COURSE_MAX_LENGTH = 50
+
+
+class SchemaError(Exception):
+    """Raised with a {field: message} dict when a payload does not validate."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _courses(items, field, extra_field, allowed, errors):
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        errors[field] = "Must be a list of courses."
+        return []
+    courses = []
+    for i, item in enumerate(items):
+        if isinstance(item, str):
+            item = {"course": item}
+        if not isinstance(item, dict):
+            errors[f"{field}[{i}]"] = "Must be an object or a course code."
+            continue
+        course = item.get("course")
+        if not isinstance(course, str) or not course.strip() or len(course.strip()) > COURSE_MAX_LENGTH:
+            errors[f"{field}[{i}].course"] = f"Course code must be 1-{COURSE_MAX_LENGTH} characters."
+            continue
+        value = item.get(extra_field, "")
+        # Check the type first: a list or object is unhashable in the set lookup
+        if not isinstance(value, str) or (value not in allowed and value != ""):
+            errors[f"{field}[{i}].{extra_field}"] = f"Must be one of: {', '.join(sorted(allowed))}."
+            continue
+        courses.append({"course": course.strip(), extra_field: value})
+    return courses
+
+
+def parse_student(payload):
+    """
+    Validate one student payload.
+
+    Args:
+        payload (dict): cgpa, level, department, cgpa_trend (string or list,
+            optional), past_courses and current_courses (lists)
+
+    Returns:
+        tuple: (cleaned_data for analyse_student, level)
+
+    Raises:
+        SchemaError: with per-field messages
+    """
+    if not isinstance(payload, dict):
+        raise SchemaError({"__all__": "Each student must be a JSON object."})
+
+    errors = {}
+    cgpa = payload.get("cgpa")
+    if not _is_number(cgpa) or not 0.0 <= cgpa <= 5.0:
+        errors["cgpa"] = "Must be a number between 0.0 and 5.0."
+
+    level = str(payload.get("level", ""))
+    if level not in LEVELS:
+        errors["level"] = f"Must be one of: {', '.join(sorted(LEVELS))}."
+
+    department = payload.get("department")
+    if not isinstance(department, str) or department not in DEPARTMENTS:
+        errors["department"] = "Please select your department."
+
+    raw_trend = payload.get("cgpa_trend", "")
+    if raw_trend is None:
+        raw_trend = ""
+    if isinstance(raw_trend, list) and not all(_is_number(v) for v in raw_trend):
+        errors["cgpa_trend"] = "Must be a list of numbers or a comma separated string."
+    elif not isinstance(raw_trend, (str, list)):
+        errors["cgpa_trend"] = "Must be a list of numbers or a comma separated string."
+
+    past_courses = _courses(payload.get("past_courses"), "past_courses", "grade", GRADES, errors)
+    current_courses = _courses(payload.get("current_courses"), "current_courses", "status", STATUSES, errors)
+
+    if errors:
+        raise SchemaError(errors)
+
+    cleaned_data = {
+        "gpa_cgpa": float(cgpa),
+        "cgpa_trend": CgpaTrend.parse([float(v) for v in raw_trend] if isinstance(raw_trend, list) else raw_trend),
+        "department": department,
+        "past_courses": past_courses,
+        "current_courses": current_courses,
+    }
+    return cleaned_data, level
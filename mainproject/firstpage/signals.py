@@ -0,0 +1,45 @@
+"""
+Signal handlers: keep the account lookup cache in step with Accounts, and
+tune new SQLite connections. Connected in FirstpageConfig.ready().
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import account_lookup
+from .models import Accounts
+
+
+@receiver(pre_save, sender=Accounts)
+def remember_old_matric_number(sender, instance, raw=False, **kwargs):
+    # A changed matric number must also drop the entry under the old one
+    if raw or instance.pk is None or not account_lookup.enabled():
+        instance._old_matric_number = None
+        return
+    instance._old_matric_number = (
+        Accounts.objects.filter(pk=instance.pk).values_list("matric_number", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Accounts)
+def invalidate_on_save(sender, instance, **kwargs):
+    account_lookup.invalidate(instance.matric_number, getattr(instance, "_old_matric_number", None))
+
+
+@receiver(post_delete, sender=Accounts)
+def invalidate_on_delete(sender, instance, **kwargs):
+    account_lookup.invalidate(instance.matric_number)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    # settings.SQLITE_PRAGMAS is filled in by DB_PROFILE=production
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None)
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
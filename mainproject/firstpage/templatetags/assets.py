@@ -0,0 +1,25 @@
+from django import template
+from django.utils.html import format_html
+
+from .. import assets
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_stylesheet(name):
+    """<link> for a pinned third-party stylesheet (see assets.VENDOR_ASSETS)."""
+    return format_html(
+        '<link href="{}" rel="stylesheet" integrity="{}" crossorigin="anonymous">',
+        assets.vendor_asset_url(name),
+        assets.VENDOR_ASSETS[name]["integrity"],
+    )
+
+
+@register.simple_tag
+def inline_stylesheet(static_path):
+    """
+    Inline a small, fully above-the-fold stylesheet as <style>, so the page
+    renders without waiting for a second request.
+    """
+    return format_html("<style>{}</style>", assets.inline_css(static_path))
@@ -1,3 +1,1340 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+import joblib
+import numpy as np
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from sklearn.tree import DecisionTreeClassifier
+
+from . import analysis_cache, assets, history, inference, metrics, views
+from .ml import predictor
+from .models import Accounts, AnalysisResult
+from .ml.analyzer import analyse_student, analyse_students
+from .ml.cohort import analyse_cohort, cohort_records
+from .ml.trend import CgpaTrend
+from .forms import AccountForm, StudentBasicForm
+from .ml.compiled import CompiledModel, export_model, load_compiled
+from .ml import pool, shadow, store
+from .ml.batcher import MicroBatcher
+from .ml.synthetic import synthetic_model, synthetic_students
+
+
+def make_student(cgpa, trend="", statuses=("Registered",) * 6):
+    return {
+        "gpa_cgpa": cgpa,
+        "cgpa_trend": trend,
+        "department": "Computer Science",
+        "past_courses": [{"course": f"CSC10{i}", "grade": "B"} for i in range(6)],
+        "current_courses": [{"course": f"CSC20{i}", "status": s} for i, s in enumerate(statuses)],
+    }
+
+
+def dashboard_payload(cgpa="2.2", trend="2.9, 2.4", level="200"):
+    data = {
+        "level": level,
+        "department": "Computer Science",
+        "cgpa": cgpa,
+        "cgpa_trend": trend,
+    }
+    for prefix, field, value in (("past", "grade", "B"), ("current", "status", "Registered")):
+        data.update({
+            f"{prefix}-TOTAL_FORMS": "6",
+            f"{prefix}-INITIAL_FORMS": "0",
+            f"{prefix}-MIN_NUM_FORMS": "6",
+            f"{prefix}-MAX_NUM_FORMS": "1000",
+        })
+        for i in range(6):
+            data[f"{prefix}-{i}-course"] = f"CSC{prefix[0].upper()}{i}"
+            data[f"{prefix}-{i}-{field}"] = value
+    return data
+
+
+def make_model():
+    """Small tree trained on the four predictor features."""
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.uniform(0, 5, 200),
+        rng.choice([100, 200, 300, 400, 500], 200),
+        rng.integers(6, 18, 200),
+        rng.uniform(-1, 1, 200),
+    ])
+    y = np.where(X[:, 0] < 2.0, "High", np.where(X[:, 0] < 3.5, "Medium", "Low"))
+    return DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+
+
+class PredictorBatchTests(SimpleTestCase):
+    def setUp(self):
+        self.model = make_model()
+        patcher = mock.patch.object(predictor, "get_model", return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_matches_sklearn(self):
+        cgpa = [1.5, 2.8, 4.2]
+        level = ["100", "300", "400"]
+        courses = [12, 10, 14]
+        trend = ["2.0, 1.5", "", [3.0, 2.8]]
+
+        labels, confidences = predictor.predict_academic_risk_batch(cgpa, level, courses, trend)
+
+        features = np.array([[1.5, 100, 12, -0.5], [2.8, 300, 10, 0.0], [4.2, 400, 14, -0.2]])
+        expected = self.model.predict(features)
+        self.assertEqual(list(labels), list(expected))
+        self.assertTrue(np.allclose(confidences, self.model.predict_proba(features).max(axis=1) * 100))
+
+    def test_batch_accepts_dataframe(self):
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            "cgpa": [1.5, 4.2],
+            "level": [100, 400],
+            "total_courses": [12, 14],
+            "cgpa_trend": [-0.5, 0.1],
+        })
+        labels, confidences = predictor.predict_academic_risk_batch(frame)
+        self.assertEqual(list(labels), ["High", "Low"])
+        self.assertEqual(len(confidences), 2)
+
+    def test_single_row_wraps_batch(self):
+        result = predictor.predict_academic_risk(4.2, "400", 14, "4.0, 4.2")
+        self.assertEqual(result["mlRiskLevel"], "Low")
+        self.assertIsInstance(result["mlConfidence"], float)
+
+    def test_single_row_unavailable_without_model(self):
+        with mock.patch.object(predictor, "get_model", return_value=None):
+            self.assertEqual(predictor.predict_academic_risk(3.0, "200", 12, ""), "Unavailable")
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "model.pkl")
+        joblib.dump(make_model(), self.path)
+
+    def test_loads_lazily_and_once(self):
+        registry = predictor.ModelRegistry(self.path)
+        self.assertIsNone(registry._model)
+        first = registry.get()
+        self.assertIsNotNone(first)
+        self.assertIs(registry.get(), first)
+
+    def test_reloads_when_mtime_changes(self):
+        registry = predictor.ModelRegistry(self.path)
+        first = registry.get()
+        joblib.dump(make_model(), self.path)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNot(registry.get(), first)
+
+    def test_failed_load_is_retried(self):
+        registry = predictor.ModelRegistry(self.path + ".missing", retry_seconds=0)
+        self.assertIsNone(registry.get())
+        registry.path = self.path
+        self.assertIsNotNone(registry.get())
+
+    def test_mmap_mode_loads_uncompressed_dump(self):
+        def is_mapped(array):
+            return isinstance(array, np.memmap) or isinstance(getattr(array, "base", None), np.memmap)
+
+        registry = predictor.ModelRegistry(self.path, mmap_mode="r")
+        self.assertTrue(registry.warm_up())
+        # sklearn's Tree.__setstate__ copies the node arrays; the estimator's
+        # own arrays (classes_) stay mapped from the file
+        self.assertTrue(is_mapped(registry.get().classes_))
+        self.assertFalse(is_mapped(predictor.ModelRegistry(self.path).get().classes_))
+
+    def test_artifact_setting_selects_the_bundled_model(self):
+        self.addCleanup(setattr, predictor, "registry", None)
+        with mock.patch.dict(predictor.ARTIFACTS, mmap=(self.path, "r")), \
+                override_settings(ML_MODEL_STORE=None, ML_MODEL_ARTIFACT="mmap"):
+            registry = predictor.get_registry()
+            self.assertEqual((registry.path, registry.mmap_mode), (self.path, "r"))
+        self.assertEqual(predictor.get_registry().path, predictor.compiled_model_path)  # present, so preferred
+        with self.assertRaisesMessage(ValueError, "ML_MODEL_ARTIFACT must be one of"):
+            predictor._default_registry(artifact="onnx")
+
+    def test_warm_up_runs_dummy_predict(self):
+        registry = predictor.ModelRegistry(self.path)
+        self.assertTrue(registry.warm_up())
+
+
+class CompiledModelTests(SimpleTestCase):
+    def golden_set(self):
+        rng = np.random.default_rng(1)
+        return np.column_stack([
+            rng.uniform(0, 5, 2000),
+            rng.choice([100, 200, 300, 400, 500], 2000),
+            rng.integers(6, 18, 2000),
+            rng.uniform(-1, 1, 2000),
+        ])
+
+    def labels(self, X):
+        return np.where(X[:, 3] < -0.3, "High", np.where(X[:, 0] < 3.0, "Medium", "Low"))
+
+    def assert_matches(self, model, exact=True):
+        X = self.golden_set()
+        compiled = CompiledModel(export_model(model))
+        if exact:
+            self.assertTrue(np.array_equal(compiled.predict_proba(X), model.predict_proba(X)))
+        else:
+            self.assertTrue(np.allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=1e-12))
+        self.assertTrue(np.array_equal(compiled.predict(X), model.predict(X)))
+
+    def test_decision_tree_matches_exactly(self):
+        self.assert_matches(make_model())
+
+    def test_random_forest_matches_exactly(self):
+        from sklearn.ensemble import RandomForestClassifier
+
+        X = self.golden_set()
+        self.assert_matches(RandomForestClassifier(n_estimators=10, random_state=0).fit(X, self.labels(X)))
+
+    def test_logistic_regression_matches(self):
+        from sklearn.linear_model import LogisticRegression
+
+        X = self.golden_set()
+        self.assert_matches(LogisticRegression(max_iter=500).fit(X, self.labels(X)), exact=False)
+        binary = np.where(X[:, 0] < 3.0, "High", "Low")
+        self.assert_matches(LogisticRegression(max_iter=500).fit(X, binary), exact=False)
+
+    def test_shipped_export_matches_pickle(self):
+        model = joblib.load(predictor.model_path)
+        compiled = load_compiled(predictor.compiled_model_path)
+        X = self.golden_set()[:, :model.n_features_in_]
+        self.assertTrue(np.array_equal(compiled.predict_proba(X), model.predict_proba(X)))
+
+    def test_rejects_wrong_feature_count(self):
+        compiled = CompiledModel(export_model(make_model()))
+        with self.assertRaises(ValueError):
+            compiled.predict_proba(np.zeros((1, 3)))
+
+
+class AnalyzerTests(SimpleTestCase):
+    def test_excellent_has_no_cautions(self):
+        result, status = analyse_student(make_student(4.7, "4.8, 4.6"))
+        self.assertEqual(status, 200)
+        self.assertEqual(result["risk_level"], "Excellent")
+        self.assertEqual(result["cgpa_trend"], "Stable")
+        self.assertEqual(result["cautions"], [])
+        self.assertEqual(len(result["suggestions"]), 1)
+
+    def test_at_risk_declining_with_carried_over(self):
+        statuses = ("Carried Over", "carried over", "Registered", "Registered", "In Progress", "Registered")
+        result, status = analyse_student(make_student(2.2, "2.9, 2.4", statuses))
+        self.assertEqual(status, 200)
+        self.assertEqual(list(result), [
+            "risk_level", "cgpa_status", "cgpa_trend", "trend_description",
+            "cautions", "suggestions", "explanation",
+        ])
+        self.assertEqual(result["cautions"], [
+            "⚠️ WARNING: CGPA is declining significantly",
+            "You have 2 carried over course(s). Prioritize these to avoid accumulation.",
+            "Academic performance needs attention.",
+        ])
+        self.assertEqual(result["suggestions"][0], "Schedule a meeting with your academic advisor")
+
+    def test_moderate_declining_adds_decline_messages_first(self):
+        result, _ = analyse_student(make_student(3.0, "3.2, 3.1"))
+        self.assertEqual(result["cgpa_trend"], "Declining")
+        self.assertEqual(result["cautions"], ["Your academic performance shows signs of decline."])
+        self.assertEqual(len(result["suggestions"]), 5)
+        self.assertTrue(result["suggestions"][0].startswith("Increase study time"))
+
+    def test_validation_errors(self):
+        result, status = analyse_student(make_student(5.5))
+        self.assertEqual(status, 400)
+        self.assertEqual(result["error"], "GPA/CGPA must be between 0.00 and 5.00")
+
+    def test_results_are_not_shared_between_calls(self):
+        first, _ = analyse_student(make_student(1.5))
+        first["suggestions"].append("changed")
+        second, _ = analyse_student(make_student(1.5))
+        self.assertNotIn("changed", second["suggestions"])
+
+    def test_batch_matches_single(self):
+        students = [make_student(c, t) for c in (1.0, 2.1, 2.7, 3.9, 4.9) for t in ("", "2.0, 2.5", "2.5, 2.0")]
+        self.assertEqual(analyse_students(students), [analyse_student(s) for s in students])
+
+
+class CohortAnalysisTests(SimpleTestCase):
+    def students(self):
+        statuses = ("Carried Over", "Registered", "In Progress", "Registered", "Re-enrolled", "Registered")
+        students = [
+            make_student(cgpa, trend, statuses if i % 2 else ("Registered",) * 6)
+            for i, cgpa in enumerate((0.5, 2.0, 2.3, 2.5, 3.2, 3.5, 4.0, 4.5, 5.0))
+            for trend in ("", "3.0", "2.0, 2.5", "2.5, 2.0", "3.0, 2.9", "2.9, 3.0", "3.0, 3.0", [1.0, 2.0])
+        ]
+        students.append(make_student(6.0))
+        students.append(dict(make_student(3.0), past_courses=[]))
+        students += [dict(make_student(3.0), gpa_cgpa=cgpa) for cgpa in (float("nan"), None, "")]
+        no_status = make_student(3.0)
+        no_status["current_courses"] = [dict(c, status=None) for c in no_status["current_courses"]]
+        students.append(no_status)
+        students.append(dict(no_status, gpa_cgpa=4.8))  # this band does not look at the statuses
+        return students
+
+    def test_matches_analyse_student(self):
+        import pandas as pd
+
+        students = self.students()
+        results = analyse_cohort(pd.DataFrame(students))
+        self.assertEqual(cohort_records(results), [analyse_student(s) for s in students])
+
+    def test_accepts_status_strings_and_counts(self):
+        import pandas as pd
+
+        students = self.students()
+        frame = pd.DataFrame(students)
+        frame["current_courses"] = [[c["status"] for c in s["current_courses"]] for s in students]
+        self.assertEqual(cohort_records(analyse_cohort(frame)), [analyse_student(s) for s in students])
+
+        # Precomputed counts mean the statuses are never read, so leave out the unreadable ones
+        students = [s for s in students if all(c["status"] is not None for c in s["current_courses"])]
+        frame = pd.DataFrame(students)
+        frame["carried_over"] = [sum(c["status"] == "Carried Over" for c in s["current_courses"]) for s in students]
+        self.assertEqual(cohort_records(analyse_cohort(frame)), [analyse_student(s) for s in students])
+
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "analysis": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-analysis"},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AnalysisCacheTests(SimpleTestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches["analysis"].clear()
+        analysis_cache.stats.reset()
+
+    def test_key_ignores_course_order_and_trend_spacing(self):
+        student = make_student(3.0, "2.9,3.0")
+        shuffled = dict(student, cgpa_trend="2.9, 3.0", current_courses=student["current_courses"][::-1])
+        self.assertEqual(
+            analysis_cache.analysis_cache_key(student, "200", "abc"),
+            analysis_cache.analysis_cache_key(shuffled, "200", "abc"),
+        )
+
+    def test_key_includes_level_and_model_version(self):
+        student = make_student(3.0)
+        key = analysis_cache.analysis_cache_key(student, "200", "abc")
+        self.assertNotEqual(key, analysis_cache.analysis_cache_key(student, "300", "abc"))
+        self.assertNotEqual(key, analysis_cache.analysis_cache_key(student, "200", "def"))
+
+    def test_hits_and_misses(self):
+        student = make_student(3.0)
+        compute = mock.Mock(side_effect=lambda: analyse_student(student))
+        first = analysis_cache.cached_analysis(student, "200", "abc", compute)
+        second = analysis_cache.cached_analysis(student, "200", "abc", compute)
+        self.assertEqual(first, second)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(analysis_cache.cache_stats(), {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_server_errors_and_missing_model_are_not_cached(self):
+        compute = mock.Mock(return_value=({"error": "boom"}, 500))
+        analysis_cache.cached_analysis(make_student(3.0), "200", "abc", compute)
+        analysis_cache.cached_analysis(make_student(3.0), "200", "abc", compute)
+        analysis_cache.cached_analysis(make_student(3.0), "200", None, compute)
+        self.assertEqual(compute.call_count, 3)
+
+    def test_failed_predictions_are_not_cached(self):
+        import asyncio
+
+        student = make_student(3.0)
+
+        def compute():
+            result_dict, status_code = analyse_student(student)
+            return dict(result_dict, ml_risk_level="Unavailable", ml_confidence=None), status_code
+
+        compute = mock.Mock(side_effect=compute)
+        analysis_cache.cached_analysis(student, "200", "abc", compute)
+        analysis_cache.cached_analysis(student, "200", "abc", compute)
+        self.assertEqual(compute.call_count, 2)
+        async_compute = mock.AsyncMock(side_effect=lambda: compute())
+        asyncio.run(analysis_cache.acached_analysis(student, "200", "abc", async_compute))
+        asyncio.run(analysis_cache.acached_analysis(student, "200", "abc", async_compute))
+        self.assertEqual(async_compute.await_count, 2)
+
+
+@override_settings(CACHES=TEST_CACHES, ANALYSIS_HISTORY=False)
+class DashboardViewTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches["analysis"].clear()
+        self.account = Accounts.objects.create(
+            fullname="Ada Obi", email="ada@example.com", phone="0800", matric_number="22/10588"
+        )
+        session = self.client.session
+        session["student_id"] = self.account.id
+        session["matric_number"] = self.account.matric_number
+        session.save()
+
+    def test_get_renders_empty_form(self):
+        response = self.client.get(reverse("uniguide:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["show_result"])
+
+    def test_cached_form_skeleton_keeps_csrf_token_and_errors(self):
+        from django.core.cache import caches
+
+        caches["default"].clear()
+        self.client.get(reverse("uniguide:dashboard"))
+        with mock.patch("django.forms.forms.BaseForm.as_p") as as_p:
+            response = self.client.get(reverse("uniguide:dashboard"))
+        as_p.assert_not_called()
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertContains(response, 'name="past-TOTAL_FORMS"')
+
+        response = self.client.post(reverse("uniguide:dashboard"), dashboard_payload(cgpa="9"))
+        self.assertContains(response, "Ensure this value is less than or equal to 5.0.")
+
+    def test_post_renders_result(self):
+        with mock.patch.object(predictor, "get_model", return_value=make_model()):
+            response = self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["show_result"])
+        result = response.context["result"]
+        self.assertEqual(result["risk_level"], "At Risk")
+        self.assertEqual(result["ml_risk_level"], "Medium")
+
+    def test_logs_stage_timings(self):
+        with self.assertLogs("mainproject.firstpage.views", level="INFO") as logs:
+            self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+        record = logs.records[-1]
+        for field in ("parse_ms", "analyse_ms", "predict_ms", "render_ms"):
+            self.assertIsInstance(getattr(record, field), float)
+
+    def test_repeat_post_is_served_from_cache(self):
+        with mock.patch("mainproject.firstpage.views.run_analysis", wraps=views.run_analysis) as run, \
+                mock.patch("mainproject.firstpage.views.model_version", return_value="test"), \
+                mock.patch.object(predictor, "get_model", return_value=make_model()):
+            self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+            self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+        self.assertEqual(run.call_count, 1)
+
+
+@override_settings(ACCOUNT_LOOKUP_CACHE_ALIAS="default")
+class AccountLookupTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches["default"].clear()
+        self.account = Accounts.objects.create(
+            fullname="Ada Obi", email="ada@example.com", phone="0800", matric_number="22/10588"
+        )
+
+    def test_lookup_is_cached(self):
+        from .account_lookup import get_account_id
+
+        self.assertEqual(get_account_id("22/10588"), self.account.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_account_id("22/10588"), self.account.id)
+
+    def test_unknown_matric_number_is_not_cached(self):
+        from django.db.models.signals import post_save
+
+        from .account_lookup import get_account_id
+
+        self.assertIsNone(get_account_id("22/20000"))
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_account_id("22/20000"))
+        # Registered through another worker: this one's signal never fires
+        with mock.patch.object(post_save, "send"):
+            other = Accounts.objects.create(fullname="B", email="b@example.com", phone="1", matric_number="22/20000")
+        self.assertEqual(get_account_id("22/20000"), other.id)
+
+    @override_settings(ACCOUNT_LOOKUP_CACHE_ALIAS=None)
+    def test_off_without_cache_alias(self):
+        from .account_lookup import get_account_id
+
+        get_account_id("22/10588")
+        with self.assertNumQueries(1):
+            self.assertEqual(get_account_id("22/10588"), self.account.id)
+        self.account.phone = "0801"
+        with self.assertNumQueries(1):  # the UPDATE only, no old-matric-number lookup
+            self.account.save()
+
+    def test_check_warns_about_locmem_cache(self):
+        from .checks import check_account_lookup_cache
+
+        self.assertEqual([w.id for w in check_account_lookup_cache(None)], ["firstpage.W001"])
+        with override_settings(ACCOUNT_LOOKUP_CACHE_ALIAS=None):
+            self.assertEqual(check_account_lookup_cache(None), [])
+
+    def test_save_and_delete_invalidate(self):
+        from .account_lookup import get_account_id
+
+        get_account_id("22/10588")
+        self.account.matric_number = "22/10599"
+        self.account.save()
+        self.assertIsNone(get_account_id("22/10588"))
+        self.assertEqual(get_account_id("22/10599"), self.account.id)
+        self.account.delete()
+        self.assertIsNone(get_account_id("22/10599"))
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies", CACHES=TEST_CACHES)
+    def test_login_with_signed_cookie_sessions(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse("uniguide:login"), {"matric_number": "22/10588"})
+        self.assertRedirects(response, reverse("uniguide:dashboard"), fetch_redirect_response=False)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("uniguide:dashboard"))
+        self.assertEqual(response.status_code, 200)
+
+
+class RegistrationTests(TestCase):
+    def payload(self, matric="22/10588"):
+        return {"fullname": "Ada Obi", "email": "ada@example.com", "phone": "0800", "matric_number": matric}
+
+    def test_register_is_a_single_insert(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("uniguide:register"), self.payload())
+        self.assertRedirects(response, reverse("uniguide:login"), fetch_redirect_response=False)
+        statements = [q["sql"].split()[0] for q in queries.captured_queries]
+        self.assertNotIn("SELECT", statements)
+        self.assertEqual(statements.count("INSERT"), 1)
+
+    def test_duplicate_matric_number_becomes_form_error(self):
+        Accounts.objects.create(**self.payload())
+        response = self.client.post(reverse("uniguide:register"), self.payload())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["form"].errors["matric_number"], ["Matric number already registered."])
+        self.assertEqual(Accounts.objects.count(), 1)
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        from django.db import IntegrityError
+
+        form = AccountForm(self.payload())
+        self.assertTrue(form.is_valid())
+        with mock.patch.object(Accounts, "save", side_effect=IntegrityError("NOT NULL constraint failed")):
+            with self.assertRaises(IntegrityError):
+                form.register()
+        self.assertNotIn("matric_number", form.errors)
+
+    def test_import_accounts_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        Accounts.objects.create(**self.payload("22/00001"))
+        rows = ["fullname,email,phone,matric_number"]
+        rows += [f"Student {i},s{i}@example.com,0800,22/{i:05d}" for i in range(1, 6)]
+        rows += ["Student 3 again,x@example.com,0800,22/00003", "No Matric,y@example.com,0800,"]
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("\n".join(rows) + "\n")
+        self.addCleanup(os.remove, f.name)
+
+        out, err = StringIO(), StringIO()
+        call_command("import_accounts", f.name, batch_size=2, stdout=out, stderr=err)
+        self.assertEqual(Accounts.objects.count(), 5)
+        self.assertIn("Registered 4 accounts; 1 already registered, 1 repeated rows, 1 invalid rows", out.getvalue())
+        self.assertIn("line 7: matric_number 22/00003 repeats", err.getvalue())
+        self.assertIn("line 8: matric_number", err.getvalue())
+
+
+class SqliteProfileTests(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        from django.db import connections
+
+        pragmas = {"synchronous": "NORMAL", "busy_timeout": 1234, "temp_store": "MEMORY"}
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            conn = connections.create_connection("default")
+            self.addCleanup(conn.close)
+            with conn.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous")
+                self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+                cursor.execute("PRAGMA busy_timeout")
+                self.assertEqual(cursor.fetchone()[0], 1234)
+
+
+class StaticAssetTests(SimpleTestCase):
+    def test_minify_css(self):
+        css = "/* header */\n.logo {\n    width: 80px;\n    margin: 0 auto;\n}\n"
+        self.assertEqual(assets.minify_css(css), ".logo{width:80px;margin:0 auto}")
+
+    def test_vendor_asset_falls_back_to_cdn_only_in_development(self):
+        with mock.patch.object(assets.finders, "find", return_value=None):
+            with override_settings(DEBUG=True):
+                url = assets.vendor_asset_url("bootstrap.min.css")
+            self.assertEqual(url, assets.VENDOR_ASSETS["bootstrap.min.css"]["url"])
+            with override_settings(DEBUG=False):
+                url = assets.vendor_asset_url("bootstrap.min.css")
+            self.assertEqual(url, "/static/vendor/bootstrap-5.3.3/bootstrap.min.css")
+
+    def test_vendoring_takes_effect_without_a_restart(self):
+        with override_settings(DEBUG=True):
+            with mock.patch.object(assets.finders, "find", return_value=None):
+                self.assertTrue(assets.vendor_asset_url("bootstrap.min.css").startswith("https://"))
+            with mock.patch.object(assets.finders, "find", return_value="/somewhere/bootstrap.min.css"):
+                self.assertTrue(assets.vendor_asset_url("bootstrap.min.css").startswith("/static/"))
+
+    def test_vendored_asset_is_self_hosted(self):
+        with mock.patch.object(assets.finders, "find", return_value="/somewhere/bootstrap.min.css"):
+            url = assets.vendor_asset_url("bootstrap.min.css")
+        self.assertEqual(url, "/static/vendor/bootstrap-5.3.3/bootstrap.min.css")
+
+    def test_deploy_check_fails_on_missing_vendor_assets(self):
+        from .checks import check_vendor_assets
+
+        with mock.patch.object(assets.finders, "find", return_value=None):
+            self.assertEqual([e.id for e in check_vendor_assets(None)], ["firstpage.E002"])
+        with mock.patch.object(assets.finders, "find", return_value="/somewhere/bootstrap.min.css"):
+            self.assertEqual(check_vendor_assets(None), [])
+
+    def test_login_page_inlines_its_stylesheet(self):
+        response = self.client.get(reverse("uniguide:login"))
+        self.assertContains(response, "<style>")
+        self.assertNotContains(response, "css/register.css")
+
+
+class BenchCommandTests(SimpleTestCase):
+    def test_synthetic_students_are_deterministic_and_in_band(self):
+        self.assertEqual(synthetic_students(20, seed=3), synthetic_students(20, seed=3))
+        self.assertNotEqual(synthetic_students(20, seed=3), synthetic_students(20, seed=4))
+        for student in synthetic_students(20, seed=3, risk_level="Moderate"):
+            result, status = analyse_student(student)
+            self.assertEqual((status, result["risk_level"]), (200, "Moderate"))
+
+    def test_synthetic_model_scores_the_predictor_features(self):
+        from .management.commands.bench import _total_courses
+
+        model = synthetic_model(n=200)
+        self.assertEqual(model.n_features_in_, len(predictor.FEATURE_COLUMNS))
+        student = synthetic_students(1)[0]
+        level = student["level"]
+        self.assertEqual(views._ml_inputs(student, level)[2], _total_courses(student))
+        with mock.patch.object(predictor, "get_model", return_value=model):
+            result = predictor.predict_academic_risk(*views._ml_inputs(student, level))
+        self.assertIn(result["mlRiskLevel"], ("High", "Medium", "Low"))
+
+    def test_saves_and_compares_baseline(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with mock.patch.object(predictor, "get_model", return_value=make_model()):
+                call_command("bench", only=["analyse", "predict"], min_time=0, min_rounds=3,
+                             batch_size=16, save=path, stdout=StringIO())
+            with open(path) as f:
+                saved = json.load(f)
+            self.assertEqual(saved["environment"]["seed"], 0)
+            self.assertEqual(saved["results"]["predict/batch_16"]["rows_per_op"], 16)
+            self.assertEqual(saved["results"]["analyse_student/high_risk"]["rounds"], 3)
+
+            out = StringIO()
+            call_command("bench", only=["analyse"], min_time=0, min_rounds=3, compare=path, stdout=out)
+            self.assertIn("%", out.getvalue())
+
+
+@override_settings(ANALYSIS_HISTORY=False)
+class LoadTestCommandTests(LiveServerTestCase):
+    def test_full_flow_against_running_server(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "curve.json")
+            # One student: the live server shares a single in-memory SQLite
+            # connection between its threads, so concurrent writes can clash.
+            call_command("loadtest", url=self.live_server_url, concurrency=[1], duration=1.0,
+                         warmup=0.2, save=path, stdout=StringIO())
+            with open(path) as f:
+                point = json.load(f)["points"][0]
+        self.assertGreater(point["steps"]["dashboard_post"]["p50_ms"], 0)
+        self.assertEqual(point["error_statuses"], {})
+        self.assertTrue(Accounts.objects.filter(matric_number__startswith="LT").exists())
+
+
+class StartupImportTests(SimpleTestCase):
+    def test_import_chain_from_importtime_output(self):
+        from .management.commands.check_startup import import_chain, parse_importtime
+
+        rows = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       900 |        900 |       numpy\n"
+            "import time:        50 |        950 |     joblib\n"
+            "import time:        10 |        960 |   app.predictor\n"
+            "import time:        20 |        980 | app.views\n"
+        )
+        self.assertEqual(rows[0], (3, "numpy", 900, 900))
+        self.assertEqual(import_chain(rows, 0), ["app.views", "app.predictor", "joblib", "numpy"])
+
+    def test_wsgi_startup_does_not_import_scientific_stack(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("check_startup", runs=1, budget_ms=60000, stdout=out)
+        self.assertIn("Startup is within budget", out.getvalue())
+
+
+class AnalysisHistoryTests(TestCase):
+    def setUp(self):
+        self.account = Accounts.objects.create(
+            fullname="Ada Obi", email="ada@example.com", phone="0800", matric_number="22/10588"
+        )
+        # Long interval: rows are only written when the test flushes
+        self.buffer = history.ResultBuffer(max_rows=100, flush_interval=3600)
+
+    def test_from_analysis_maps_typed_columns(self):
+        result_dict, _ = analyse_student(make_student(2.2, "2.9, 2.4"))
+        result_dict.update(ml_risk_level="Medium", ml_confidence=87.5)
+        row = AnalysisResult.from_analysis(self.account.id, "200", 2.2, result_dict, "abc")
+        self.assertEqual(row.risk_level, AnalysisResult.RiskLevel.AT_RISK)
+        self.assertEqual(row.trend, AnalysisResult.Trend.DECLINING)
+        self.assertEqual(row.ml_risk_level, AnalysisResult.MlRiskLevel.MEDIUM)
+        self.assertEqual(row.messages["suggestions"], result_dict["suggestions"])
+
+        result_dict.update(ml_risk_level="Unavailable", ml_confidence=None)
+        row = AnalysisResult.from_analysis(self.account.id, "200", 2.2, result_dict)
+        self.assertIsNone(row.ml_risk_level)
+        self.assertEqual(row.model_version, "")
+
+    def test_buffered_rows_are_bulk_created(self):
+        result_dict, _ = analyse_student(make_student(3.8))
+        for _ in range(3):
+            self.buffer.add(AnalysisResult.from_analysis(self.account.id, "300", 3.8, result_dict))
+        self.assertEqual(AnalysisResult.objects.count(), 0)
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.buffer.flush(), 3)
+        # One account check and one multi-row INSERT (plus the atomic savepoint)
+        statements = [q["sql"].split()[0] for q in queries.captured_queries]
+        self.assertEqual([s for s in statements if s in ("SELECT", "INSERT")], ["SELECT", "INSERT"])
+        self.assertEqual(self.account.analysis_results.filter(risk_level=AnalysisResult.RiskLevel.GOOD).count(), 3)
+
+    def test_bad_rows_do_not_drop_the_batch(self):
+        result_dict, _ = analyse_student(make_student(3.8))
+        for _ in range(3):
+            self.buffer.add(AnalysisResult.from_analysis(self.account.id, "300", 3.8, result_dict))
+        # Account deleted since login, and a row the database rejects
+        self.buffer.add(AnalysisResult.from_analysis(self.account.id + 1000, "300", 3.8, result_dict))
+        broken = AnalysisResult.from_analysis(self.account.id, "300", 3.8, result_dict)
+        broken.level = -1
+        self.buffer.add(broken)
+
+        with self.assertLogs(history.logger, "WARNING"):
+            self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(self.account.analysis_results.count(), 3)
+
+    @override_settings(CACHES=TEST_CACHES, ANALYSIS_HISTORY=True)
+    def test_dashboard_records_result(self):
+        session = self.client.session
+        session["student_id"] = self.account.id
+        session.save()
+        with mock.patch.object(history, "get_buffer", return_value=self.buffer), \
+                mock.patch.object(predictor, "get_model", return_value=make_model()):
+            self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+        self.buffer.flush()
+        row = self.account.analysis_results.get()
+        self.assertEqual(row.get_risk_level_display(), "At Risk")
+        self.assertEqual(row.get_ml_risk_level_display(), "Medium")
+        self.assertEqual(row.level, 200)
+
+
+class ScoreCohortCommandTests(TestCase):
+    CSV = (
+        "matric_number,cgpa,level,cgpa_trend,past_courses,current_courses\n"
+        '22/10588,2.2,200,"2.9, 2.4",{past},{current}\n'
+        "22/10589,4.6,400,,{past},{current}\n"
+        "22/10590,,300,,{past},{current}\n"
+    ).format(
+        past=";".join(f"CSCP{i}:B" for i in range(6)),
+        current=";".join(f"CSCC{i}:Registered" for i in range(5)) + ";CSCC5:Carried Over",
+    )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.input = os.path.join(directory.name, "cohort.csv")
+        self.output = os.path.join(directory.name, "scored.csv")
+        with open(self.input, "w") as f:
+            f.write(self.CSV)
+        patcher = mock.patch.object(predictor, "get_model", return_value=make_model())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def score(self, **options):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        call_command("score_cohort", self.input, chunksize=2, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_csv_output_matches_single_analysis(self):
+        import pandas as pd
+
+        self.score(output=self.output)
+        scored = pd.read_csv(self.output, keep_default_na=False)
+        self.assertEqual(list(scored["status_code"]), [200, 200, 400])
+
+        student = make_student(2.2, "2.9, 2.4", statuses=("Registered",) * 5 + ("Carried Over",))
+        expected, _ = analyse_student(student)
+        ml = predictor.predict_academic_risk(2.2, 200, 12, "2.9, 2.4")
+        first = scored.iloc[0]
+        self.assertEqual(first["risk_level"], expected["risk_level"])
+        self.assertEqual(json.loads(first["cautions"]), expected["cautions"])
+        self.assertEqual(first["ml_risk_level"], ml["mlRiskLevel"])
+        self.assertAlmostEqual(float(first["ml_confidence"]), ml["mlConfidence"])
+
+    def test_database_output(self):
+        Accounts.objects.create(fullname="Ada Obi", email="ada@example.com", phone="0800", matric_number="22/10588")
+        self.score(database=True)
+        row = AnalysisResult.objects.get()
+        self.assertEqual(row.account.matric_number, "22/10588")
+        self.assertEqual(row.get_risk_level_display(), "At Risk")
+
+    def test_missing_columns_are_reported_before_scoring(self):
+        from django.core.management.base import CommandError
+
+        with open(self.input, "w") as f:
+            f.write("matric_number,level,current_courses\n22/10588,200,CSCC0:Registered\n")
+        with self.assertRaisesMessage(CommandError, "missing required columns: cgpa, past_courses"):
+            self.score(output=self.output)
+        self.assertFalse(os.path.exists(self.output))
+
+
+def api_student(cgpa=2.2, trend=(2.9, 2.4), level="200"):
+    return {
+        "cgpa": cgpa,
+        "level": level,
+        "department": "Computer Science",
+        "cgpa_trend": list(trend),
+        "past_courses": [{"course": f"CSCP{i}", "grade": "B"} for i in range(6)],
+        "current_courses": [{"course": f"CSCC{i}", "status": "Registered"} for i in range(6)],
+    }
+
+
+@override_settings(CACHES=TEST_CACHES, ANALYSIS_API_TOKEN=None, ANALYSIS_HISTORY=False)
+class AnalyseApiTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches["analysis"].clear()
+        session = self.client.session
+        session["student_id"] = 1
+        session.save()
+        patcher = mock.patch.object(predictor, "get_model", return_value=make_model())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, payload, **extra):
+        return self.client.post(
+            reverse("uniguide:api_analyse"), json.dumps(payload), content_type="application/json", **extra
+        )
+
+    def test_single_student_matches_dashboard(self):
+        response = self.post(api_student())
+        self.assertEqual(response.status_code, 200)
+        dashboard = self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+        expected = dashboard.context["result"]
+        data = response.json()
+        for key in ("risk_level", "cgpa_trend", "cautions", "ml_risk_level", "suggestions"):
+            self.assertEqual(data[key], expected[key])
+
+    def test_batch_matches_single(self):
+        students = [api_student(1.5, (2.0, 1.5)), api_student(4.2, (4.0, 4.2), "400"), {"cgpa": 9}]
+        response = self.post(students)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[2]["status"], 400)
+        self.assertIn("cgpa", results[2]["errors"])
+        for student, result in zip(students[:2], results[:2]):
+            single = self.post(student).json()
+            self.assertEqual(result["status"], 200)
+            self.assertEqual(result["risk_level"], single["risk_level"])
+            self.assertEqual(result["ml_risk_level"], single["ml_risk_level"])
+            self.assertAlmostEqual(result["ml_confidence"], single["ml_confidence"])
+
+    def test_rejects_invalid_payloads(self):
+        self.assertEqual(self.post({"cgpa": "high"}).status_code, 400)
+        self.assertEqual(self.post("student").status_code, 400)
+        with override_settings(ANALYSIS_API_MAX_BATCH=2):
+            self.assertEqual(self.post([api_student()] * 3).status_code, 413)
+
+    def test_model_version_is_looked_up_off_the_event_loop(self):
+        import threading
+
+        threads = []
+        with mock.patch.object(views, "model_version", side_effect=lambda: threads.append(threading.current_thread().name)):
+            self.assertEqual(self.post(api_student()).status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("inference"), threads)
+
+    def test_rejects_unhashable_choice_values(self):
+        from .schemas import SchemaError, parse_student
+
+        bad_course = {**api_student(), "past_courses": [{"course": "CSC101", "grade": ["A"]}]}
+        for payload in ({**api_student(), "department": ["x"]}, {**api_student(), "department": {}}, bad_course):
+            with self.assertRaises(SchemaError):
+                parse_student(payload)
+            self.assertEqual(self.post(payload).status_code, 400)
+
+    def test_session_auth_enforces_csrf(self):
+        from django.test import Client
+
+        browser = Client(enforce_csrf_checks=True)
+        browser.cookies = self.client.cookies
+        url = reverse("uniguide:api_analyse")
+        response = browser.post(url, json.dumps(api_student()), content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+        browser.get(reverse("uniguide:login"))  # sets the csrftoken cookie
+        token = browser.cookies["csrftoken"].value
+        response = browser.post(
+            url, json.dumps(api_student()), content_type="application/json", HTTP_X_CSRFTOKEN=token
+        )
+        self.assertEqual(response.status_code, 200)
+
+        with override_settings(ANALYSIS_API_TOKEN="s3cret"):
+            response = Client(enforce_csrf_checks=True).post(
+                url, json.dumps(api_student()), content_type="application/json", HTTP_AUTHORIZATION="Bearer s3cret"
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_requires_session_or_token(self):
+        self.client.session.flush()
+        self.client.cookies.clear()
+        self.assertEqual(self.post(api_student()).status_code, 401)
+        with override_settings(ANALYSIS_API_TOKEN="s3cret"):
+            self.assertEqual(self.post(api_student()).status_code, 401)
+            response = self.post(api_student(), HTTP_AUTHORIZATION="Bearer s3cret")
+            self.assertEqual(response.status_code, 200)
+
+
+class BoundedExecutorTests(SimpleTestCase):
+    def test_rejects_when_full(self):
+        import threading
+
+        executor = inference.BoundedExecutor(max_workers=1, max_queue=1)
+        self.addCleanup(executor.shutdown)
+        release = threading.Event()
+        running = executor.submit(release.wait)
+        queued = executor.submit(lambda: "done")
+        with self.assertRaises(inference.ExecutorBusy):
+            executor.submit(lambda: "rejected")
+        release.set()
+        running.result()
+        self.assertEqual(queued.result(), "done")
+        self.assertEqual(executor.submit(lambda: "again").result(), "again")
+
+
+class InferencePoolTests(SimpleTestCase):
+    def test_features_round_trip_exactly(self):
+        # float64 all the way: the linear compiled model must see what it sees in process
+        features = predictor.build_features([3.45, 1.2], [200, 400], [12, 14], np.array([0.3, -0.1]))
+        n_rows, buffer = pool.pack_features(features)
+        self.assertEqual(len(buffer), features.size * 8)
+        np.testing.assert_array_equal(pool.unpack_features(n_rows, buffer), features)
+
+    def test_pool_matches_in_process_predictions(self):
+        model = make_model()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.pkl")
+            joblib.dump(model, path)
+            inference_pool = pool.InferencePool(processes=1, model_path=path, timeout=60)
+            self.addCleanup(inference_pool.close)
+
+            columns = ([0.8, 2.7, 4.6], [100, 300, 500], [12, 12, 18], ["1.2, 0.8", "", "4.1, 4.6"])
+            labels, confidences = inference_pool.predict_batch(*columns)
+            with mock.patch.object(predictor, "get_model", return_value=model):
+                expected_labels, expected_confidences = predictor.predict_academic_risk_batch(*columns)
+            np.testing.assert_array_equal(labels, expected_labels)
+            np.testing.assert_array_equal(confidences, expected_confidences)
+            self.assertEqual(inference_pool.model_version(), predictor.ModelRegistry(path).file_version())
+
+    def test_pool_backend_never_loads_model_in_web_worker(self):
+        fake_pool = mock.Mock()
+        fake_pool.predict_batch.return_value = (np.array(["Low"]), np.array([91.5]))
+        with mock.patch.object(inference, "get_pool", return_value=fake_pool), \
+                mock.patch.object(predictor, "get_model") as get_model:
+            result = inference.predict_academic_risk(4.2, 300, 12, "4.0, 4.2")
+        get_model.assert_not_called()
+        self.assertEqual(result, {"mlRiskLevel": "Low", "mlConfidence": 91.5})
+
+    def test_backend_switch(self):
+        self.addCleanup(setattr, inference, "_pool", None)
+        with override_settings(ML_BACKEND="inprocess"):
+            self.assertIsNone(inference.get_pool())
+        with override_settings(ML_BACKEND="pool", ML_POOL_PROCESSES=3):
+            self.assertEqual(inference.get_pool().processes, 3)
+
+
+class ModelStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.store = store.ModelStore(os.path.join(self.directory, "store"), predictor.FEATURE_COLUMNS)
+
+    def dump(self, model, name="model.pkl"):
+        path = os.path.join(self.directory, name)
+        joblib.dump(model, path)
+        return path
+
+    def test_publish_writes_manifest(self):
+        path = self.dump(make_model())
+        manifest = self.store.publish(path)
+        self.assertEqual(manifest["version"], predictor.ModelRegistry(path).file_version())
+        self.assertEqual(manifest["feature_columns"], list(predictor.FEATURE_COLUMNS))
+        self.assertEqual(manifest["classes"], ["High", "Low", "Medium"])
+        self.assertEqual(self.store.publish(path), manifest)
+        self.assertEqual([m["version"] for m in self.store.versions()], [manifest["version"]])
+
+    def test_publish_rejects_model_with_other_features(self):
+        model = DecisionTreeClassifier().fit(np.zeros((4, 3)), ["Low", "High", "Low", "High"])
+        with self.assertRaises(store.StoreError):
+            self.store.publish(self.dump(model))
+        self.assertEqual(self.store.versions(), [])
+
+    def test_load_rejects_tampered_artifact(self):
+        version = self.store.publish(self.dump(make_model()))["version"]
+        with open(self.store.artifact_path(version), "ab") as f:
+            f.write(b"\0")
+        with self.assertRaises(store.StoreError):
+            self.store.load(version)
+
+    def test_registry_hot_swaps_on_activate(self):
+        first = self.store.publish(self.dump(make_model(), "first.pkl"))["version"]
+        second_model = DecisionTreeClassifier(max_depth=1, random_state=0).fit(
+            np.random.default_rng(1).uniform(0, 5, (50, 4)), ["Low"] * 25 + ["High"] * 25
+        )
+        second = self.store.publish(self.dump(second_model, "second.pkl"))["version"]
+
+        registry = predictor.StoreRegistry(self.store)
+        self.assertIsNone(registry.get())
+        self.store.set_pointer(store.CURRENT, first)
+        model = registry.get()
+        self.assertEqual(registry.version, first)
+        self.assertIs(registry.get(), model)
+
+        self.store.set_pointer(store.CURRENT, second)
+        self.assertEqual(registry.file_version(), second)
+        self.assertIsNot(registry.get(), model)
+        self.assertEqual(registry.version, second)
+
+    def test_predictions_follow_the_store_setting(self):
+        version = self.store.publish(self.dump(make_model()))["version"]
+        self.store.set_pointer(store.CURRENT, version)
+        self.addCleanup(setattr, predictor, "registry", None)
+        with override_settings(ML_MODEL_STORE=self.store.root, ML_SHADOW_SAMPLE_RATE=0.5):
+            self.assertIsInstance(predictor.get_registry(), predictor.StoreRegistry)
+            self.assertEqual(inference.model_version(), version)
+            self.assertEqual(inference.get_shadow().registry.store.root, self.store.root)
+        self.assertNotIsInstance(predictor.get_registry(), predictor.StoreRegistry)
+
+    def test_failed_version_keeps_serving_previous(self):
+        first = self.store.publish(self.dump(make_model()))["version"]
+        self.store.set_pointer(store.CURRENT, first)
+        registry = predictor.StoreRegistry(self.store)
+        model = registry.get()
+
+        broken = os.path.join(self.store.root, "broken")
+        os.makedirs(broken)
+        with open(os.path.join(broken, store.MANIFEST), "w") as f:
+            json.dump({**self.store.manifest(first), "version": "broken", "sha256": "0" * 64}, f)
+        self.store.set_pointer(store.CURRENT, "broken")
+        with self.assertLogs(predictor.logger.name, "ERROR"):
+            self.assertIs(registry.get(), model)
+        self.assertEqual(registry.version, first)
+
+
+class ShadowScorerTests(SimpleTestCase):
+    def test_counts_agreement_with_candidate(self):
+        candidate = make_model()
+        registry = mock.Mock(version="abc123", get=mock.Mock(return_value=candidate))
+        compared = []
+        scorer = shadow.ShadowScorer(registry, sample_rate=1.0, on_compare=lambda *counts: compared.append(counts))
+
+        columns = ([0.8, 2.7, 4.6], [100, 300, 500], [12, 12, 18], ["1.2, 0.8", "", "4.1, 4.6"])
+        with mock.patch.object(predictor, "get_model", return_value=candidate):
+            labels, _ = predictor.predict_academic_risk_batch(*columns)
+        live = list(labels)
+        live[0] = "Low" if live[0] != "Low" else "High"
+        self.assertTrue(scorer.offer(*columns, live))
+        scorer.join()
+
+        snapshot = scorer.snapshot()
+        self.assertEqual((snapshot["rows"], snapshot["agree"], snapshot["errors"]), (3, 2, 0))
+        self.assertEqual(compared, [(2, 1)])
+        self.assertEqual(sum(snapshot["confusion"].values()), 3)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        candidate = make_model()
+        registry = mock.Mock(version=None)
+        registry.get.side_effect = lambda: time.sleep(0.2) or candidate
+        scorer = shadow.ShadowScorer(registry, sample_rate=1.0, max_queue=1)
+        offered = [scorer.offer([3.0], [200], [10], [0.0], ["Low"]) for _ in range(5)]
+        self.assertFalse(all(offered))
+        self.assertGreater(scorer.snapshot()["dropped"], 0)
+
+    def test_no_candidate_is_a_quiet_no_op(self):
+        registry = mock.Mock(version=None, file_version=mock.Mock(return_value=None))
+        scorer = shadow.ShadowScorer(registry, sample_rate=1.0)
+        self.assertFalse(scorer.offer([3.0], [200], [10], [0.0], ["Low"]))
+        registry.get.assert_not_called()
+
+        registry.file_version.return_value = "abc123"  # published, but it does not load
+        registry.get.return_value = None
+        with self.assertNoLogs(shadow.logger, level="INFO"):
+            self.assertTrue(scorer.offer([3.0], [200], [10], [0.0], ["Low"]))
+            scorer.join()
+        self.assertEqual(scorer.snapshot()["errors"], 1)
+
+    def test_unsampled_calls_are_not_queued(self):
+        scorer = shadow.ShadowScorer(mock.Mock(), sample_rate=0.0)
+        self.assertFalse(scorer.offer([3.0], [200], [10], [0.0], ["Low"]))
+
+    def test_inference_offers_live_labels(self):
+        fake_shadow = mock.Mock()
+        with mock.patch.object(inference, "get_shadow", return_value=fake_shadow), \
+                mock.patch.object(predictor, "get_model", return_value=make_model()):
+            result = inference.predict_academic_risk(4.2, 300, 12, "4.0, 4.2")
+        (*_, labels), _ = fake_shadow.offer.call_args
+        self.assertEqual(list(labels), [result["mlRiskLevel"]])
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.model = make_model()
+        patcher = mock.patch.object(predictor, "get_model", return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_calls_share_one_batch(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        batcher = MicroBatcher(max_batch=8, max_wait_ms=1000)
+        students = [(1.0 + i * 0.4, "200", 12, "3.0, 2.8") for i in range(8)]
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda s: batcher.predict(*s), students))
+        self.assertEqual(batcher.batches, 1)
+        self.assertEqual(results, [predictor.predict_academic_risk(*s) for s in students])
+
+    def test_flushes_partial_batch_after_max_wait(self):
+        batcher = MicroBatcher(max_batch=64, max_wait_ms=1)
+        result = batcher.predict(2.5, "300", 10, "")
+        self.assertEqual(result, predictor.predict_academic_risk(2.5, "300", 10, ""))
+
+    def test_errors_reach_every_caller(self):
+        batcher = MicroBatcher(max_batch=2, max_wait_ms=1000, predict_batch=mock.Mock(side_effect=ValueError("boom")))
+        first = batcher.submit(2.5, "300", 10, "")
+        second = batcher.submit(3.5, "300", 10, "")
+        for future in (first, second):
+            with self.assertRaisesMessage(ValueError, "boom"):
+                future.result(timeout=5)
+
+    def test_apredict(self):
+        import asyncio
+
+        batcher = MicroBatcher(max_batch=4, max_wait_ms=1)
+        result = asyncio.run(batcher.apredict(1.2, "100", 12, [2.0, 1.5]))
+        self.assertEqual(result["mlRiskLevel"], "High")
+
+    def test_benchmark_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.pkl")
+            joblib.dump(self.model, path)
+            out = StringIO()
+            call_command(
+                "benchmark_batcher", model=path, clients=4, requests=40, batch_sizes=[4], waits=[1.0], stdout=out
+            )
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[2].startswith("unbatched"))
+        self.assertTrue(lines[3].startswith("microbatch"))
+
+
+@override_settings(CACHES=TEST_CACHES, ANALYSIS_HISTORY=False)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches["analysis"].clear()
+        Accounts.objects.create(fullname="Ada Obi", email="ada@example.com", phone="0800", matric_number="22/10588")
+
+    async def test_login_then_dashboard(self):
+        response = await self.async_client.post(reverse("uniguide:login"), {"matric_number": "22/10588"})
+        self.assertRedirects(response, reverse("uniguide:dashboard"), fetch_redirect_response=False)
+        with mock.patch.object(predictor, "get_model", return_value=make_model()):
+            response = await self.async_client.post(reverse("uniguide:dashboard"), dashboard_payload())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["result"]["ml_risk_level"], "Medium")
+
+    @override_settings(ML_MICROBATCH=True, ML_BATCH_WAIT_MS=1)
+    def test_dashboard_with_microbatching(self):
+        self.client.post(reverse("uniguide:login"), {"matric_number": "22/10588"})
+        with mock.patch.object(predictor, "get_model", return_value=make_model()):
+            response = self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+        self.assertEqual(response.context["result"]["ml_risk_level"], "Medium")
+
+    @override_settings(DEBUG=True)
+    async def test_static_files_stream_asynchronously(self):
+        import warnings
+
+        path = os.path.join(assets.STATIC_DIR, "css", "register.css")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            response = await self.async_client.get("/static/css/register.css")
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            content = b"".join([chunk async for chunk in response.streaming_content])
+        with open(path, "rb") as f:
+            self.assertEqual(content, f.read())
+
+    async def test_unknown_matric_number(self):
+        response = await self.async_client.post(reverse("uniguide:login"), {"matric_number": "nope"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["error"], "Matric number not registered")
+
+    def test_busy_executor_returns_503(self):
+        self.client.post(reverse("uniguide:login"), {"matric_number": "22/10588"})
+        busy = mock.Mock()
+        busy.run.side_effect = inference.ExecutorBusy()
+        with mock.patch("mainproject.firstpage.views.get_executor", return_value=busy):
+            response = self.client.post(reverse("uniguide:dashboard"), dashboard_payload())
+            api_response = self.client.post(
+                reverse("uniguide:api_analyse"), json.dumps([api_student()]), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(response.context["error_message"], views.BUSY_MESSAGE)
+        self.assertEqual(api_response.status_code, 503)
+
+
+class CgpaTrendTests(SimpleTestCase):
+    def test_parse_skips_invalid_entries(self):
+        trend = CgpaTrend.parse("3.1, x, 3.45,, 2.95")
+        self.assertEqual(trend.values, (3.1, 3.45, 2.95))
+        self.assertAlmostEqual(trend.last_delta, -0.5)
+
+    def test_slope_matches_least_squares(self):
+        values = [2.5, 2.9, 2.7, 3.4, 3.6]
+        trend = CgpaTrend.parse(values)
+        self.assertAlmostEqual(trend.slope, np.polyfit(range(len(values)), values, 1)[0])
+
+    def test_short_history_has_no_features(self):
+        self.assertEqual(CgpaTrend.parse("3.2"), CgpaTrend((3.2,)))
+        self.assertEqual(CgpaTrend.parse(None), CgpaTrend())
+
+    def test_form_cleans_to_trend(self):
+        form = StudentBasicForm({
+            "level": "200", "department": "Computer Science", "cgpa": "3.0", "cgpa_trend": "2.8, 3.0",
+        })
+        self.assertTrue(form.is_valid())
+        trend = form.cleaned_data["cgpa_trend"]
+        self.assertIsInstance(trend, CgpaTrend)
+        self.assertEqual(analyse_student(make_student(3.0, trend)), analyse_student(make_student(3.0, "2.8, 3.0")))
+        self.assertEqual(predictor._trend_value(trend), predictor._trend_value("2.8, 3.0"))
+
+
+class QueueLoggingTests(SimpleTestCase):
+    def test_records_are_written_by_listener(self):
+        import io
+        import logging
+
+        from .logging_queue import QueueListenerHandler
+
+        stream = io.StringIO()
+        handler = QueueListenerHandler(stream)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        test_logger = logging.getLogger("uniguide.test.queue")
+        test_logger.addHandler(handler)
+        test_logger.propagate = False
+        try:
+            test_logger.warning("hello %s", "queue")
+        finally:
+            test_logger.removeHandler(handler)
+            handler.close()
+        self.assertEqual(stream.getvalue(), "WARNING hello queue\n")
+
+
+class MetricsTests(SimpleTestCase):
+    def test_histogram_quantiles(self):
+        registry = metrics.MetricsRegistry()
+        for ms in range(1, 101):
+            registry.observe("uniguide_stage_duration_seconds", ms / 1000, stage="analyse")
+        counts = registry.snapshot()["histograms"][metrics._key("uniguide_stage_duration_seconds", {"stage": "analyse"})]
+        self.assertAlmostEqual(metrics.quantile(counts["counts"], 0.5), 0.05, delta=0.015)
+        self.assertAlmostEqual(metrics.quantile(counts["counts"], 0.99), 0.099, delta=0.03)
+
+    def test_render_prometheus_text(self):
+        registry = metrics.MetricsRegistry()
+        registry.inc("uniguide_requests_total", view="uniguide:dashboard", status="200")
+        registry.observe("uniguide_request_duration_seconds", 0.02, view="uniguide:dashboard")
+        text = registry.render()
+        self.assertIn('uniguide_requests_total{status="200",view="uniguide:dashboard"} 1', text)
+        self.assertIn('uniguide_request_duration_seconds_bucket{view="uniguide:dashboard",le="+Inf"} 1', text)
+        self.assertIn('uniguide_request_duration_seconds_count{view="uniguide:dashboard"} 1', text)
+        self.assertIn('uniguide_request_duration_seconds_quantile{view="uniguide:dashboard",quantile="0.95"}', text)
+
+    def test_multiprocess_aggregation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            worker = metrics.MetricsRegistry(directory)
+            worker._pid = os.getppid()  # pretend to be another live process
+            worker.inc("uniguide_requests_total", 3, view="v", status="200")
+            worker.flush()
+
+            local = metrics.MetricsRegistry(directory)
+            local.inc("uniguide_requests_total", 2, view="v", status="200")
+            self.assertIn('uniguide_requests_total{status="200",view="v"} 5', local.render())
+
+    def test_exited_workers_are_folded_once(self):
+        import subprocess
+        import sys
+
+        child = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+        dead_pid = int(child.stdout)
+        with tempfile.TemporaryDirectory() as directory:
+            for pid in (dead_pid, dead_pid, os.getpid()):  # two lives of one pid, then our own earlier life
+                worker = metrics.MetricsRegistry(directory)
+                worker._pid = pid
+                worker.inc("uniguide_requests_total", 3, view="v", status="200")
+                worker.flush()
+                time.sleep(0.001)
+
+            local = metrics.MetricsRegistry(directory)
+            local.inc("uniguide_requests_total", 2, view="v", status="200")
+            for _ in range(2):
+                self.assertIn('uniguide_requests_total{status="200",view="v"} 11', local.render())
+            self.assertEqual(
+                sorted(n for n in os.listdir(directory) if n.endswith(".json")),
+                sorted([metrics.EXITED, os.path.basename(local._path())]),
+            )
+
+
+class MetricsViewTests(TestCase):
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("uniguide:login"))
+        response = self.client.get(reverse("uniguide:metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn("uniguide_requests_total", response.content.decode())
+
+    @override_settings(METRICS_ALLOWED_IPS=("127.0.0.1",), METRICS_TOKEN="scrape")
+    def test_metrics_endpoint_is_restricted(self):
+        url = reverse("uniguide:metrics")
+        self.assertEqual(url, "/metrics/")
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="203.0.113.7").status_code, 403)
+        response = self.client.get(url, REMOTE_ADDR="203.0.113.7", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(url, REMOTE_ADDR="203.0.113.7", HTTP_AUTHORIZATION="Bearer scrape")
+        self.assertEqual(response.status_code, 200)
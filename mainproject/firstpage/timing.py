@@ -0,0 +1,29 @@
+"""
+Request Stage Timing
+Small helper for timing the stages of a request (parse, analyse, predict,
+render) and logging them as structured fields.
+"""
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block; repeated stages add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed
+
+    def as_fields(self):
+        """Durations in milliseconds, as `<stage>_ms` keys for logging `extra`."""
+        return {f"{name}_ms": round(seconds * 1000, 3) for name, seconds in self.durations.items()}
+
+    def summary(self):
+        return " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.durations.items())
@@ -9,5 +9,7 @@ urlpatterns = [
     path('register/', views.register_view, name='register'),
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('logout/', views.logout_view, name='logout'),
+    path('api/analyse/', views.analyse_api_view, name='api_analyse'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
 
@@ -1,11 +1,34 @@
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth import logout
 from django.contrib import messages
 from django.urls import reverse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from .forms import AccountForm, StudentBasicForm, PastCourseFormSet, CurrentCourseFormSet
-from .models import Accounts
-from .ml.predictor import predict_academic_risk
-from .ml.analyzer import analyse_student  # 👈 Import the analysis logic
+from .account_lookup import aget_account_id
+from .ml.analyzer import analyse_student, analyse_students  # 👈 Import the analysis logic
+from .schemas import SchemaError, parse_student
+from . import metrics
+from .analysis_cache import acached_analysis
+from .history import record_analysis
+from .inference import (
+    ExecutorBusy,
+    get_batcher,
+    get_executor,
+    model_version,
+    predict_academic_risk,
+    predict_academic_risk_batch,
+)
+from .timing import StageTimer
+
+logger = logging.getLogger(__name__)
 
 
 # ──────────────────────────────
@@ -13,8 +36,7 @@ from .ml.analyzer import analyse_student  # 👈 Import the analysis logic
 # ──────────────────────────────
 def register_view(request):
     form = AccountForm(request.POST or None)
-    if form.is_valid():
-        form.save()
+    if form.is_valid() and form.register() is not None:
         messages.success(request, "Registration successful! You can now log in.")
         return redirect('uniguide:login')
     context = {'form': form}
@@ -24,17 +46,17 @@ def register_view(request):
 # ──────────────────────────────
 # Login View
 # ──────────────────────────────
-def login_view(request):
+async def login_view(request):
     error = None
     if request.method == "POST":
         matric = request.POST.get("matric_number")
-        try:
-            student = Accounts.objects.get(matric_number=matric)
-            request.session["student_id"] = student.id
-            request.session["matric_number"] = student.matric_number
+        # Cached matric_number → id lookup (invalidated by the Accounts signals)
+        student_id = await aget_account_id(matric)
+        if student_id is not None:
+            await request.session.aset("student_id", student_id)
+            await request.session.aset("matric_number", matric)
             return redirect('uniguide:dashboard')
-        except Accounts.DoesNotExist:
-            error = "Matric number not registered"
+        error = "Matric number not registered"
     return render(request, "uniguide_login.html", {"error": error})
 
 
@@ -48,93 +70,343 @@ def logout_view(request):
     return render(request, 'firstpage_logout.html')
 
 
+# ──────────────────────────────
+# Analysis (rules + ML)
+# ──────────────────────────────
+def run_analysis(cleaned_data, level, timer=None):
+    """
+    Run the rule-based analysis and attach the ML prediction to its result.
+    If a StageTimer is given, the "analyse" and "predict" stages are timed.
+
+    Returns:
+        tuple: (result_dict, status_code) as from analyse_student
+    """
+    # ═══════════════════════════════════════════════════════
+    # PRIMARY ANALYSIS: Logic-based recommendation system
+    # ═══════════════════════════════════════════════════════
+    timer = timer or StageTimer()
+    with timer.stage("analyse"):
+        result_dict, status_code = analyse_student(cleaned_data)
+
+    # ═══════════════════════════════════════════════════════
+    # SECONDARY SUPPORT: ML prediction (adds extra insight)
+    # ═══════════════════════════════════════════════════════
+    try:
+        with timer.stage("predict"):
+            batcher = get_batcher()
+            if batcher is not None:
+                ml_result = batcher.predict(*_ml_inputs(cleaned_data, level))
+            else:
+                ml_result = predict_academic_risk(*_ml_inputs(cleaned_data, level))
+        _attach_ml_result(result_dict, ml_result)
+    except Exception:
+        _attach_ml_result(result_dict, "Unavailable")
+        logger.exception("ML prediction error")
+
+    return result_dict, status_code
+
+
+async def arun_analysis(cleaned_data, level, timer=None):
+    """
+    Async run_analysis. Runs on the inference executor; with micro-batching
+    on, only the rules run there and the prediction is awaited from the
+    batcher, so no executor thread sits waiting for a batch to fill.
+
+    Raises:
+        ExecutorBusy: when the executor queue is full
+    """
+    batcher = get_batcher()
+    if batcher is None:
+        return await get_executor().run(run_analysis, cleaned_data, level, timer)
+
+    timer = timer or StageTimer()
+
+    def analyse():
+        with timer.stage("analyse"):
+            return analyse_student(cleaned_data)
+
+    result_dict, status_code = await get_executor().run(analyse)
+    try:
+        with timer.stage("predict"):
+            ml_result = await batcher.apredict(*_ml_inputs(cleaned_data, level))
+        _attach_ml_result(result_dict, ml_result)
+    except Exception:
+        _attach_ml_result(result_dict, "Unavailable")
+        logger.exception("ML prediction error")
+
+    return result_dict, status_code
+
+
+def _ml_inputs(cleaned_data, level):
+    return (
+        cleaned_data["gpa_cgpa"],
+        level,
+        len(cleaned_data["past_courses"]) + len(cleaned_data["current_courses"]),
+        cleaned_data["cgpa_trend"],
+    )
+
+
+def _attach_ml_result(result_dict, ml_result):
+    # ML returns a dict like {'mlRiskLevel': 'Low', 'mlConfidence': 0.85}
+    if isinstance(ml_result, dict):
+        result_dict['ml_risk_level'] = ml_result.get('mlRiskLevel', 'Unknown')
+        result_dict['ml_confidence'] = ml_result.get('mlConfidence', 0)
+    else:
+        result_dict['ml_risk_level'] = str(ml_result)
+        result_dict['ml_confidence'] = None
+
+
+def run_analysis_batch(students):
+    """
+    Batch version of run_analysis: rules for every student, then a single
+    vectorized ML pass over all of them.
+
+    Args:
+        students (list): (cleaned_data, level) pairs
+
+    Returns:
+        list: (result_dict, status_code) per student
+    """
+    results = analyse_students([cleaned_data for cleaned_data, _ in students])
+    if not students:
+        return results
+
+    try:
+        labels, confidences = predict_academic_risk_batch(
+            [cleaned_data["gpa_cgpa"] for cleaned_data, _ in students],
+            [level for _, level in students],
+            [len(d["past_courses"]) + len(d["current_courses"]) for d, _ in students],
+            [cleaned_data["cgpa_trend"] for cleaned_data, _ in students],
+        )
+        ml = [(str(label), float(confidence)) for label, confidence in zip(labels, confidences)]
+    except Exception:
+        logger.exception("ML batch prediction error")
+        ml = [("Unavailable", None)] * len(students)
+
+    for (result_dict, _), (label, confidence) in zip(results, ml):
+        result_dict['ml_risk_level'] = label
+        result_dict['ml_confidence'] = confidence
+    return results
+
+
 # ──────────────────────────────
 # Dashboard View
 # ──────────────────────────────
-def dashboard_view(request):
-    if 'student_id' not in request.session:
+BUSY_MESSAGE = "The server is busy right now. Please try again in a moment."
+
+
+async def dashboard_view(request):
+    if not await request.session.ahas_key('student_id'):
         return redirect(reverse('uniguide:login'))
 
+    timer = StageTimer()
+    context = None
+    status = 200
+
     if request.method == 'POST':
-        basic_form = StudentBasicForm(request.POST)
-        past_formset = PastCourseFormSet(request.POST, prefix='past')
-        current_formset = CurrentCourseFormSet(request.POST, prefix='current')
-
-        if basic_form.is_valid() and past_formset.is_valid() and current_formset.is_valid():
-            cleaned_data = {
-                'gpa_cgpa': basic_form.cleaned_data['cgpa'],
-                'cgpa_trend': basic_form.cleaned_data['cgpa_trend'],
-                'department': basic_form.cleaned_data['department'],
-                'past_courses': [
-                    {'course': f.cleaned_data['course'], 'grade': f.cleaned_data['grade']}
-                    for f in past_formset.forms
-                    if f.has_changed() and f.cleaned_data.get('course')
-                ],
-                'current_courses': [
-                    {'course': f.cleaned_data['course'], 'status': f.cleaned_data['status']}
-                    for f in current_formset.forms
-                    if f.has_changed() and f.cleaned_data.get('course')
-                ]
-            }
+        with timer.stage("parse"):
+            basic_form = StudentBasicForm(request.POST)
+            past_formset = PastCourseFormSet(request.POST, prefix='past')
+            current_formset = CurrentCourseFormSet(request.POST, prefix='current')
+            is_valid = basic_form.is_valid() and past_formset.is_valid() and current_formset.is_valid()
 
-            # ═══════════════════════════════════════════════════════
-            # PRIMARY ANALYSIS: Logic-based recommendation system
-            # ═══════════════════════════════════════════════════════
-            result_dict, status_code = analyse_student(cleaned_data)
+            if is_valid:
+                cleaned_data = {
+                    'gpa_cgpa': basic_form.cleaned_data['cgpa'],
+                    'cgpa_trend': basic_form.cleaned_data['cgpa_trend'],
+                    'department': basic_form.cleaned_data['department'],
+                    'past_courses': [
+                        {'course': f.cleaned_data['course'], 'grade': f.cleaned_data['grade']}
+                        for f in past_formset.forms
+                        if f.has_changed() and f.cleaned_data.get('course')
+                    ],
+                    'current_courses': [
+                        {'course': f.cleaned_data['course'], 'status': f.cleaned_data['status']}
+                        for f in current_formset.forms
+                        if f.has_changed() and f.cleaned_data.get('course')
+                    ]
+                }
 
-            # ═══════════════════════════════════════════════════════
-            # SECONDARY SUPPORT: ML prediction (adds extra insight)
-            # ═══════════════════════════════════════════════════════
+        if is_valid:
+            level = basic_form.cleaned_data.get("level")
             try:
-                ml_result = predict_academic_risk(
-                    cleaned_data["gpa_cgpa"],
-                    basic_form.cleaned_data.get("level"),
-                    len(cleaned_data["past_courses"]) + len(cleaned_data["current_courses"]),
-                    cleaned_data["cgpa_trend"]
+                # registry.get() stats (and on first use loads and hashes) the
+                # model file, so the lookup runs off the event loop
+                version = await get_executor().run(model_version)
+                result_dict, status_code = await acached_analysis(
+                    cleaned_data,
+                    level,
+                    version,
+                    lambda: arun_analysis(cleaned_data, level, timer),
                 )
-                # ML returns a dict like {'mlRiskLevel': 'Low', 'mlConfidence': 0.85}
-                if isinstance(ml_result, dict):
-                    result_dict['ml_risk_level'] = ml_result.get('mlRiskLevel', 'Unknown')
-                    result_dict['ml_confidence'] = ml_result.get('mlConfidence', 0)
-                else:
-                    result_dict['ml_risk_level'] = str(ml_result)
-                    result_dict['ml_confidence'] = None
-            except Exception as e:
-                result_dict['ml_risk_level'] = "Unavailable"
-                result_dict['ml_confidence'] = None
-                print(f"ML Prediction Error: {e}")  # For debugging
+            except ExecutorBusy:
+                result_dict, status_code, version = {'error': BUSY_MESSAGE}, 503, None
+                status = 503
 
             # ═══════════════════════════════════════════════════════
             # RENDER RESULTS
             # ═══════════════════════════════════════════════════════
             if status_code == 200:
-                return render(request, 'uniguide_dashboard.html', {
+                record_analysis(
+                    await request.session.aget('student_id'),
+                    level,
+                    cleaned_data['gpa_cgpa'],
+                    result_dict,
+                    version,
+                )
+                context = {
                     'basic_form': basic_form,
                     'past_formset': past_formset,
                     'current_formset': current_formset,
                     'result': result_dict,
                     'show_result': True,
-                    'matric_number': request.session.get('matric_number')
-                })
+                    'matric_number': await request.session.aget('matric_number')
+                }
             else:
                 # Analysis failed
-                return render(request, 'uniguide_dashboard.html', {
+                context = {
                     'basic_form': basic_form,
                     'past_formset': past_formset,
                     'current_formset': current_formset,
                     'error_message': result_dict.get('error', 'Analysis failed'),
                     'show_result': False
-                })
+                }
 
     else:
         # GET request - show empty form
-        basic_form = StudentBasicForm()
-        past_formset = PastCourseFormSet(prefix='past')
-        current_formset = CurrentCourseFormSet(prefix='current')
-
-    return render(request, 'uniguide_dashboard.html', {
-        'basic_form': basic_form,
-        'past_formset': past_formset,
-        'current_formset': current_formset,
-        'show_result': False
-    })
+        with timer.stage("parse"):
+            basic_form = StudentBasicForm()
+            past_formset = PastCourseFormSet(prefix='past')
+            current_formset = CurrentCourseFormSet(prefix='current')
+
+    if context is None:
+        context = {
+            'basic_form': basic_form,
+            'past_formset': past_formset,
+            'current_formset': current_formset,
+            'show_result': False
+        }
+
+    with timer.stage("render"):
+        response = render(request, 'uniguide_dashboard.html', context, status=status)
+        if status == 503:
+            response['Retry-After'] = '1'
+
+    metrics.observe_stages(timer)
+    logger.info(
+        "dashboard_view %s %s",
+        request.method,
+        timer.summary(),
+        extra={"method": request.method, **timer.as_fields()},
+    )
+    return response
+
+
+# ──────────────────────────────
+# JSON Analysis API
+# ──────────────────────────────
+async def _api_authorized(request):
+    """Bearer token when ANALYSIS_API_TOKEN is set, otherwise a logged-in session."""
+    token = getattr(settings, "ANALYSIS_API_TOKEN", None)
+    if token:
+        header = request.headers.get("Authorization", "")
+        return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+    return await request.session.ahas_key('student_id')
+
+
+def _csrf_rejected(request):
+    """
+    The CSRF middleware's 403 response, or None if the request passes. The
+    view is csrf_exempt for bearer-token clients only: with session cookie
+    auth any third-party page could otherwise POST as the student.
+    """
+    if getattr(settings, "ANALYSIS_API_TOKEN", None):
+        return None
+    return CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+
+
+def _busy_response():
+    response = JsonResponse({"error": BUSY_MESSAGE}, status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def analyse_api_view(request):
+    """
+    Analyse one student (JSON object) or many (JSON list) without rendering
+    any template. Single requests share the dashboard's result cache; lists
+    go through run_analysis_batch. Both run on the inference executor.
+    """
+    if not await _api_authorized(request):
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    rejected = _csrf_rejected(request)
+    if rejected is not None:
+        return rejected
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "Request body must be valid JSON"}, status=400)
+
+    if isinstance(payload, dict):
+        try:
+            cleaned_data, level = parse_student(payload)
+        except SchemaError as e:
+            return JsonResponse({"errors": e.errors}, status=400)
+        try:
+            version = await get_executor().run(model_version)
+            result_dict, status_code = await acached_analysis(
+                cleaned_data, level, version, lambda: arun_analysis(cleaned_data, level)
+            )
+        except ExecutorBusy:
+            return _busy_response()
+        return JsonResponse(result_dict, status=status_code)
+
+    if not isinstance(payload, list):
+        return JsonResponse({"error": "Expected a student object or a list of students"}, status=400)
+
+    max_batch = getattr(settings, "ANALYSIS_API_MAX_BATCH", 1000)
+    if len(payload) > max_batch:
+        return JsonResponse({"error": f"At most {max_batch} students per request"}, status=413)
+
+    results = [None] * len(payload)
+    valid = []
+    for i, item in enumerate(payload):
+        try:
+            valid.append((i, parse_student(item)))
+        except SchemaError as e:
+            results[i] = {"status": 400, "errors": e.errors}
+
+    try:
+        analysed = await get_executor().run(run_analysis_batch, [student for _, student in valid])
+    except ExecutorBusy:
+        return _busy_response()
+    for (i, _), (result_dict, status_code) in zip(valid, analysed):
+        results[i] = {"status": status_code, **result_dict}
+
+    return JsonResponse({"results": results})
+
+
+# ──────────────────────────────
+# Metrics View
+# ──────────────────────────────
+def _metrics_authorized(request):
+    """Bearer METRICS_TOKEN if one is set, or a client address in METRICS_ALLOWED_IPS."""
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        header = request.headers.get("Authorization", "")
+        if hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            return True
+    return request.META.get("REMOTE_ADDR") in getattr(settings, "METRICS_ALLOWED_IPS", ("127.0.0.1", "::1"))
+
+
+def metrics_view(request):
+    """Prometheus text exposition of the request and pipeline metrics."""
+    if not _metrics_authorized(request):
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+    return HttpResponse(
+        metrics.get_registry().render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -20,8 +20,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "mainproject.firstpage.middleware.TimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # 👈 ADD THIS for static files
+    "mainproject.firstpage.middleware.AsyncWhiteNoiseMiddleware",  # 👈 WhiteNoise, usable under ASGI
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -32,12 +33,20 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "myproject.urls"
 
+# Templates are compiled once per process by the cached loader. Django enables
+# it implicitly when no loaders are given; it is spelled out here so adding a
+# loader cannot silently turn it off.
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ]),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -50,13 +59,99 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "myproject.wsgi.application"
 
+# SQLITE_NAME points the app at another database file (`manage.py loadtest`
+# runs gunicorn against a throwaway one).
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("SQLITE_NAME") or BASE_DIR / "db.sqlite3",
     }
 }
 
+# ═══════════════════════════════════════════════════════
+# SQLITE PRODUCTION PROFILE
+# ═══════════════════════════════════════════════════════
+# DB_PROFILE=production keeps connections open between requests (with a
+# health check before reuse), takes the write lock at BEGIN instead of on
+# the first write (no lock-upgrade "database is locked" errors), and has the
+# connection_created handler in firstpage/signals.py apply SQLITE_PRAGMAS:
+# WAL lets readers run alongside the writer, synchronous=NORMAL fsyncs at
+# checkpoints rather than on every commit, and busy_timeout makes writers
+# wait for the lock instead of failing. Persistent connections only help
+# under WSGI workers; ASGI requests get a fresh connection each time.
+# `manage.py benchmark_sqlite` compares the two profiles.
+SQLITE_PRODUCTION_DATABASE = {
+    "CONN_MAX_AGE": 600,
+    "CONN_HEALTH_CHECKS": True,
+    "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+}
+SQLITE_PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20000,  # ms
+    "temp_store": "MEMORY",
+}
+
+DB_PROFILE = os.environ.get("DB_PROFILE", "default")
+if DB_PROFILE == "production":
+    DATABASES["default"].update(SQLITE_PRODUCTION_DATABASE)
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+else:
+    SQLITE_PRAGMAS = {}
+
+# ═══════════════════════════════════════════════════════
+# CACHES
+# ═══════════════════════════════════════════════════════
+# "analysis" memoizes dashboard results (see firstpage/analysis_cache.py).
+# "template_fragments" holds the {% cache %}d empty form skeleton of
+# uniguide_dashboard.html. It is per-process on purpose so a deploy with
+# changed templates never serves stale fragments.
+# locmem in dev; point ANALYSIS_CACHE_BACKEND at FileBasedCache or
+# DatabaseCache (with ANALYSIS_CACHE_LOCATION) in production.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "uniguide-fragments",
+    },
+    "analysis": {
+        "BACKEND": os.environ.get(
+            "ANALYSIS_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("ANALYSIS_CACHE_LOCATION", "uniguide-analysis"),
+        "TIMEOUT": int(os.environ.get("ANALYSIS_CACHE_TTL", 60 * 60)),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("ANALYSIS_CACHE_MAX_ENTRIES", 10000)),
+        },
+    },
+}
+
+# ═══════════════════════════════════════════════════════
+# SESSIONS + LOGIN LOOKUP
+# ═══════════════════════════════════════════════════════
+# SESSION_BACKEND picks the session store:
+#   db             – default; every login writes a row (SQLite write lock)
+#   cached_db      – same writes, but session reads come from the cache
+#                    (use a cache shared by all workers, not locmem)
+#   signed_cookies – no server-side writes at all; the session (student_id,
+#                    matric_number) lives in a signed cookie
+# `manage.py benchmark_login` compares them.
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}[os.environ.get("SESSION_BACKEND", "db")]
+
+# ACCOUNT_LOOKUP_CACHE_ALIAS: cache alias through which login_view resolves
+# matric_number → account id (see firstpage/account_lookup.py); off when
+# unset. The Accounts save/delete signals invalidate it only in the worker
+# that made the change, so it must be a cache shared by all workers, never
+# locmem (`manage.py check` warns).
+ACCOUNT_LOOKUP_CACHE_ALIAS = os.environ.get("ACCOUNT_LOOKUP_CACHE_ALIAS") or None
+ACCOUNT_LOOKUP_TIMEOUT = int(os.environ.get("ACCOUNT_LOOKUP_TIMEOUT", 300))
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -65,15 +160,137 @@ USE_TZ = True
 # ═══════════════════════════════════════════════════════
 # STATIC FILES CONFIGURATION
 # ═══════════════════════════════════════════════════════
+# Static files are served by WhiteNoise. In production (DEBUG off)
+# collectstatic writes content-hashed copies plus gzip/brotli variants
+# (brotli needs the Brotli package), and WhiteNoise serves the hashed names
+# with a one-year immutable Cache-Control. firstpage/static is found by the
+# app directories finder. Third-party CSS is self-hosted: run
+# `manage.py vendor_assets` before collectstatic (see firstpage/assets.py).
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
-# 👇 ADD THIS: Tell Django where to find static files in your app
-STATICFILES_DIRS = [
-    BASE_DIR / "mainproject" / "firstpage" / "static",
-]
-
-# 👇 ADD THIS: WhiteNoise configuration for better static file serving
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# ═══════════════════════════════════════════════════════
+# ML MODEL
+# ═══════════════════════════════════════════════════════
+# Load the model and run a dummy prediction when the app starts,
+# instead of paying the unpickle cost on the first request.
+ML_WARMUP = os.environ.get("ML_WARMUP", "0") == "1"
+
+# The async views run analysis + inference on a bounded thread pool: at most
+# ML_EXECUTOR_WORKERS jobs run and ML_EXECUTOR_QUEUE wait; beyond that the
+# request gets a 503 instead of queueing. Serve with ASGI, e.g.
+#   gunicorn mainproject.myproject.asgi:application -k uvicorn.workers.UvicornWorker
+ML_EXECUTOR_WORKERS = int(os.environ.get("ML_EXECUTOR_WORKERS", 4))
+ML_EXECUTOR_QUEUE = int(os.environ.get("ML_EXECUTOR_QUEUE", 32))
+
+# ML_BACKEND=pool runs the model in ML_POOL_PROCESSES dedicated processes
+# (one BLAS/OpenMP thread each) fed through a multiprocessing queue, instead
+# of in every web worker ("inprocess"). A prediction that takes longer than
+# ML_POOL_TIMEOUT seconds is reported as unavailable.
+ML_BACKEND = os.environ.get("ML_BACKEND", "inprocess")
+ML_POOL_PROCESSES = int(os.environ.get("ML_POOL_PROCESSES", 2))
+ML_POOL_TIMEOUT = float(os.environ.get("ML_POOL_TIMEOUT", 5.0))
+
+# ML_MODEL_STORE: directory of versioned models managed with
+# `manage.py model_store`. Predictions (in process or in the pool), shadow
+# scoring and the command all read it from here. Workers serve its "current"
+# version and switch to a newly activated one without a restart. With
+# ML_SHADOW_SAMPLE_RATE > 0 that fraction of predictions is also scored by
+# its "candidate" version on a background thread (at most ML_SHADOW_QUEUE
+# waiting) and the agreement is logged and exported as
+# uniguide_shadow_predictions_total.
+ML_MODEL_STORE = os.environ.get("ML_MODEL_STORE") or None
+
+# Without a model store, the bundled model in firstpage/ml is loaded from
+# ML_MODEL_ARTIFACT: "compiled" (academic_risk_model.npz, pure NumPy),
+# "mmap" (academic_risk_model.joblib, arrays memory-mapped and shared
+# between workers) or "pickle". Unset, the first of those files that exists
+# is used, so the mmap dump is skipped while a compiled export is present.
+ML_MODEL_ARTIFACT = os.environ.get("ML_MODEL_ARTIFACT") or None
+ML_SHADOW_SAMPLE_RATE = float(os.environ.get("ML_SHADOW_SAMPLE_RATE", 0.0))
+ML_SHADOW_QUEUE = int(os.environ.get("ML_SHADOW_QUEUE", 1000))
+
+# Micro-batching: concurrent predictions are coalesced into one predict_proba
+# call of up to ML_BATCH_SIZE rows, waiting at most ML_BATCH_WAIT_MS for the
+# batch to fill. `manage.py benchmark_batcher` shows the throughput vs p99
+# latency tradeoff for different values.
+ML_MICROBATCH = os.environ.get("ML_MICROBATCH", "0") == "1"
+ML_BATCH_SIZE = int(os.environ.get("ML_BATCH_SIZE", 32))
+ML_BATCH_WAIT_MS = float(os.environ.get("ML_BATCH_WAIT_MS", 2.0))
+
+# ═══════════════════════════════════════════════════════
+# ANALYSIS HISTORY
+# ═══════════════════════════════════════════════════════
+# Each dashboard analysis is stored as an AnalysisResult. Rows are buffered
+# in memory and committed by a background thread with one bulk_create every
+# ANALYSIS_HISTORY_FLUSH_SECONDS (sooner once ANALYSIS_HISTORY_BUFFER rows wait).
+ANALYSIS_HISTORY = os.environ.get("ANALYSIS_HISTORY", "1") == "1"
+ANALYSIS_HISTORY_BUFFER = int(os.environ.get("ANALYSIS_HISTORY_BUFFER", 200))
+ANALYSIS_HISTORY_FLUSH_SECONDS = float(os.environ.get("ANALYSIS_HISTORY_FLUSH_SECONDS", 2.0))
+
+# ═══════════════════════════════════════════════════════
+# JSON ANALYSIS API
+# ═══════════════════════════════════════════════════════
+# When set, /api/analyse/ requires "Authorization: Bearer <token>" (for the
+# portal integration); otherwise it requires a logged-in student session.
+ANALYSIS_API_TOKEN = os.environ.get("ANALYSIS_API_TOKEN") or None
+ANALYSIS_API_MAX_BATCH = int(os.environ.get("ANALYSIS_API_MAX_BATCH", 1000))
+
+# ═══════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════
+# Directory shared by all gunicorn workers so /metrics/ can aggregate them.
+# Leave unset for single-process (per-worker) numbers.
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+
+# /metrics/ exposes per-stage latency and cache statistics, so it only
+# answers clients in METRICS_ALLOWED_IPS (comma separated; loopback by
+# default, for a scraper on the same host) or requests carrying
+# "Authorization: Bearer <METRICS_TOKEN>". Behind a reverse proxy
+# REMOTE_ADDR is the proxy's address: use the token there.
+METRICS_ALLOWED_IPS = tuple(
+    ip.strip() for ip in os.environ.get("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()
+)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+
+# ═══════════════════════════════════════════════════════
+# LOGGING
+# ═══════════════════════════════════════════════════════
+# Records go through a queue and are written by a background thread, so
+# request threads never block on stderr. Set LOG_LEVEL=DEBUG to include the
+# per-prediction ML feature dumps.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "queue": {
+            "()": "mainproject.firstpage.logging_queue.QueueListenerHandler",
+            "formatter": "plain",
+        },
+    },
+    "loggers": {
+        "mainproject.firstpage": {
+            "handlers": ["queue"],
+            "level": os.environ.get("LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}